@@ -1,21 +1,193 @@
-"""Environment-aware SDK factories for the agent service."""
+"""Environment-aware SDK factories for the agent service.
+
+Every client built here shares one set of process-wide resources so that
+per-request client construction stays cheap:
+
+* one ``DefaultAzureCredential`` (sync and async) — tokens are acquired once
+  and cached instead of per client;
+* one pooled ``requests`` session for the sync Azure SDK clients and one
+  pooled ``aiohttp`` session (per event loop) for the async ones, sized by
+  ``HTTP_POOL_MAX_PER_HOST`` with ``HTTP_KEEPALIVE_SECONDS`` idle keep-alive;
+* one ``httpx`` client pair for the OpenAI SDK clients, negotiating HTTP/2
+  when ``HTTP2_ENABLED`` is set (``httpx[http2]`` is a dependency).
+
+``agent.warmup`` pre-acquires tokens and opens connections on these shared
+resources before the server reports ready.
+"""
 
 from __future__ import annotations
 
+import asyncio
+import logging
 from typing import Protocol
 
+import aiohttp
+import httpx
+import requests
 from agent_framework.openai import OpenAIChatClient, OpenAIChatCompletionClient
 from azure.ai.inference import EmbeddingsClient
+from azure.ai.inference.aio import EmbeddingsClient as AsyncEmbeddingsClient
 from azure.core.credentials import AzureKeyCredential
+from azure.core.pipeline.transport import AioHttpTransport, RequestsTransport
 from azure.cosmos.aio import CosmosClient as AsyncCosmosClient
 from azure.identity import DefaultAzureCredential
+from azure.identity.aio import DefaultAzureCredential as AsyncDefaultAzureCredential
+from azure.identity.aio import get_bearer_token_provider
 from azure.search.documents import SearchClient
+from azure.search.documents.aio import SearchClient as AsyncSearchClient
 from azure.storage.blob import BlobServiceClient
-from openai import OpenAI
+from azure.storage.blob.aio import BlobServiceClient as AsyncBlobServiceClient
+from openai import AsyncAzureOpenAI, AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
+from requests.adapters import HTTPAdapter
 
 from agent.config import Config, get_config
 
+logger = logging.getLogger(__name__)
+
 _COGNITIVE_SCOPE = "https://cognitiveservices.azure.com/.default"
+_CHAT_API_VERSION = "2025-03-01-preview"
+
+_credential: DefaultAzureCredential | None = None
+_async_credential: AsyncDefaultAzureCredential | None = None
+_requests_session: requests.Session | None = None
+_aiohttp_sessions: dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+_httpx_client: httpx.Client | None = None
+_async_httpx_client: httpx.AsyncClient | None = None
+_async_openai_client: AsyncOpenAI | None = None
+
+
+# ---------------------------------------------------------------------------
+# Shared credentials and pooled transports
+# ---------------------------------------------------------------------------
+
+def get_shared_credential() -> DefaultAzureCredential:
+    """Process-wide sync credential (tokens are cached per credential instance)."""
+    global _credential
+    if _credential is None:
+        _credential = DefaultAzureCredential()
+    return _credential
+
+
+def get_shared_async_credential() -> AsyncDefaultAzureCredential:
+    """Process-wide async credential (tokens are cached per credential instance)."""
+    global _async_credential
+    if _async_credential is None:
+        _async_credential = AsyncDefaultAzureCredential()
+    return _async_credential
+
+
+def _get_requests_session() -> requests.Session:
+    global _requests_session
+    if _requests_session is None:
+        cfg = get_config()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=cfg.http_pool_max_per_host)
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _requests_session = session
+    return _requests_session
+
+
+def _get_aiohttp_session() -> aiohttp.ClientSession:
+    """Pooled aiohttp session bound to the running event loop."""
+    loop = asyncio.get_running_loop()
+    session = _aiohttp_sessions.get(loop)
+    if session is None or session.closed:
+        cfg = get_config()
+        connector = aiohttp.TCPConnector(
+            limit=0,
+            limit_per_host=cfg.http_pool_max_per_host,
+            keepalive_timeout=cfg.http_keepalive_seconds,
+            ttl_dns_cache=300,
+        )
+        # Same session options AioHttpTransport uses for the sessions it owns.
+        session = aiohttp.ClientSession(
+            connector=connector,
+            cookie_jar=aiohttp.DummyCookieJar(),
+            auto_decompress=False,
+            trust_env=True,
+        )
+        for stale_loop in [stale for stale in _aiohttp_sessions if stale.is_closed()]:
+            del _aiohttp_sessions[stale_loop]
+        _aiohttp_sessions[loop] = session
+    return session
+
+
+class _SharedAioHttpTransport(AioHttpTransport):
+    """``AioHttpTransport`` on the shared pooled session.
+
+    The session is resolved when the transport is first opened, so clients
+    can be constructed outside the serving event loop.  Closing a client
+    leaves the shared session open; it is closed by
+    :func:`close_shared_transports`.
+    """
+
+    async def open(self) -> None:
+        if self.session is None:
+            self.session = _get_aiohttp_session()
+            self._session_owner = False
+        await super().open()
+
+
+def _sync_transport(*, connection_verify: bool = True) -> RequestsTransport:
+    return RequestsTransport(
+        session=_get_requests_session(),
+        session_owner=False,
+        connection_verify=connection_verify,
+    )
+
+
+def _async_transport(*, connection_verify: bool = True) -> AioHttpTransport:
+    return _SharedAioHttpTransport(connection_verify=connection_verify)
+
+
+def _httpx_options() -> dict:
+    cfg = get_config()
+    return {
+        "http2": cfg.http2_enabled,
+        "limits": httpx.Limits(
+            max_connections=None,
+            max_keepalive_connections=cfg.http_pool_max_per_host,
+            keepalive_expiry=cfg.http_keepalive_seconds,
+        ),
+    }
+
+
+def _get_httpx_client() -> httpx.Client:
+    global _httpx_client
+    if _httpx_client is None:
+        _httpx_client = DefaultHttpxClient(**_httpx_options())
+    return _httpx_client
+
+
+def _get_async_httpx_client() -> httpx.AsyncClient:
+    global _async_httpx_client
+    if _async_httpx_client is None:
+        _async_httpx_client = DefaultAsyncHttpxClient(**_httpx_options())
+    return _async_httpx_client
+
+
+async def close_shared_transports() -> None:
+    """Close the pooled sessions and credentials (called on server shutdown)."""
+    global _credential, _async_credential, _requests_session
+    global _httpx_client, _async_httpx_client, _async_openai_client
+
+    for session in list(_aiohttp_sessions.values()):
+        if not session.closed:
+            await session.close()
+    _aiohttp_sessions.clear()
+    if _async_httpx_client is not None:
+        await _async_httpx_client.aclose()
+    if _httpx_client is not None:
+        _httpx_client.close()
+    if _requests_session is not None:
+        _requests_session.close()
+    if _async_credential is not None:
+        await _async_credential.close()
+    if _credential is not None:
+        _credential.close()
+    _credential = _async_credential = _requests_session = None
+    _httpx_client = _async_httpx_client = _async_openai_client = None
 
 
 class EmbeddingBackend(Protocol):
@@ -23,13 +195,19 @@ class EmbeddingBackend(Protocol):
         ...
 
 
+class AsyncEmbeddingBackend(Protocol):
+    async def embed(self, texts: list[str]) -> list[list[float]]:
+        ...
+
+
 class _AzureEmbeddingBackend:
     def __init__(self, cfg: Config) -> None:
         endpoint = f"{cfg.ai_services_endpoint.rstrip('/')}/openai/deployments/{cfg.embedding_deployment_name}"
         self._client = EmbeddingsClient(
             endpoint=endpoint,
-            credential=DefaultAzureCredential(),
+            credential=get_shared_credential(),
             credential_scopes=[_COGNITIVE_SCOPE],
+            transport=_sync_transport(),
         )
 
     def embed(self, texts: list[str]) -> list[list[float]]:
@@ -39,7 +217,11 @@ class _AzureEmbeddingBackend:
 
 class _OllamaEmbeddingBackend:
     def __init__(self, cfg: Config) -> None:
-        self._client = OpenAI(base_url=cfg.ollama_endpoint, api_key=cfg.ollama_api_key)
+        self._client = OpenAI(
+            base_url=cfg.ollama_endpoint,
+            api_key=cfg.ollama_api_key,
+            http_client=_get_httpx_client(),
+        )
         self._model = cfg.embedding_deployment_name
 
     def embed(self, texts: list[str]) -> list[list[float]]:
@@ -47,13 +229,60 @@ class _OllamaEmbeddingBackend:
         return [item.embedding for item in response.data]
 
 
+class _AsyncAzureEmbeddingBackend:
+    def __init__(self, cfg: Config) -> None:
+        endpoint = f"{cfg.ai_services_endpoint.rstrip('/')}/openai/deployments/{cfg.embedding_deployment_name}"
+        self._client = AsyncEmbeddingsClient(
+            endpoint=endpoint,
+            credential=get_shared_async_credential(),
+            credential_scopes=[_COGNITIVE_SCOPE],
+            transport=_async_transport(),
+        )
+
+    async def embed(self, texts: list[str]) -> list[list[float]]:
+        response = await self._client.embed(input=texts)
+        return [item.embedding for item in response.data]
+
+
+class _AsyncOllamaEmbeddingBackend:
+    def __init__(self, cfg: Config) -> None:
+        self._client = AsyncOpenAI(
+            base_url=cfg.ollama_endpoint,
+            api_key=cfg.ollama_api_key,
+            http_client=_get_async_httpx_client(),
+        )
+        self._model = cfg.embedding_deployment_name
+
+    async def embed(self, texts: list[str]) -> list[list[float]]:
+        response = await self._client.embeddings.create(model=self._model, input=texts)
+        return [item.embedding for item in response.data]
+
+
 def create_blob_service_client(account_url: str | None = None) -> BlobServiceClient:
     cfg = get_config()
     if cfg.is_dev and cfg.azurite_connection_string:
-        return BlobServiceClient.from_connection_string(cfg.azurite_connection_string)
+        return BlobServiceClient.from_connection_string(
+            cfg.azurite_connection_string,
+            transport=_sync_transport(),
+        )
     return BlobServiceClient(
         account_url=(account_url or cfg.serving_blob_endpoint).rstrip("/"),
-        credential=DefaultAzureCredential(),
+        credential=get_shared_credential(),
+        transport=_sync_transport(),
+    )
+
+
+def create_async_blob_service_client(account_url: str | None = None) -> AsyncBlobServiceClient:
+    cfg = get_config()
+    if cfg.is_dev and cfg.azurite_connection_string:
+        return AsyncBlobServiceClient.from_connection_string(
+            cfg.azurite_connection_string,
+            transport=_async_transport(),
+        )
+    return AsyncBlobServiceClient(
+        account_url=(account_url or cfg.serving_blob_endpoint).rstrip("/"),
+        credential=get_shared_async_credential(),
+        transport=_async_transport(),
     )
 
 
@@ -65,10 +294,12 @@ def create_async_cosmos_client(endpoint: str | None = None) -> AsyncCosmosClient
             credential=cfg.cosmos_key,
             connection_verify=cfg.cosmos_verify_cert,
             enable_endpoint_discovery=False,
+            transport=_async_transport(connection_verify=cfg.cosmos_verify_cert),
         )
     return AsyncCosmosClient(
         url=endpoint or cfg.cosmos_endpoint,
-        credential=DefaultAzureCredential(),
+        credential=get_shared_async_credential(),
+        transport=_async_transport(),
     )
 
 
@@ -80,11 +311,31 @@ def create_search_client() -> SearchClient:
             index_name=cfg.search_index_name,
             credential=AzureKeyCredential(cfg.search_api_key),
             connection_verify=cfg.search_verify_cert,
+            transport=_sync_transport(connection_verify=cfg.search_verify_cert),
         )
     return SearchClient(
         endpoint=cfg.search_endpoint,
         index_name=cfg.search_index_name,
-        credential=DefaultAzureCredential(),
+        credential=get_shared_credential(),
+        transport=_sync_transport(),
+    )
+
+
+def create_async_search_client() -> AsyncSearchClient:
+    cfg = get_config()
+    if cfg.is_dev:
+        return AsyncSearchClient(
+            endpoint=cfg.search_endpoint,
+            index_name=cfg.search_index_name,
+            credential=AzureKeyCredential(cfg.search_api_key),
+            connection_verify=cfg.search_verify_cert,
+            transport=_async_transport(connection_verify=cfg.search_verify_cert),
+        )
+    return AsyncSearchClient(
+        endpoint=cfg.search_endpoint,
+        index_name=cfg.search_index_name,
+        credential=get_shared_async_credential(),
+        transport=_async_transport(),
     )
 
 
@@ -95,6 +346,38 @@ def create_query_embedding_backend() -> EmbeddingBackend:
     return _AzureEmbeddingBackend(cfg)
 
 
+def create_async_query_embedding_backend() -> AsyncEmbeddingBackend:
+    cfg = get_config()
+    if cfg.is_dev:
+        return _AsyncOllamaEmbeddingBackend(cfg)
+    return _AsyncAzureEmbeddingBackend(cfg)
+
+
+def _get_async_openai_client(cfg: Config) -> AsyncOpenAI:
+    """Shared OpenAI SDK client behind every chat client.
+
+    ``create_chat_client`` runs for every request (the orchestrator is rebuilt
+    per run), so the SDK client — and with it the connection pool and the
+    cached Entra token — is built once and injected.
+    """
+    global _async_openai_client
+    if _async_openai_client is None:
+        if cfg.is_dev:
+            _async_openai_client = AsyncOpenAI(
+                base_url=cfg.ollama_endpoint,
+                api_key=cfg.ollama_api_key,
+                http_client=_get_async_httpx_client(),
+            )
+        else:
+            _async_openai_client = AsyncAzureOpenAI(
+                azure_endpoint=cfg.ai_services_endpoint,
+                azure_ad_token_provider=get_bearer_token_provider(get_shared_async_credential(), _COGNITIVE_SCOPE),
+                api_version=_CHAT_API_VERSION,
+                http_client=_get_async_httpx_client(),
+            )
+    return _async_openai_client
+
+
 def create_chat_client() -> OpenAIChatClient | OpenAIChatCompletionClient:
     cfg = get_config()
     if cfg.is_dev:
@@ -102,11 +385,11 @@ def create_chat_client() -> OpenAIChatClient | OpenAIChatCompletionClient:
             model=cfg.agent_model_deployment_name,
             api_key=cfg.ollama_api_key,
             base_url=cfg.ollama_endpoint,
+            async_client=_get_async_openai_client(cfg),
         )
 
     return OpenAIChatCompletionClient(
-        credential=DefaultAzureCredential(),
-        azure_endpoint=cfg.ai_services_endpoint,
         model=cfg.agent_model_deployment_name,
-        api_version="2025-03-01-preview",
-    )
\ No newline at end of file
+        api_version=_CHAT_API_VERSION,
+        async_client=_get_async_openai_client(cfg),
+    )
@@ -29,6 +29,16 @@ def _get_int(name: str, default: int) -> int:
         return default
 
 
+def _get_float(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        return default
+
+
 def _default_vector_dimensions(environment: str) -> int:
     return 1024 if environment == "dev" else 1536
 
@@ -69,23 +79,93 @@ class Config:
     embedding_deployment_name: str = "text-embedding-3-small"
     embedding_vector_dimensions: int = 1536
 
+    # Query-embedding cache (0 disables)
+    embedding_cache_max_entries: int = 1024
+    embedding_cache_ttl_seconds: int = 3600
+
     # Azure AI Search
     search_endpoint: str = ""
     search_index_name: str = "kb-articles"
     search_api_key: str = ""
     search_verify_cert: bool = True
 
+    # Search backend: "azure" (AI Search) or "local" (in-process snapshot)
+    search_backend: str = "azure"
+    local_search_snapshot_dir: str = ""
+
+    # Overlap the keyword-only search leg with query embedding and fuse client-side
+    search_overlap_embedding: bool = False
+    # Return keyword-only results when embedding exceeds this budget (0 = always wait)
+    search_embedding_budget_ms: int = 0
+
+    # Search result cache (0 disables) and index watermark probe interval
+    search_result_cache_max_entries: int = 512
+    search_result_cache_ttl_seconds: int = 120
+    search_watermark_interval_seconds: int = 15
+    # Token budget for chunk content in one search tool result, estimated at
+    # 4 chars/token (0 = unlimited)
+    search_result_token_budget: int = 4000
+    # Over-fetch this many candidates and rerank them client-side (0 disables)
+    search_rerank_candidates: int = 0
+    search_rerank_max_per_article: int = 2
+    search_mmr_lambda: float = 0.7
+    # Also fetch content_vector from AI Search so reranking can apply MMR
+    search_select_vectors: bool = False
+    # Add each hit's neighbouring chunks (chunk_index ± 1); cache of per-article chunk ids
+    search_expand_adjacent: bool = False
+    chunk_map_cache_max_entries: int = 2048
+    chunk_map_cache_ttl_seconds: int = 900
+
     # Azure Blob Storage — serving account (images for vision)
     serving_blob_endpoint: str = ""
     serving_container_name: str = "serving"
     azurite_connection_string: str = ""
 
+    # Vision image cache (0 disables); optional disk spill for evicted images
+    image_cache_max_bytes: int = 64 * 1024 * 1024
+    image_cache_revalidate_seconds: int = 300
+    image_cache_disk_dir: str = ""
+    image_cache_disk_max_bytes: int = 512 * 1024 * 1024
+
+    # Vision image downloads per LLM call: concurrency cap and overall deadline (0 = none)
+    vision_download_concurrency: int = 4
+    vision_download_deadline_ms: int = 1500
+    # Which already-attached vision images are re-sent on later calls: none | latest | all
+    vision_reattach_policy: str = "latest"
+
+    # Group → department resolution: provider (simulated | mapping) and caching
+    group_resolver_provider: str = "simulated"
+    group_mapping_file: str = ""
+    group_resolver_ttl_seconds: int = 900
+    group_resolver_negative_ttl_seconds: int = 60
+    group_resolver_refresh_ahead_seconds: int = 600
+
     # Cosmos DB — agent session persistence (optional: empty = no persistence)
     cosmos_endpoint: str = ""
     cosmos_key: str = ""
     cosmos_verify_cert: bool = True
     cosmos_database_name: str = "kb-agent"
     cosmos_sessions_container: str = "agent-sessions"
+    # Session storage layout: document (one doc per conversation) | segmented (append-only)
+    session_storage_layout: str = "document"
+    # Compression of stored session payloads: none | gzip
+    session_codec: str = "none"
+    # Persist sessions in the background after each turn (per-thread coalescing)
+    session_write_behind: bool = False
+    session_write_behind_max_pending: int = 256
+    session_write_behind_flush_timeout_seconds: int = 10
+    # In-process session cache (0 disables); reads within the revalidate window
+    # skip Cosmos, older entries are revalidated with a conditional read
+    session_cache_max_entries: int = 256
+    session_cache_ttl_seconds: int = 1800
+    session_cache_revalidate_seconds: int = 0
+
+    # Shared HTTP connection pools (all SDK clients) and startup warm-up
+    http_pool_max_per_host: int = 32
+    http_keepalive_seconds: int = 90
+    http2_enabled: bool = True
+    startup_warmup: bool = True
+    startup_warmup_timeout_seconds: int = 30
 
     @property
     def is_dev(self) -> bool:
@@ -119,6 +199,8 @@ def _load_config() -> Config:
             "EMBEDDING_VECTOR_DIMENSIONS",
             _default_vector_dimensions(environment),
         ),
+        embedding_cache_max_entries=_get_int("EMBEDDING_CACHE_MAX_ENTRIES", 1024),
+        embedding_cache_ttl_seconds=_get_int("EMBEDDING_CACHE_TTL_SECONDS", 3600),
         search_endpoint=os.environ.get("SEARCH_ENDPOINT", ""),
         search_index_name=os.environ.get("SEARCH_INDEX_NAME", "kb-articles"),
         search_api_key=os.environ.get(
@@ -126,9 +208,36 @@ def _load_config() -> Config:
             "dev-admin-key" if environment == "dev" else "",
         ),
         search_verify_cert=_get_bool("SEARCH_VERIFY_CERT", environment != "dev"),
+        search_backend=os.environ.get("SEARCH_BACKEND", "azure").strip().lower() or "azure",
+        local_search_snapshot_dir=os.environ.get("LOCAL_SEARCH_SNAPSHOT_DIR", ""),
+        search_overlap_embedding=_get_bool("SEARCH_OVERLAP_EMBEDDING", False),
+        search_embedding_budget_ms=_get_int("SEARCH_EMBEDDING_BUDGET_MS", 0),
+        search_result_cache_max_entries=_get_int("SEARCH_RESULT_CACHE_MAX_ENTRIES", 512),
+        search_result_cache_ttl_seconds=_get_int("SEARCH_RESULT_CACHE_TTL_SECONDS", 120),
+        search_watermark_interval_seconds=_get_int("SEARCH_WATERMARK_INTERVAL_SECONDS", 15),
+        search_result_token_budget=_get_int("SEARCH_RESULT_TOKEN_BUDGET", 4000),
+        search_rerank_candidates=_get_int("SEARCH_RERANK_CANDIDATES", 0),
+        search_rerank_max_per_article=_get_int("SEARCH_RERANK_MAX_PER_ARTICLE", 2),
+        search_mmr_lambda=_get_float("SEARCH_MMR_LAMBDA", 0.7),
+        search_select_vectors=_get_bool("SEARCH_SELECT_VECTORS", False),
+        search_expand_adjacent=_get_bool("SEARCH_EXPAND_ADJACENT", False),
+        chunk_map_cache_max_entries=_get_int("CHUNK_MAP_CACHE_MAX_ENTRIES", 2048),
+        chunk_map_cache_ttl_seconds=_get_int("CHUNK_MAP_CACHE_TTL_SECONDS", 900),
         serving_blob_endpoint=os.environ.get("SERVING_BLOB_ENDPOINT", ""),
         serving_container_name=os.environ.get("SERVING_CONTAINER_NAME", "serving"),
         azurite_connection_string=os.environ.get("AZURITE_CONNECTION_STRING", ""),
+        image_cache_max_bytes=_get_int("IMAGE_CACHE_MAX_BYTES", 64 * 1024 * 1024),
+        image_cache_revalidate_seconds=_get_int("IMAGE_CACHE_REVALIDATE_SECONDS", 300),
+        image_cache_disk_dir=os.environ.get("IMAGE_CACHE_DISK_DIR", ""),
+        image_cache_disk_max_bytes=_get_int("IMAGE_CACHE_DISK_MAX_BYTES", 512 * 1024 * 1024),
+        vision_download_concurrency=_get_int("VISION_DOWNLOAD_CONCURRENCY", 4),
+        vision_download_deadline_ms=_get_int("VISION_DOWNLOAD_DEADLINE_MS", 1500),
+        vision_reattach_policy=os.environ.get("VISION_REATTACH_POLICY", "latest").strip().lower() or "latest",
+        group_resolver_provider=os.environ.get("GROUP_RESOLVER_PROVIDER", "simulated").strip().lower() or "simulated",
+        group_mapping_file=os.environ.get("GROUP_MAPPING_FILE", ""),
+        group_resolver_ttl_seconds=_get_int("GROUP_RESOLVER_TTL_SECONDS", 900),
+        group_resolver_negative_ttl_seconds=_get_int("GROUP_RESOLVER_NEGATIVE_TTL_SECONDS", 60),
+        group_resolver_refresh_ahead_seconds=_get_int("GROUP_RESOLVER_REFRESH_AHEAD_SECONDS", 600),
         cosmos_endpoint=os.environ.get(
             "COSMOS_ENDPOINT",
             "https://localhost:8081/" if environment == "dev" else "",
@@ -140,6 +249,19 @@ def _load_config() -> Config:
         cosmos_verify_cert=_get_bool("COSMOS_VERIFY_CERT", environment != "dev"),
         cosmos_database_name=os.environ.get("COSMOS_DATABASE_NAME", "kb-agent"),
         cosmos_sessions_container=os.environ.get("COSMOS_SESSIONS_CONTAINER", "agent-sessions"),
+        session_storage_layout=os.environ.get("SESSION_STORAGE_LAYOUT", "document").strip().lower() or "document",
+        session_codec=os.environ.get("SESSION_CODEC", "none").strip().lower() or "none",
+        session_write_behind=_get_bool("SESSION_WRITE_BEHIND", False),
+        session_write_behind_max_pending=_get_int("SESSION_WRITE_BEHIND_MAX_PENDING", 256),
+        session_write_behind_flush_timeout_seconds=_get_int("SESSION_WRITE_BEHIND_FLUSH_TIMEOUT_SECONDS", 10),
+        session_cache_max_entries=_get_int("SESSION_CACHE_MAX_ENTRIES", 256),
+        session_cache_ttl_seconds=_get_int("SESSION_CACHE_TTL_SECONDS", 1800),
+        session_cache_revalidate_seconds=_get_int("SESSION_CACHE_REVALIDATE_SECONDS", 0),
+        http_pool_max_per_host=_get_int("HTTP_POOL_MAX_PER_HOST", 32),
+        http_keepalive_seconds=_get_int("HTTP_KEEPALIVE_SECONDS", 90),
+        http2_enabled=_get_bool("HTTP2_ENABLED", True),
+        startup_warmup=_get_bool("STARTUP_WARMUP", True),
+        startup_warmup_timeout_seconds=_get_int("STARTUP_WARMUP_TIMEOUT_SECONDS", 30),
     )
 
 
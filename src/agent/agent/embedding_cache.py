@@ -0,0 +1,128 @@
+"""Query-embedding cache used in front of the search tool's embedding backend.
+
+Agents frequently re-issue the same (or whitespace/case-identical) query within
+a conversation — the orchestrator and the internal search agent both search,
+and follow-up turns repeat FAQ-style questions.  Each embedding is a full
+network round trip, so vectors are cached per process in a bounded LRU with a
+TTL, keyed on the normalized query text plus the embedding deployment and
+vector dimensions (a model or dimension change can never return a stale
+vector).
+
+An optional :class:`EmbeddingCacheBackend` can be plugged in so several agent
+replicas share embeddings.  The shared tier is consulted after the local LRU
+misses and is populated on every fresh embedding.  Shared-tier failures are
+logged and treated as misses — the cache is an optimization, never a
+dependency of the search path.
+
+Hit/miss counts are exported as OTel metrics
+(``kb_agent.embedding_cache.hits`` / ``kb_agent.embedding_cache.misses``).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+from typing import Protocol
+
+from opentelemetry import metrics
+
+from agent.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+meter = metrics.get_meter(__name__)
+
+_hits_counter = meter.create_counter(
+    "kb_agent.embedding_cache.hits",
+    unit="{lookup}",
+    description="Query embeddings served from cache",
+)
+_misses_counter = meter.create_counter(
+    "kb_agent.embedding_cache.misses",
+    unit="{lookup}",
+    description="Query embeddings that required an embedding backend call",
+)
+
+
+class EmbeddingCacheBackend(Protocol):
+    """Shared cache tier (e.g. Redis) for query embeddings across replicas."""
+
+    def get(self, key: str) -> list[float] | None:
+        ...
+
+    def set(self, key: str, vector: list[float], ttl_seconds: float) -> None:
+        ...
+
+
+def normalize_query(query: str) -> str:
+    """Collapse whitespace and case so trivially different queries share a key."""
+    return " ".join(query.split()).casefold()
+
+
+class QueryEmbeddingCache:
+    """Two-tier (local LRU + optional shared backend) query-embedding cache."""
+
+    def __init__(
+        self,
+        *,
+        model: str,
+        dimensions: int,
+        max_entries: int,
+        ttl_seconds: float,
+        shared_backend: EmbeddingCacheBackend | None = None,
+    ) -> None:
+        self._model = model
+        self._dimensions = dimensions
+        self._local: TTLCache[str, list[float]] = TTLCache(max_entries, ttl_seconds)
+        self._shared_backend = shared_backend
+
+    @property
+    def enabled(self) -> bool:
+        return self._local.enabled or self._shared_backend is not None
+
+    def set_shared_backend(self, backend: EmbeddingCacheBackend | None) -> None:
+        self._shared_backend = backend
+
+    def make_key(self, query: str) -> str:
+        digest = hashlib.sha256(normalize_query(query).encode("utf-8")).hexdigest()
+        return f"emb:{self._model}:{self._dimensions}:{digest}"
+
+    def get(self, query: str) -> list[float] | None:
+        """Return a cached vector for ``query`` or ``None`` on a miss."""
+        if not self.enabled:
+            return None
+
+        key = self.make_key(query)
+        vector = self._local.get(key)
+        if vector is not None:
+            _hits_counter.add(1, {"tier": "local"})
+            return vector
+
+        if self._shared_backend is not None:
+            try:
+                vector = self._shared_backend.get(key)
+            except Exception:
+                logger.warning("Shared embedding cache read failed", exc_info=True)
+                vector = None
+            if vector is not None and len(vector) == self._dimensions:
+                self._local.set(key, vector)
+                _hits_counter.add(1, {"tier": "shared"})
+                return vector
+
+        _misses_counter.add(1)
+        return None
+
+    def put(self, query: str, vector: list[float]) -> None:
+        """Store a freshly computed vector in both cache tiers."""
+        if not self.enabled:
+            return
+
+        key = self.make_key(query)
+        self._local.set(key, vector)
+        if self._shared_backend is not None:
+            try:
+                self._shared_backend.set(key, vector, self._local.ttl_seconds)
+            except Exception:
+                logger.warning("Shared embedding cache write failed", exc_info=True)
+
+    def clear(self) -> None:
+        self._local.clear()
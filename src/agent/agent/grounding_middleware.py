@@ -9,7 +9,6 @@ discoverable sources.
 
 from __future__ import annotations
 
-import json
 import re
 from collections.abc import Sequence
 from typing import Any
@@ -17,36 +16,19 @@ from typing import Any
 from agent_framework import ChatContext, ChatMiddleware, ChatResponse, Content, Message
 
 from agent.image_service import get_image_url
+from agent.tool_results import search_result_items
 
 _CITATION_PATTERN = re.compile(r"\[Ref\s*#\d+\]|\bRef\s*#\d+\b", re.IGNORECASE)
 _IMAGE_PATTERN = re.compile(r"!\[[^\]]*\]\([^)]+\)|/api/images/|\.(?:png|jpe?g|svg|gif)\b", re.IGNORECASE)
 
 
-def _extract_result_items(payload: object) -> list[dict[str, Any]]:
-    """Return search result items from legacy list or current dict payloads."""
-    if isinstance(payload, list):
-        return [item for item in payload if isinstance(item, dict)]
-
-    if isinstance(payload, dict):
-        results = payload.get("results")
-        if isinstance(results, list):
-            return [item for item in results if isinstance(item, dict)]
-
-    return []
-
-
 def _latest_search_results(messages: Sequence[Message]) -> list[dict[str, Any]]:
     """Return the latest parsed search-tool results from the chat context."""
     for msg in reversed(messages):
         for content in reversed(msg.contents):
             if content.type != "function_result" or content.result is None:
                 continue
-            try:
-                parsed = json.loads(str(content.result))
-            except (json.JSONDecodeError, TypeError):
-                continue
-
-            results = _extract_result_items(parsed)
+            results = search_result_items(content)
             if results:
                 return results
 
@@ -1,39 +1,202 @@
-"""Group-to-department resolver — simulated Graph API placeholder.
+"""Group-to-department resolver with a cached, refresh-ahead lookup.
 
-Maps Entra security group GUIDs to department names.  This implementation
-is intentionally simple: any non-empty input returns ``["engineering"]``.
-Replace with real Microsoft Graph API calls in a future epic.
+Maps Entra security group GUIDs to department names.  The mapping comes
+from a :class:`DepartmentProvider`:
+
+* ``simulated`` (default) — any non-empty input returns ``["engineering"]``.
+  Stands in for the Microsoft Graph lookup of a future epic.
+* ``mapping`` — a local YAML/JSON file (``GROUP_MAPPING_FILE``) mapping group
+  GUIDs to one or more departments, for offline dev and tests::
+
+      groups:
+        3f2a...: engineering
+        9c41...: [finance, research]
+
+Resolution runs on every tool call and citation lookup, so
+:class:`GroupResolver` sits in front of the provider:
+
+* Results are cached per group set for ``GROUP_RESOLVER_TTL_SECONDS``.  Sets
+  that resolve to no departments are cached for the shorter
+  ``GROUP_RESOLVER_NEGATIVE_TTL_SECONDS``, so newly mapped groups show up
+  quickly.
+* Concurrent lookups of one group set share a single provider call.
+* Once an entry is older than ``GROUP_RESOLVER_REFRESH_AHEAD_SECONDS`` it is
+  still served, and refreshed in the background — the hot path only waits
+  on the provider for a group set it has never seen or whose entry expired.
+  A failed background refresh keeps the cached entry until it expires.
 """
 
 from __future__ import annotations
 
+import asyncio
+import json
 import logging
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Protocol
+
+import yaml
+
+from agent.config import config
 
 logger = logging.getLogger(__name__)
 
 
-def resolve_departments(group_guids: list[str]) -> list[str]:
-    """Resolve Entra group GUIDs to department names.
+class DepartmentProvider(Protocol):
+    async def departments_for_groups(self, group_guids: frozenset[str]) -> frozenset[str]: ...
+
+
+class SimulatedDepartmentProvider:
+    """Placeholder for the Graph lookup: every group maps to ``engineering``."""
+
+    async def departments_for_groups(self, group_guids: frozenset[str]) -> frozenset[str]:
+        return frozenset({"engineering"}) if group_guids else frozenset()
+
+
+class MappingDepartmentProvider:
+    """Static group → department mapping, loaded from YAML or JSON."""
+
+    def __init__(self, mapping: Mapping[str, Iterable[str]]) -> None:
+        self._mapping = {group: frozenset(departments) for group, departments in mapping.items()}
+
+    @classmethod
+    def from_file(cls, path: str | Path) -> MappingDepartmentProvider:
+        """Load ``{"groups": {guid: department | [departments]}}`` (a bare mapping also works).
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+            ValueError: If the file is not a mapping of strings or string lists.
+        """
+        path = Path(path)
+        text = path.read_text(encoding="utf-8")
+        raw = json.loads(text) if path.suffix == ".json" else yaml.safe_load(text)
+        if isinstance(raw, dict) and isinstance(raw.get("groups"), dict):
+            raw = raw["groups"]
+        if not isinstance(raw, dict):
+            raise ValueError(f"Group mapping must be a mapping of group ids to departments: {path}")
+        return cls({str(group): _department_names(value, path) for group, value in raw.items()})
+
+    async def departments_for_groups(self, group_guids: frozenset[str]) -> frozenset[str]:
+        return frozenset().union(*(self._mapping.get(group, frozenset()) for group in group_guids))
+
+
+@dataclass(frozen=True)
+class _Entry:
+    departments: frozenset[str]
+    fetched_at: float
+    expires_at: float
+
+
+class GroupResolver:
+    """Caching, single-flight front for a :class:`DepartmentProvider`."""
 
-    Parameters
-    ----------
-    group_guids:
-        List of Entra security group GUIDs from the JWT ``groups`` claim.
+    def __init__(
+        self,
+        provider: DepartmentProvider,
+        *,
+        ttl_seconds: float,
+        negative_ttl_seconds: float,
+        refresh_ahead_seconds: float,
+        max_entries: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._provider = provider
+        self._ttl_seconds = max(0.0, ttl_seconds)
+        self._negative_ttl_seconds = max(0.0, negative_ttl_seconds)
+        self._refresh_ahead_seconds = max(0.0, refresh_ahead_seconds)
+        self._max_entries = max(0, max_entries)
+        self._clock = clock
+        self._entries: OrderedDict[frozenset[str], _Entry] = OrderedDict()
+        self._inflight: dict[frozenset[str], asyncio.Task[frozenset[str]]] = {}
 
-    Returns
-    -------
-    list[str]
-        Department names.  Returns ``["engineering"]`` for any non-empty
-        input (simulated).  Returns ``[]`` for empty input.
+    async def resolve(self, group_guids: Iterable[str]) -> frozenset[str]:
+        key = frozenset(group_guids)
+        if not key:
+            return frozenset()
+
+        now = self._clock()
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at > now:
+            self._entries.move_to_end(key)
+            if self._refresh_ahead_seconds and now - entry.fetched_at >= self._refresh_ahead_seconds:
+                self._lookup(key)
+            return entry.departments
+
+        return await asyncio.shield(self._lookup(key))
+
+    def invalidate(self) -> None:
+        self._entries.clear()
+
+    def _lookup(self, key: frozenset[str]) -> asyncio.Task[frozenset[str]]:
+        """Start (or join) the provider call for ``key``."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch(key))
+            task.add_done_callback(_log_lookup_failure)
+            self._inflight[key] = task
+        return task
+
+    async def _fetch(self, key: frozenset[str]) -> frozenset[str]:
+        try:
+            departments = frozenset(await self._provider.departments_for_groups(key))
+        finally:
+            self._inflight.pop(key, None)
+
+        ttl = self._ttl_seconds if departments else self._negative_ttl_seconds
+        if self._max_entries and ttl:
+            now = self._clock()
+            self._entries[key] = _Entry(departments, fetched_at=now, expires_at=now + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        logger.debug("Resolved %d group(s) → departments=%s", len(key), sorted(departments))
+        return departments
+
+
+_resolver: GroupResolver | None = None
+
+
+def get_group_resolver() -> GroupResolver:
+    global _resolver
+    if _resolver is None:
+        _resolver = GroupResolver(
+            _create_provider(),
+            ttl_seconds=config.group_resolver_ttl_seconds,
+            negative_ttl_seconds=config.group_resolver_negative_ttl_seconds,
+            refresh_ahead_seconds=config.group_resolver_refresh_ahead_seconds,
+        )
+    return _resolver
+
+
+async def resolve_departments(group_guids: Iterable[str]) -> frozenset[str]:
+    """Resolve Entra group GUIDs (from the JWT ``groups`` claim) to department names.
+
+    Returns an empty set for empty input.
     """
-    if not group_guids:
-        return []
-
-    # Simulated resolution — replace with Graph API in a future epic
-    departments = ["engineering"]
-    logger.debug(
-        "Resolved %d group(s) → departments=%s (simulated)",
-        len(group_guids),
-        departments,
-    )
-    return departments
+    return await get_group_resolver().resolve(group_guids)
+
+
+def _create_provider() -> DepartmentProvider:
+    if config.group_resolver_provider == "mapping":
+        if not config.group_mapping_file:
+            raise RuntimeError("GROUP_RESOLVER_PROVIDER=mapping requires GROUP_MAPPING_FILE")
+        return MappingDepartmentProvider.from_file(config.group_mapping_file)
+    if config.group_resolver_provider != "simulated":
+        raise ValueError(f"Unknown GROUP_RESOLVER_PROVIDER: {config.group_resolver_provider}")
+    return SimulatedDepartmentProvider()
+
+
+def _department_names(value: Any, source: Path) -> list[str]:
+    names = [value] if isinstance(value, str) else value
+    if not isinstance(names, list) or not all(isinstance(name, str) and name.strip() for name in names):
+        raise ValueError(f"Group mapping {source}: departments must be a string or a list of strings")
+    return [name.strip() for name in names]
+
+
+def _log_lookup_failure(task: asyncio.Task) -> None:
+    # Background refreshes have no awaiting caller; cached entries stay until they expire.
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Group resolution failed", exc_info=task.exception())
@@ -0,0 +1,200 @@
+"""Byte-budgeted LRU cache of downloaded vision images.
+
+The vision middleware re-scans every tool result in the context on each LLM
+call, so images from earlier turns are requested again and again.  Images in
+the serving container are immutable per index run, so the downloaded bytes
+are kept in memory under a byte budget, evicted least-recently-used first.
+
+Entries are keyed by ``article_id/image_path`` and remember the blob ETag.
+Once an entry is older than ``revalidate_seconds`` the caller revalidates
+it with a conditional download (``If-None-Match``): a 304 costs a round trip
+but no payload, and a re-indexed image replaces the stale bytes.
+
+With a ``disk_dir`` configured, entries evicted from memory spill to disk
+(under their own byte budget) and are promoted back to memory on a hit.
+Spill files are named by a digest of the blob path and ETag, so a changed
+blob never collides with its previous version.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, replace
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedImage:
+    """A cached image; ``data`` is ``None`` while the entry lives on disk.
+
+    ``source`` is the blob the bytes came from, which may differ from the
+    cache key when a vision derivative was served.
+    """
+
+    etag: str
+    content_type: str
+    size: int
+    validated_at: float
+    source: str
+    data: bytes | None = None
+
+
+class ImageCache:
+    """Thread-safe, byte-budgeted LRU cache with an optional disk tier.
+
+    A ``max_bytes`` of ``0`` disables the cache.  Images larger than
+    ``max_bytes`` are never cached.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_bytes: int,
+        revalidate_seconds: float,
+        disk_dir: str | Path | None = None,
+        disk_max_bytes: int = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._max_bytes = max(0, max_bytes)
+        self._revalidate_seconds = max(0.0, revalidate_seconds)
+        self._disk_dir = Path(disk_dir) if disk_dir and disk_max_bytes > 0 else None
+        self._disk_max_bytes = disk_max_bytes if self._disk_dir is not None else 0
+        self._clock = clock
+        self._memory: OrderedDict[str, CachedImage] = OrderedDict()
+        self._disk: OrderedDict[str, CachedImage] = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+        if self._disk_dir is not None:
+            self._disk_dir.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_bytes > 0
+
+    @property
+    def memory_bytes(self) -> int:
+        return self._memory_bytes
+
+    @property
+    def disk_bytes(self) -> int:
+        return self._disk_bytes
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self._hits + self._misses
+        return self._hits / lookups if lookups else 0.0
+
+    def __len__(self) -> int:
+        return len(self._memory) + len(self._disk)
+
+    def get(self, key: str) -> CachedImage | None:
+        """Return the cached image with its bytes loaded, or ``None``.
+
+        A disk hit is promoted back to memory.  The entry may be due for
+        revalidation — see :meth:`needs_revalidation`.
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry
+            entry = self._disk.pop(key, None)
+            if entry is None:
+                return None
+            self._disk_bytes -= entry.size
+
+        path = self._spill_path(key, entry.etag)
+        try:
+            data = path.read_bytes()
+        except OSError:
+            logger.warning("Spilled image %s is no longer readable", key, exc_info=True)
+            return None
+        path.unlink(missing_ok=True)
+        entry.data = data
+        self._store(key, entry)
+        return entry
+
+    def needs_revalidation(self, entry: CachedImage) -> bool:
+        if self._revalidate_seconds <= 0:
+            return False
+        return self._clock() - entry.validated_at >= self._revalidate_seconds
+
+    def mark_validated(self, entry: CachedImage) -> None:
+        """Record a successful ``If-None-Match`` revalidation (HTTP 304)."""
+        entry.validated_at = self._clock()
+
+    def put(self, key: str, *, data: bytes, content_type: str, etag: str, source: str | None = None) -> None:
+        if not self.enabled or len(data) > self._max_bytes:
+            return
+        self._store(key, CachedImage(etag, content_type, len(data), self._clock(), source or key, data))
+
+    def record_lookup(self, *, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            spilled = list(self._disk.items())
+            self._memory.clear()
+            self._disk.clear()
+            self._memory_bytes = self._disk_bytes = 0
+        for key, entry in spilled:
+            self._spill_path(key, entry.etag).unlink(missing_ok=True)
+
+    def _store(self, key: str, entry: CachedImage) -> None:
+        evicted: list[tuple[str, CachedImage]] = []
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_bytes -= previous.size
+            stale = self._disk.pop(key, None)
+            if stale is not None:
+                self._disk_bytes -= stale.size
+            self._memory[key] = entry
+            self._memory_bytes += entry.size
+            while self._memory_bytes > self._max_bytes:
+                evicted_key, evicted_entry = self._memory.popitem(last=False)
+                self._memory_bytes -= evicted_entry.size
+                evicted.append((evicted_key, evicted_entry))
+        if stale is not None:
+            self._spill_path(key, stale.etag).unlink(missing_ok=True)
+        for evicted_key, evicted_entry in evicted:
+            self._spill(evicted_key, evicted_entry)
+
+    def _spill(self, key: str, entry: CachedImage) -> None:
+        if self._disk_dir is None or entry.data is None or entry.size > self._disk_max_bytes:
+            return
+        try:
+            self._spill_path(key, entry.etag).write_bytes(entry.data)
+        except OSError:
+            logger.warning("Failed to spill cached image %s to disk", key, exc_info=True)
+            return
+
+        dropped: list[tuple[str, CachedImage]] = []
+        with self._lock:
+            self._disk[key] = replace(entry, data=None)
+            self._disk_bytes += entry.size
+            while self._disk_bytes > self._disk_max_bytes:
+                dropped.append(self._disk.popitem(last=False))
+                self._disk_bytes -= dropped[-1][1].size
+        for dropped_key, dropped_entry in dropped:
+            self._spill_path(dropped_key, dropped_entry.etag).unlink(missing_ok=True)
+
+    def _spill_path(self, key: str, etag: str) -> Path:
+        assert self._disk_dir is not None
+        return self._disk_dir / hashlib.sha256(f"{key}\0{etag}".encode()).hexdigest()
@@ -6,6 +6,14 @@ vision middleware can inject them into the LLM conversation as
 
 Unlike the web-app version, there are no proxy URL helpers here — the
 agent outputs ``/api/images/...`` URLs that the web app proxy will serve.
+
+The convert functions store a resized WebP copy of each image under
+``vision/``; downloads prefer it over the full-resolution original.
+
+Downloads go through a byte-budgeted LRU cache (``agent.image_cache``), so an
+image referenced on every turn of a conversation is fetched once.  Hits,
+misses and bytes served are exported as OTel metrics
+(``kb_agent.image_cache.*``).
 """
 
 from __future__ import annotations
@@ -13,25 +21,91 @@ from __future__ import annotations
 import logging
 import mimetypes
 from dataclasses import dataclass
+from pathlib import PurePosixPath
 from urllib.parse import quote
 
-from azure.storage.blob import BlobServiceClient
+from azure.core import MatchConditions
+from azure.core.exceptions import ResourceNotFoundError, ResourceNotModifiedError
+from azure.storage.blob.aio import BlobClient, BlobServiceClient
+from opentelemetry import metrics
+from opentelemetry.metrics import CallbackOptions, Observation
 
-from agent.client_factories import create_blob_service_client
+from agent.client_factories import create_async_blob_service_client
 from agent.config import config
+from agent.image_cache import CachedImage, ImageCache
 
 logger = logging.getLogger(__name__)
+meter = metrics.get_meter(__name__)
+
+# Vision derivatives written by the convert functions (see
+# shared/vision_images.py in src/functions).
+VISION_PREFIX = "vision"
+VISION_SUFFIX = ".webp"
 
 _blob_service_client: BlobServiceClient | None = None
+_image_cache: ImageCache | None = None
+
+_hits_counter = meter.create_counter(
+    "kb_agent.image_cache.hits",
+    unit="{lookup}",
+    description="Vision images served from the image cache",
+)
+_misses_counter = meter.create_counter(
+    "kb_agent.image_cache.misses",
+    unit="{lookup}",
+    description="Vision images that required a blob download",
+)
+_bytes_served_counter = meter.create_counter(
+    "kb_agent.image_cache.bytes_served",
+    unit="By",
+    description="Vision image bytes handed to the middleware (source=cache|blob)",
+)
 
 
 def _get_blob_service_client() -> BlobServiceClient:
     global _blob_service_client
     if _blob_service_client is None:
-        _blob_service_client = create_blob_service_client(config.serving_blob_endpoint)
+        _blob_service_client = create_async_blob_service_client(config.serving_blob_endpoint)
     return _blob_service_client
 
 
+def _get_image_cache() -> ImageCache:
+    global _image_cache
+    if _image_cache is None:
+        _image_cache = ImageCache(
+            max_bytes=config.image_cache_max_bytes,
+            revalidate_seconds=config.image_cache_revalidate_seconds,
+            disk_dir=config.image_cache_disk_dir or None,
+            disk_max_bytes=config.image_cache_disk_max_bytes,
+        )
+    return _image_cache
+
+
+def _observe_hit_ratio(options: CallbackOptions):
+    if _image_cache is not None:
+        yield Observation(_image_cache.hit_ratio)
+
+
+def _observe_resident_bytes(options: CallbackOptions):
+    if _image_cache is not None:
+        yield Observation(_image_cache.memory_bytes, {"tier": "memory"})
+        yield Observation(_image_cache.disk_bytes, {"tier": "disk"})
+
+
+meter.create_observable_gauge(
+    "kb_agent.image_cache.hit_ratio",
+    callbacks=[_observe_hit_ratio],
+    unit="1",
+    description="Fraction of vision image lookups served from the image cache",
+)
+meter.create_observable_gauge(
+    "kb_agent.image_cache.resident_bytes",
+    callbacks=[_observe_resident_bytes],
+    unit="By",
+    description="Bytes held by the image cache (tier=memory|disk)",
+)
+
+
 # ---------------------------------------------------------------------------
 # Image download (used by the vision middleware)
 # ---------------------------------------------------------------------------
@@ -43,30 +117,89 @@ class ImageBlob:
     content_type: str
 
 
-def download_image(article_id: str, image_path: str) -> ImageBlob | None:
+async def download_image_async(article_id: str, image_path: str) -> ImageBlob | None:
     """Download an image blob from the serving container.
 
+    Prefers the vision derivative written at convert time
+    (``{article_id}/vision/{image_path}`` as WebP) and falls back to the
+    original for articles converted before derivatives existed.
+
+    Served from the image cache when possible; entries past the
+    revalidation interval are checked with ``If-None-Match`` first.  A
+    cached original is revalidated only after the derivative is looked up
+    again, so images converted since they were cached switch over.
     Returns ``None`` if the blob does not exist or cannot be read.
     """
     blob_path = f"{article_id}/{image_path}"
+    cache = _get_image_cache()
+    cached = cache.get(blob_path)
+    if cached is not None and not cache.needs_revalidation(cached):
+        return _served_from_cache(cache, cached)
+
+    vision_path = vision_blob_path(article_id, image_path)
     try:
-        blob_client = _get_blob_service_client().get_blob_client(
-            container=config.serving_container_name,
-            blob=blob_path,
-        )
-        download = blob_client.download_blob()
-        data = download.readall()
+        download = None
+        if cached is None or cached.source != vision_path:
+            # Also upgrades an original cached before its derivative existed.
+            try:
+                download = await _blob_client(vision_path).download_blob()
+                source = vision_path
+            except ResourceNotFoundError:
+                pass
+        if download is None and cached is not None:
+            try:
+                download = await _blob_client(cached.source).download_blob(
+                    etag=cached.etag,
+                    match_condition=MatchConditions.IfModified,
+                )
+                source = cached.source
+            except ResourceNotModifiedError:
+                cache.mark_validated(cached)
+                return _served_from_cache(cache, cached)
+        elif download is None:
+            source = blob_path
+            download = await _blob_client(source).download_blob()
+        data = await download.readall()
         content_type = (
             download.properties.content_settings.content_type
-            or mimetypes.guess_type(image_path)[0]
+            or mimetypes.guess_type(source)[0]
             or "application/octet-stream"
         )
-        logger.debug("Downloaded blob %s (%d bytes)", blob_path, len(data))
-        return ImageBlob(data=data, content_type=content_type)
+        logger.debug("Downloaded blob %s (%d bytes)", source, len(data))
     except Exception:
         logger.warning("Failed to download blob %s", blob_path, exc_info=True)
         return None
 
+    cache.record_lookup(hit=False)
+    _misses_counter.add(1)
+    _bytes_served_counter.add(len(data), {"source": "blob"})
+    cache.put(blob_path, data=data, content_type=content_type, etag=download.properties.etag or "", source=source)
+    return ImageBlob(data=data, content_type=content_type)
+
+
+def vision_blob_path(article_id: str, image_path: str) -> str:
+    """Blob path of the vision derivative for an article image.
+
+    Mirrors ``shared.vision_images.vision_image_path`` in the ingestion
+    functions: ``images/arch.png`` → ``vision/images/arch.webp``.
+    """
+    derivative = PurePosixPath(VISION_PREFIX) / PurePosixPath(image_path).with_suffix(VISION_SUFFIX)
+    return f"{article_id}/{derivative}"
+
+
+def _blob_client(blob_path: str) -> BlobClient:
+    return _get_blob_service_client().get_blob_client(
+        container=config.serving_container_name,
+        blob=blob_path,
+    )
+
+
+def _served_from_cache(cache: ImageCache, cached: CachedImage) -> ImageBlob:
+    cache.record_lookup(hit=True)
+    _hits_counter.add(1)
+    _bytes_served_counter.add(cached.size, {"source": "cache"})
+    return ImageBlob(data=cached.data, content_type=cached.content_type)
+
 
 # ---------------------------------------------------------------------------
 # Image URL helpers (for tool output — web app proxy URLs)
@@ -1,14 +1,14 @@
 """Internal Search Agent — conversational agent using Microsoft Agent Framework.
 
-Uses gpt-4.1 via ``OpenAIChatCompletionClient`` and ``Agent`` with a single
-``search_knowledge_base`` function tool to answer knowledge-base questions
+Uses gpt-4.1 via ``OpenAIChatCompletionClient`` and ``Agent`` with the
+``search_knowledge_base`` function tool (plus its batched
+``search_knowledge_base_multi`` variant) to answer knowledge-base questions
 grounded in Azure AI Search results.  Scoped to topics defined in
 ``config/internal-search-agent.yaml``.
 
 Exports a ``create_agent()`` factory used by the hosting adapter (``main.py``).
 """
 
-import json
 import logging
 from dataclasses import dataclass, field
 from functools import lru_cache
@@ -22,15 +22,19 @@ from agent_framework import (
     Agent,
     CompactionProvider,
     FunctionInvocationContext,
+    FunctionTool,
     InMemoryHistoryProvider,
     SlidingWindowStrategy,
     ToolResultCompactionStrategy,
+    tool,
 )
 
 from agent.client_factories import create_chat_client
 from agent.image_service import get_image_url
+from agent.result_packing import pack_results
 from agent.scope_config import AgentScopeConfig, load_scope_config
-from agent.search_tool import SearchResult, build_security_filter, search_kb
+from agent.search_tool import SearchResult, build_security_filter, search_kb_async, search_kb_multi_async
+from agent.tool_results import SearchToolResult, render_tool_result
 from agent.security_middleware import SecurityFilterMiddleware
 from agent.vision_middleware import VisionImageMiddleware
 from agent.config import config
@@ -39,6 +43,9 @@ logger = logging.getLogger(__name__)
 _PROMPTS_DIR = Path(__file__).with_name("prompts")
 _SCOPE_CONFIG = load_scope_config("internal-search-agent.yaml")
 
+# Upper bound on rephrasings accepted by ``search_knowledge_base_multi``.
+MAX_SEARCH_QUERIES = 4
+
 
 def _resolve_prompt_environment(environment: str | None = None) -> str:
     normalized = (environment or config.environment or "prod").strip().lower()
@@ -62,6 +69,14 @@ def _coerce_search_query(value: Any) -> str:
     return normalized
 
 
+def _coerce_search_queries(value: Any) -> list[str]:
+    items = value if isinstance(value, list) else [value]
+    normalized = [query for query in (_normalize_search_query(item) for item in items) if query]
+    if not normalized:
+        raise ValueError("Search queries were missing or malformed.")
+    return normalized[:MAX_SEARCH_QUERIES]
+
+
 @lru_cache(maxsize=2)
 def _load_system_prompt(environment: str | None = None) -> str:
     """Load the agent system prompt from the external prompt file."""
@@ -133,7 +148,7 @@ class AgentResponse:
 # ---------------------------------------------------------------------------
 
 
-def search_knowledge_base(
+async def search_knowledge_base(
     query: Annotated[
         str,
         BeforeValidator(_coerce_search_query),
@@ -141,17 +156,66 @@ def search_knowledge_base(
     ],
     ctx: FunctionInvocationContext | None = None,
     **kwargs,
-) -> str:
+) -> SearchToolResult:
     """Search the knowledge base for articles about Azure services, features, and how-to guides.
 
     Returns relevant text chunks with optional images.
     """
     normalized_query = _normalize_search_query(query)
     if not normalized_query:
-        return json.dumps({"error": "Search query was missing or malformed."})
+        return SearchToolResult.failure("Search query was missing or malformed.")
 
     logger.info("search_knowledge_base(query='%s')", normalized_query[:80])
 
+    security_filter = _resolve_security_filter(ctx, kwargs)
+
+    try:
+        results: list[SearchResult] = await search_kb_async(normalized_query, security_filter=security_filter)
+    except Exception:
+        logger.error("search_kb execution failed", exc_info=True)
+        return SearchToolResult.failure("Search failed. Please try again.")
+
+    return _format_search_payload(results)
+
+
+async def search_knowledge_base_multi(
+    queries: Annotated[
+        list[str],
+        BeforeValidator(_coerce_search_queries),
+        "Up to 4 rephrasings of the same information need, each in natural language",
+    ],
+    ctx: FunctionInvocationContext | None = None,
+    **kwargs,
+) -> SearchToolResult:
+    """Search the knowledge base with several rephrasings of one question in a single call.
+
+    Use instead of repeated searches when one query may miss relevant articles.
+    Returns one merged, ranked list of text chunks with optional images.
+    """
+    normalized_queries = [q for q in (_normalize_search_query(query) for query in queries) if q]
+    if not normalized_queries:
+        return SearchToolResult.failure("Search queries were missing or malformed.")
+
+    logger.info(
+        "search_knowledge_base_multi(queries=%s)",
+        [query[:80] for query in normalized_queries[:MAX_SEARCH_QUERIES]],
+    )
+
+    security_filter = _resolve_security_filter(ctx, kwargs)
+
+    try:
+        results: list[SearchResult] = await search_kb_multi_async(
+            normalized_queries[:MAX_SEARCH_QUERIES],
+            security_filter=security_filter,
+        )
+    except Exception:
+        logger.error("search_kb_multi execution failed", exc_info=True)
+        return SearchToolResult.failure("Search failed. Please try again.")
+
+    return _format_search_payload(results)
+
+
+def _resolve_security_filter(ctx: FunctionInvocationContext | None, kwargs: dict[str, Any]) -> str | None:
     # Build OData filter from departments injected by SecurityFilterMiddleware.
     # The framework injects a FunctionInvocationContext when middleware is active;
     # fall back to direct **kwargs for unit-test convenience.
@@ -162,13 +226,15 @@ def search_knowledge_base(
     security_filter = build_security_filter(departments)
     if security_filter:
         logger.info("Applying security filter: %s", security_filter)
+    return security_filter
 
-    try:
-        results: list[SearchResult] = search_kb(normalized_query, security_filter=security_filter)
-    except Exception:
-        logger.error("search_kb execution failed", exc_info=True)
-        return json.dumps({"error": "Search failed. Please try again."})
 
+def _format_search_payload(results: list[SearchResult]) -> SearchToolResult:
+    """Build the tool payload from ranked results; ``ref_number`` follows rank order.
+
+    Chunk content is packed into ``SEARCH_RESULT_TOKEN_BUDGET`` without
+    dropping rows, so ``ref_number``/``chunk_id`` stay citable.
+    """
     result_dicts: list[dict] = []
     for idx, r in enumerate(results, start=1):
         result_dicts.append({
@@ -188,14 +254,18 @@ def search_knowledge_base(
             ] if r.image_urls else [],
         })
 
+    pack_results(result_dicts, budget_tokens=config.search_result_token_budget)
+
     # Build a top-level summary for compaction metadata
     topics = list(dict.fromkeys(r.title for r in results if r.title))
     top_summary = f"{len(results)} results covering: {', '.join(topics[:5])}"
 
-    return json.dumps(
-        {"results": result_dicts, "summary": top_summary},
-        ensure_ascii=False,
-    )
+    return SearchToolResult(results=result_dicts, summary=top_summary)
+
+
+def _search_tool(func) -> FunctionTool:
+    """Wrap a search tool so its typed result is rendered to text exactly once."""
+    return tool(func, result_parser=render_tool_result)
 
 
 def _normalize_search_query(query: str | dict[str, Any]) -> str | None:
@@ -263,7 +333,7 @@ def create_agent(*, standalone: bool = True) -> Agent:
         id=_SCOPE_CONFIG.id,
         name=_SCOPE_CONFIG.name,
         instructions=_SCOPED_PROMPT,
-        tools=[search_knowledge_base],
+        tools=[_search_tool(search_knowledge_base), _search_tool(search_knowledge_base_multi)],
         middleware=[SecurityFilterMiddleware(), VisionImageMiddleware()],
         context_providers=context_providers,
     )
@@ -0,0 +1,247 @@
+"""In-process hybrid search over a local snapshot of the kb-articles index.
+
+Selected with ``SEARCH_BACKEND=local`` for dev, CI and small knowledge bases:
+the indexed chunks are loaded into a NumPy matrix and searched without a
+network hop to AI Search.
+
+* Vector leg — chunk vectors are L2-normalized at export time, so cosine
+  similarity for every chunk is a single matrix-vector product.
+* Keyword leg — Okapi BM25 over ``title`` + ``content``.  Per-posting BM25
+  weights are precomputed at load time, so a query only sums postings.
+* Department filter — applied as a boolean row mask before ranking.
+
+Fusing the two legs (RRF) is left to ``agent.search_tool`` so both backends
+share one fusion implementation.
+
+Snapshot layout (one directory, written by :func:`write_snapshot`)::
+
+    vectors.npy   float32 [n_chunks, dimensions], memory-mapped on load
+    chunks.json   chunk documents (index fields without vectors), in row order
+
+Export a snapshot from the configured AI Search index with::
+
+    python -m agent.local_search_engine export <directory>
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import math
+import re
+from collections import Counter, defaultdict
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+VECTORS_FILE = "vectors.npy"
+CHUNKS_FILE = "chunks.json"
+VECTOR_FIELD = "content_vector"
+
+# Lucene's BM25 defaults (also used by AI Search's BM25 similarity).
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lower-case word tokens, roughly matching AI Search's standard analyzer."""
+    return _TOKEN_PATTERN.findall(text.casefold())
+
+
+class LocalSearchIndex:
+    """Read-only hybrid search index held in process memory."""
+
+    def __init__(self, vectors: np.ndarray, documents: list[dict[str, Any]]) -> None:
+        if vectors.ndim != 2 or vectors.shape[0] != len(documents):
+            raise ValueError(
+                f"Snapshot mismatch: {vectors.shape[0] if vectors.ndim else 0} vectors "
+                f"for {len(documents)} chunks"
+            )
+        self._vectors = vectors
+        self._documents = documents
+        self._row_by_id = {str(document["id"]): row for row, document in enumerate(documents)}
+        self._chunk_ids_by_article: dict[str, dict[int, str]] = defaultdict(dict)
+        for document in documents:
+            self._chunk_ids_by_article[document["article_id"]][int(document.get("chunk_index", 0))] = str(document["id"])
+        self._departments = np.array([document.get("department") or "" for document in documents], dtype=object)
+        self._postings = _build_bm25_postings(documents)
+
+    @classmethod
+    def load(cls, directory: str | Path, *, mmap: bool = True) -> LocalSearchIndex:
+        """Load a snapshot written by :func:`write_snapshot`."""
+        directory = Path(directory)
+        vectors = np.load(directory / VECTORS_FILE, mmap_mode="r" if mmap else None)
+        documents = json.loads((directory / CHUNKS_FILE).read_text(encoding="utf-8"))
+        index = cls(vectors, documents)
+        logger.info(
+            "Loaded local search snapshot from %s (%d chunks, %d dims, %d terms)",
+            directory,
+            len(documents),
+            index.dimensions,
+            len(index._postings),
+        )
+        return index
+
+    @property
+    def dimensions(self) -> int:
+        return int(self._vectors.shape[1])
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def document(self, row: int) -> dict[str, Any]:
+        return self._documents[row]
+
+    def vector(self, row: int) -> np.ndarray:
+        """The chunk's L2-normalized vector (a view into the snapshot)."""
+        return self._vectors[row]
+
+    def get(self, document_id: str) -> dict[str, Any] | None:
+        row = self._row_by_id.get(document_id)
+        return self._documents[row] if row is not None else None
+
+    def article_chunk_ids(self, article_id: str) -> dict[int, str]:
+        """``chunk_index -> id`` for every chunk of ``article_id``."""
+        return dict(self._chunk_ids_by_article.get(article_id, {}))
+
+    def department_mask(self, departments: frozenset[str] | None) -> np.ndarray | None:
+        """Boolean row mask for ``departments`` (``None`` = unfiltered)."""
+        if departments is None:
+            return None
+        return np.isin(self._departments, list(departments))
+
+    def vector_search(
+        self,
+        query_vector: list[float],
+        top: int,
+        *,
+        mask: np.ndarray | None = None,
+    ) -> list[tuple[int, float]]:
+        """Return ``(row, cosine similarity)`` for the ``top`` nearest chunks."""
+        query = np.asarray(query_vector, dtype=np.float32)
+        if query.shape != (self.dimensions,):
+            raise ValueError(f"Query vector has {query.shape[0]} dims, snapshot has {self.dimensions}")
+        norm = float(np.linalg.norm(query))
+        if norm == 0.0:
+            return []
+        scores = self._vectors @ (query / norm)
+        return _top_k(scores, top, mask)
+
+    def keyword_search(
+        self,
+        text: str,
+        top: int,
+        *,
+        mask: np.ndarray | None = None,
+    ) -> list[tuple[int, float]]:
+        """Return ``(row, BM25 score)`` for the ``top`` best keyword matches."""
+        scores = np.zeros(len(self._documents), dtype=np.float32)
+        for term in set(tokenize(text)):
+            posting = self._postings.get(term)
+            if posting is not None:
+                rows, weights = posting
+                scores[rows] += weights
+
+        matched = scores > 0
+        return _top_k(scores, top, matched if mask is None else matched & mask)
+
+
+def _build_bm25_postings(documents: list[dict[str, Any]]) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+    """Precompute ``term -> (rows, BM25 weight per row)``."""
+    term_rows: dict[str, list[int]] = defaultdict(list)
+    term_freqs: dict[str, list[int]] = defaultdict(list)
+    doc_lengths = np.zeros(len(documents), dtype=np.float32)
+
+    for row, document in enumerate(documents):
+        tokens = tokenize(f"{document.get('title') or ''} {document.get('content') or ''}")
+        doc_lengths[row] = len(tokens)
+        for term, freq in Counter(tokens).items():
+            term_rows[term].append(row)
+            term_freqs[term].append(freq)
+
+    if not documents:
+        return {}
+
+    n_docs = len(documents)
+    avg_length = float(doc_lengths.mean()) or 1.0
+    postings: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+    for term, row_list in term_rows.items():
+        rows = np.asarray(row_list, dtype=np.int64)
+        tf = np.asarray(term_freqs[term], dtype=np.float32)
+        idf = math.log(1 + (n_docs - len(rows) + 0.5) / (len(rows) + 0.5))
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_lengths[rows] / avg_length)
+        postings[term] = (rows, (idf * tf * (BM25_K1 + 1) / (tf + norm)).astype(np.float32))
+    return postings
+
+
+def _top_k(scores: np.ndarray, k: int, mask: np.ndarray | None) -> list[tuple[int, float]]:
+    """Rows of the ``k`` highest ``scores`` within ``mask``, best first (stable on ties)."""
+    candidates = np.flatnonzero(mask) if mask is not None else np.arange(len(scores))
+    if k <= 0 or len(candidates) == 0:
+        return []
+    candidate_scores = scores[candidates]
+    if k < len(candidates):
+        selected = np.argpartition(-candidate_scores, k - 1)[:k]
+        selected = selected[np.argsort(-candidate_scores[selected], kind="stable")]
+    else:
+        selected = np.argsort(-candidate_scores, kind="stable")
+    return [(int(candidates[i]), float(candidate_scores[i])) for i in selected]
+
+
+def write_snapshot(directory: str | Path, documents: Iterable[dict[str, Any]]) -> int:
+    """Write chunk documents (including ``content_vector``) as a snapshot.
+
+    Vectors are L2-normalized so search is a plain dot product.  Returns the
+    number of chunks written.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    rows: list[list[float]] = []
+    metadata: list[dict[str, Any]] = []
+    for document in documents:
+        document = dict(document)
+        vector = document.pop(VECTOR_FIELD, None)
+        if not vector:
+            raise ValueError(f"Chunk '{document.get('id')}' has no {VECTOR_FIELD}")
+        rows.append(vector)
+        metadata.append({key: value for key, value in document.items() if not key.startswith("@search.")})
+
+    vectors = np.asarray(rows, dtype=np.float32).reshape(len(rows), -1)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors /= np.where(norms == 0, 1, norms)
+
+    np.save(directory / VECTORS_FILE, vectors)
+    (directory / CHUNKS_FILE).write_text(json.dumps(metadata, ensure_ascii=False), encoding="utf-8")
+    return len(metadata)
+
+
+def _export_from_search(directory: str) -> int:
+    from agent.client_factories import create_search_client
+    from agent.search_tool import _SELECT_FIELDS
+
+    results = create_search_client().search(search_text="*", select=[*_SELECT_FIELDS, VECTOR_FIELD])
+    return write_snapshot(directory, results)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    export = subcommands.add_parser("export", help="Snapshot the configured AI Search index")
+    export.add_argument("directory")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    count = _export_from_search(args.directory)
+    logger.info("Wrote %d chunks to %s", count, args.directory)
+
+
+if __name__ == "__main__":
+    main()
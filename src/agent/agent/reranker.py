@@ -0,0 +1,173 @@
+"""Client-side rerank stage for over-fetched hybrid search results.
+
+AI Search orders a hybrid query by its fused ``@search.score`` alone, so the
+top few chunks are often near-duplicates — consecutive sections of one
+article that all match the query.  With ``SEARCH_RERANK_CANDIDATES`` set,
+:mod:`agent.search_tool` over-fetches that many candidates and
+:func:`rerank` picks the ``top`` chunks handed to the LLM:
+
+1. **Score** — a :class:`RerankScorer` assigns each candidate a relevance.
+   The default :class:`FieldBoostScorer` min-max normalizes the retrieval
+   score and boosts candidates whose ``title`` / ``section_header`` contain
+   the query terms.
+2. **Diversify** — chunks are picked greedily by Maximal Marginal
+   Relevance: relevance minus the similarity to the closest chunk already
+   picked.  Similarity is the cosine of the ``content_vector``s when every
+   candidate carries one; neighbouring chunks of one article
+   (``chunk_index`` ±1) count as duplicates either way, since consecutive
+   sections tend to repeat each other.
+3. **Dedup** — at most ``max_per_article`` chunks of one article are kept.
+
+Scoring and selection are NumPy operations over the candidate set, so the
+stage costs well under a millisecond for a few dozen candidates.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+from dataclasses import replace
+from typing import TYPE_CHECKING, Protocol
+
+import numpy as np
+
+from agent.local_search_engine import tokenize
+
+if TYPE_CHECKING:
+    from agent.search_tool import SearchResult
+
+# Weight of relevance against novelty in MMR (1.0 = relevance only).
+DEFAULT_MMR_LAMBDA = 0.7
+
+
+class RerankScorer(Protocol):
+    def score(self, query: str, results: Sequence[SearchResult]) -> np.ndarray:
+        """Return one relevance score per result (higher is better)."""
+        ...
+
+
+class FieldBoostScorer:
+    """Retrieval score plus a boost for query terms in the title and section header."""
+
+    def __init__(self, *, title_weight: float = 0.3, section_weight: float = 0.15) -> None:
+        self.title_weight = title_weight
+        self.section_weight = section_weight
+
+    def score(self, query: str, results: Sequence[SearchResult]) -> np.ndarray:
+        scores = _min_max(np.fromiter((result.score for result in results), dtype=np.float64, count=len(results)))
+        terms = set(tokenize(query))
+        if not terms:
+            return scores
+        scores += self.title_weight * _term_coverage(terms, (result.title for result in results), len(results))
+        scores += self.section_weight * _term_coverage(
+            terms, (result.section_header for result in results), len(results)
+        )
+        return scores
+
+
+def rerank(
+    query: str,
+    results: Sequence[SearchResult],
+    *,
+    top: int,
+    scorer: RerankScorer | None = None,
+    mmr_lambda: float = DEFAULT_MMR_LAMBDA,
+    max_per_article: int = 0,
+    penalize_adjacent: bool = True,
+) -> list[SearchResult]:
+    """Return the ``top`` best of ``results``, diversified and capped per article.
+
+    ``score`` on the returned results is the scorer's relevance.  A
+    ``max_per_article`` of ``0`` disables the per-article cap.  Fewer than
+    ``top`` results are returned when the cap leaves too few candidates.
+    """
+    if top <= 0 or not results:
+        return []
+
+    relevance = np.asarray((scorer or FieldBoostScorer()).score(query, results), dtype=np.float64)
+    _, articles = np.unique([result.article_id for result in results], return_inverse=True)
+    similarity = _similarity_matrix(results)
+    if penalize_adjacent:
+        adjacency = _adjacency_matrix(results, articles)
+        similarity = adjacency if similarity is None else np.maximum(similarity, adjacency)
+
+    selected = _select(
+        relevance,
+        similarity,
+        articles,
+        top=top,
+        mmr_lambda=mmr_lambda,
+        max_per_article=max_per_article,
+    )
+    return [replace(results[index], score=float(relevance[index])) for index in selected]
+
+
+def _select(
+    relevance: np.ndarray,
+    similarity: np.ndarray | None,
+    articles: np.ndarray,
+    *,
+    top: int,
+    mmr_lambda: float,
+    max_per_article: int,
+) -> list[int]:
+    """Greedy MMR selection honouring the per-article cap."""
+    count = len(relevance)
+    gain = _min_max(relevance)
+    available = np.ones(count, dtype=bool)
+    per_article = np.zeros(int(articles.max()) + 1, dtype=np.int64)
+    # Similarity of each candidate to its closest already-selected chunk.
+    redundancy = np.zeros(count, dtype=np.float64)
+
+    selected: list[int] = []
+    while len(selected) < top and available.any():
+        objective = gain if similarity is None else mmr_lambda * gain - (1 - mmr_lambda) * redundancy
+        index = int(np.argmax(np.where(available, objective, -np.inf)))
+        selected.append(index)
+        available[index] = False
+
+        article = articles[index]
+        per_article[article] += 1
+        if max_per_article > 0 and per_article[article] >= max_per_article:
+            available &= articles != article
+        if similarity is not None:
+            np.maximum(redundancy, similarity[index], out=redundancy)
+    return selected
+
+
+def _similarity_matrix(results: Sequence[SearchResult]) -> np.ndarray | None:
+    """Pairwise cosine similarity of the candidates' vectors, if all have one."""
+    vectors = [result.content_vector for result in results]
+    if any(vector is None or len(vector) == 0 for vector in vectors):
+        return None
+    if len({len(vector) for vector in vectors}) != 1:
+        return None
+
+    matrix = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix /= np.where(norms == 0, 1, norms)
+    return (matrix @ matrix.T).astype(np.float64)
+
+
+def _adjacency_matrix(results: Sequence[SearchResult], articles: np.ndarray) -> np.ndarray:
+    """``1.0`` where two candidates are neighbouring chunks of the same article."""
+    chunk_index = np.fromiter((result.chunk_index for result in results), dtype=np.int64, count=len(results))
+    same_article = articles[:, None] == articles[None, :]
+    neighbours = np.abs(chunk_index[:, None] - chunk_index[None, :]) == 1
+    return (same_article & neighbours).astype(np.float64)
+
+
+def _term_coverage(terms: set[str], fields: Iterable[str], count: int) -> np.ndarray:
+    """Fraction of the query ``terms`` that occur in each field."""
+    return np.fromiter(
+        (len(terms.intersection(tokenize(text or ""))) / len(terms) for text in fields),
+        dtype=np.float64,
+        count=count,
+    )
+
+
+def _min_max(values: np.ndarray) -> np.ndarray:
+    """Scale to ``[0, 1]``; constant input maps to all ones."""
+    low, high = float(values.min()), float(values.max())
+    if high - low <= 0.0:
+        return np.ones_like(values, dtype=np.float64)
+    return (values - low) / (high - low)
@@ -0,0 +1,91 @@
+"""Fit search tool results into a prompt token budget.
+
+Chunks are split on article sections, so a handful of long sections can
+dominate the prompt and the model's time-to-first-token.  :func:`pack_results`
+walks the ranked rows and keeps full ``content`` while it fits the budget.
+The first row that overflows is truncated to whatever budget is left, and
+the indexed ``summary`` stands in for the content of every row after it.
+
+Rows are never dropped or reordered, so ``ref_number`` and ``chunk_id`` stay
+stable for citations.  Rows whose content was replaced record how in
+``content_source`` (``summary``, ``truncated`` or ``omitted``).
+
+Token counts are estimated at four characters per token
+(:class:`EstimatingTokenizer`).  The budget is a latency guard rather than a
+hard context limit, so the estimate is close enough and needs no tokenizer
+download; an exact :class:`Tokenizer` can be passed to :func:`pack_results`.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Any, Protocol
+
+# Truncating to fewer tokens than this leaves nothing useful; the summary
+# stands in instead.
+_MIN_TRUNCATED_TOKENS = 64
+_ELLIPSIS = "…"
+
+
+class Tokenizer(Protocol):
+    def count_tokens(self, text: str) -> int: ...
+
+    def truncate(self, text: str, max_tokens: int) -> str: ...
+
+
+class EstimatingTokenizer:
+    """Four characters per token — close enough for English prose."""
+
+    CHARS_PER_TOKEN = 4
+
+    def count_tokens(self, text: str) -> int:
+        return math.ceil(len(text) / self.CHARS_PER_TOKEN)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        return text[: max_tokens * self.CHARS_PER_TOKEN]
+
+
+def pack_results(
+    rows: list[dict[str, Any]],
+    *,
+    budget_tokens: int,
+    tokenizer: Tokenizer | None = None,
+) -> list[dict[str, Any]]:
+    """Fit the rows' ``content`` into ``budget_tokens``, in rank order.
+
+    The first row that does not fit is truncated to the remaining budget
+    when that leaves a useful amount of text; every later row falls back to
+    its summary (capped at ~100 tokens at index time), or to no content when
+    it has none.  Rows are updated in place and returned.  A budget of ``0``
+    disables packing.  ``tokenizer`` defaults to :class:`EstimatingTokenizer`.
+    """
+    if budget_tokens <= 0:
+        return rows
+
+    tokenizer = tokenizer or EstimatingTokenizer()
+    remaining = budget_tokens
+    for row in rows:
+        content = row.get("content") or ""
+        tokens = tokenizer.count_tokens(content)
+        if tokens <= remaining:
+            remaining -= tokens
+            continue
+
+        if remaining >= _MIN_TRUNCATED_TOKENS:
+            row["content"] = _truncate(tokenizer, content, remaining)
+            row["content_source"] = "truncated"
+        else:
+            summary = row.get("summary") or ""
+            row["content"] = summary
+            row["content_source"] = "summary" if summary else "omitted"
+        remaining = 0
+    return rows
+
+
+def _truncate(tokenizer: Tokenizer, text: str, max_tokens: int) -> str:
+    truncated = tokenizer.truncate(text, max_tokens - 1)
+    # Cut back to a word boundary so the model never sees half a word.
+    boundary = truncated.rfind(" ")
+    if boundary > len(truncated) // 2:
+        truncated = truncated[:boundary]
+    return truncated.rstrip() + _ELLIPSIS
@@ -0,0 +1,177 @@
+"""Short-lived cache of projected search results.
+
+Bursty FAQ traffic re-issues identical searches across users of the same
+department.  The projected ``SearchResult`` list for a search leg is cached
+for a short TTL, keyed by the query-vector digest, the normalized search
+text, ``top`` and the OData security filter.
+
+The security filter is the first component of every key, so entries are
+partitioned by the department filter produced by ``build_security_filter``
+and a lookup can only ever hit results computed under the exact same filter.
+
+Entries are also dropped wholesale when the index's ``indexed_at``
+watermark advances (see :meth:`SearchResultCache.advance_watermark`), so a
+re-index is visible well before the TTL lapses.
+
+Hit/miss/invalidation counts are exported as OTel metrics
+(``kb_agent.search_result_cache.*``).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import time
+from array import array
+from collections.abc import Callable, Sequence
+from typing import TYPE_CHECKING
+
+from opentelemetry import metrics
+
+from agent.embedding_cache import normalize_query
+from agent.ttl_cache import TTLCache
+
+if TYPE_CHECKING:
+    from agent.search_tool import SearchResult
+
+logger = logging.getLogger(__name__)
+meter = metrics.get_meter(__name__)
+
+_hits_counter = meter.create_counter(
+    "kb_agent.search_result_cache.hits",
+    unit="{lookup}",
+    description="Search legs served from the result cache",
+)
+_misses_counter = meter.create_counter(
+    "kb_agent.search_result_cache.misses",
+    unit="{lookup}",
+    description="Search legs that required an AI Search query",
+)
+_invalidations_counter = meter.create_counter(
+    "kb_agent.search_result_cache.invalidations",
+    unit="{invalidation}",
+    description="Result cache flushes caused by an advancing indexed_at watermark",
+)
+
+ResultCacheKey = tuple[str, str, str, int]
+
+
+def vector_digest(vector: Sequence[float] | None) -> str:
+    """Stable digest of a query vector (empty string for keyword-only legs)."""
+    if vector is None:
+        return ""
+    return hashlib.sha256(array("d", vector).tobytes()).hexdigest()
+
+
+class SearchResultCache:
+    """TTL + LRU cache of search results, partitioned by security filter."""
+
+    def __init__(
+        self,
+        *,
+        max_entries: int,
+        ttl_seconds: float,
+        watermark_interval_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._entries: TTLCache[ResultCacheKey, list[SearchResult]] = TTLCache(
+            max_entries,
+            ttl_seconds,
+            clock=clock,
+        )
+        self._watermark_interval_seconds = max(0.0, watermark_interval_seconds)
+        self._clock = clock
+        self._watermark: str | None = None
+        self._watermark_count: int | None = None
+        self._watermark_checked_at: float | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._entries.enabled
+
+    @property
+    def watermark(self) -> str | None:
+        return self._watermark
+
+    @staticmethod
+    def make_key(
+        *,
+        security_filter: str | None,
+        search_text: str | None,
+        query_vector: Sequence[float] | None,
+        top: int,
+    ) -> ResultCacheKey:
+        return (
+            security_filter or "",
+            normalize_query(search_text) if search_text else "",
+            vector_digest(query_vector),
+            top,
+        )
+
+    def get(self, key: ResultCacheKey) -> list[SearchResult] | None:
+        """Return a copy of the cached result list, or ``None`` on a miss."""
+        if not self.enabled:
+            return None
+        results = self._entries.get(key)
+        if results is None:
+            _misses_counter.add(1)
+            return None
+        _hits_counter.add(1)
+        return list(results)
+
+    def put(self, key: ResultCacheKey, results: Sequence[SearchResult]) -> None:
+        self._entries.set(key, list(results))
+
+    def watermark_check_due(self) -> bool:
+        """Return ``True`` (and claim the check) when the watermark should be probed.
+
+        Claiming up front means concurrent searches on the event loop trigger
+        at most one probe per interval.
+        """
+        if not self.enabled or self._watermark_interval_seconds <= 0:
+            return False
+        now = self._clock()
+        if (
+            self._watermark_checked_at is not None
+            and now - self._watermark_checked_at < self._watermark_interval_seconds
+        ):
+            return False
+        self._watermark_checked_at = now
+        return True
+
+    def advance_watermark(self, indexed_at: str, count: int | None = None) -> bool:
+        """Record the newest ``indexed_at`` seen in the index, flushing cached results.
+
+        ``count`` is how many documents carry ``indexed_at`` (``None`` when
+        unknown).  fn-index stamps every chunk of a run with one timestamp,
+        so chunks that land after the watermark was recorded change the count
+        rather than the timestamp.  A newer timestamp, or a different count at
+        the same one, invalidates the cache.
+
+        ``indexed_at`` values are ISO-8601 UTC timestamps, so lexical order is
+        chronological.  Returns ``True`` when the cache was invalidated.
+        """
+        previous, previous_count = self._watermark, self._watermark_count
+        if previous is not None and indexed_at < previous:
+            return False
+        if indexed_at == previous:
+            if count is None or previous_count is None or count == previous_count:
+                self._watermark_count = previous_count if count is None else count
+                return False
+        self._watermark = indexed_at
+        self._watermark_count = count
+        if previous is None:
+            return False
+        self._entries.clear()
+        _invalidations_counter.add(1)
+        logger.info(
+            "Index watermark advanced %s (%s docs) → %s (%s docs); search result cache cleared",
+            previous,
+            previous_count,
+            indexed_at,
+            count,
+        )
+        return True
+
+    def clear(self) -> None:
+        self._entries.clear()
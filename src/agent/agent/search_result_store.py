@@ -4,6 +4,12 @@ The live ``search_knowledge_base`` tool returns full chunk content so the agent
 answer with grounded context. When sessions are persisted, that payload is reduced
 to a compact citation-friendly form that preserves stable chunk handles plus
 summary text for resumed UI rendering.
+
+Every save serializes the whole session again, so compacted payloads are
+tagged with a leading ``"compacted"`` version marker.  A tool message whose
+payload carries the marker was compacted by an earlier save and is skipped
+without parsing its JSON, so each save only does real work for the tool
+messages added since the last one.
 """
 
 from __future__ import annotations
@@ -12,13 +18,23 @@ import json
 import re
 from typing import Any, Iterator
 
+from agent.tool_results import parse_tool_result
+
 SEARCH_TOOL_NAME = "search_knowledge_base"
+MULTI_SEARCH_TOOL_NAME = "search_knowledge_base_multi"
 WEB_SEARCH_TOOL_NAME = "web_search"
 _MAX_PREVIEW_CHARS = 280
 _MARKDOWN_IMAGE_PATTERN = re.compile(r"!\[[^\]]*\]\([^)]*\)")
 _INDEXED_IMAGE_PATTERN = re.compile(r"\[Image:\s*[^\]]+\]\([^)]*\)", re.IGNORECASE)
 _WHITESPACE_PATTERN = re.compile(r"\s+")
 
+# Bump to have payloads compacted by older code compacted again.
+_COMPACTION_VERSION = 1
+_COMPACTED_KEY = "compacted"
+# Compacted payloads are serialized with the marker first, so a stored JSON
+# string can be recognised by its prefix.
+_COMPACTED_PREFIX = json.dumps({_COMPACTED_KEY: _COMPACTION_VERSION})[:-1] + ","
+
 
 def compact_serialized_session_for_storage(serialized_session: Any) -> Any:
     """Return a storage-safe copy of the serialized session.
@@ -43,8 +59,42 @@ def find_citation_reference(
     ref_number: int,
 ) -> dict[str, Any] | None:
     """Resolve a compact stored citation row from a serialized session."""
+    for stored_tool_call_id, results in _iter_search_tool_results(serialized_session):
+        if stored_tool_call_id != tool_call_id:
+            continue
+
+        for index, row in enumerate(results, start=1):
+            compact_row = _compact_search_result_row(row, index=index)
+            if compact_row.get("ref_number") == ref_number:
+                return compact_row
+
+    return None
+
+
+def find_citation_references(
+    serialized_session: Any,
+    *,
+    tool_call_id: str | None = None,
+) -> dict[str, list[dict[str, Any]]]:
+    """Resolve every compact stored citation row in one pass over the session.
+
+    Returns rows grouped by tool call id, in transcript order.  When
+    ``tool_call_id`` is given only that tool call's rows are returned.
+    """
+    references: dict[str, list[dict[str, Any]]] = {}
+    for stored_tool_call_id, results in _iter_search_tool_results(serialized_session):
+        if tool_call_id is not None and stored_tool_call_id != tool_call_id:
+            continue
+        references.setdefault(stored_tool_call_id, []).extend(
+            _compact_search_result_row(row, index=index)
+            for index, row in enumerate(results, start=1)
+        )
+    return references
+
+
+def _iter_search_tool_results(serialized_session: Any) -> Iterator[tuple[str, list[Any]]]:
     if not isinstance(serialized_session, dict):
-        return None
+        return
 
     for messages in _iter_message_lists(serialized_session):
         for message in messages:
@@ -59,7 +109,7 @@ def find_citation_reference(
                 or (function_result_content.get("call_id") if function_result_content else "")
                 or ""
             )
-            if stored_tool_call_id != tool_call_id:
+            if not stored_tool_call_id:
                 continue
 
             payload = _parse_message_payload(message)
@@ -70,12 +120,7 @@ def find_citation_reference(
             if not isinstance(results, list):
                 continue
 
-            for index, row in enumerate(results, start=1):
-                compact_row = _compact_search_result_row(row, index=index)
-                if compact_row.get("ref_number") == ref_number:
-                    return compact_row
-
-    return None
+            yield stored_tool_call_id, results
 
 
 def _iter_message_lists(serialized_session: dict[str, Any]) -> Iterator[list[Any]]:
@@ -107,6 +152,8 @@ def _compact_search_tool_message(message: Any) -> None:
     payload_target, target_field, original_value = _get_message_payload_target(message)
     if target_field is None or payload_target is None:
         return
+    if _is_compacted(original_value):
+        return
 
     payload = _coerce_payload(original_value)
     if not _is_search_tool_message(message, payload):
@@ -117,11 +164,35 @@ def _compact_search_tool_message(message: Any) -> None:
         return
 
     if isinstance(original_value, str):
-        payload_target[target_field] = json.dumps(compacted_payload, ensure_ascii=False)
+        compacted_text = json.dumps(compacted_payload, ensure_ascii=False)
+        payload_target[target_field] = compacted_text
+        _replace_text_items(payload_target, compacted_text)
     else:
         payload_target[target_field] = compacted_payload
 
 
+def _is_compacted(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.startswith(_COMPACTED_PREFIX)
+    return isinstance(value, dict) and value.get(_COMPACTED_KEY) == _COMPACTION_VERSION
+
+
+def _replace_text_items(content: dict[str, Any], text: str) -> None:
+    """Keep a ``function_result``'s ``items`` in step with its compacted ``result``.
+
+    The framework stores the tool output twice: as ``items`` and as their
+    concatenated text in ``result``.
+    """
+    items = content.get("items")
+    if not isinstance(items, list):
+        return
+    text_items = [item for item in items if isinstance(item, dict) and item.get("type") == "text"]
+    if not text_items:
+        return
+    kept = [item for item in items if not (isinstance(item, dict) and item.get("type") == "text")]
+    content["items"] = [{**text_items[0], "text": text}, *kept]
+
+
 def _get_message_payload_field(message: dict[str, Any]) -> tuple[str | None, Any]:
     for field in ("content", "result", "output"):
         if field in message:
@@ -178,11 +249,7 @@ def _coerce_payload(value: Any) -> dict[str, Any] | None:
     if not isinstance(value, str):
         return None
 
-    try:
-        parsed = json.loads(value)
-    except json.JSONDecodeError:
-        return None
-
+    parsed = parse_tool_result(value)
     return parsed if isinstance(parsed, dict) else None
 
 
@@ -192,7 +259,7 @@ def _is_search_tool_message(message: dict[str, Any], payload: dict[str, Any] | N
         function_result_content = _get_function_result_content(message)
         if function_result_content:
             tool_name = function_result_content.get("name")
-    if tool_name == SEARCH_TOOL_NAME:
+    if tool_name in (SEARCH_TOOL_NAME, MULTI_SEARCH_TOOL_NAME):
         return True
 
     if tool_name == WEB_SEARCH_TOOL_NAME:
@@ -231,6 +298,7 @@ def _compact_search_payload(payload: dict[str, Any]) -> dict[str, Any] | None:
 
     top_summary = _as_string(payload.get("summary")) or _build_top_summary(compacted_results)
     compacted_payload: dict[str, Any] = {
+        _COMPACTED_KEY: _COMPACTION_VERSION,
         "results": compacted_results,
         "summary": top_summary,
     }
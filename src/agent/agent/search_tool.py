@@ -2,30 +2,94 @@
 
 Embeds the user query with ``text-embedding-3-small`` and performs a hybrid search
 (vector similarity on ``content_vector`` + keyword search on ``content``).
+
+With ``SEARCH_BACKEND=local`` the same functions are served in-process from a
+snapshot of the index (see :mod:`agent.local_search_engine`); query embedding
+still goes through the configured embedding backend.
+
+Projected results of each async search leg are held briefly in a
+:class:`~agent.search_result_cache.SearchResultCache`, partitioned by the
+security filter and flushed when the index's ``indexed_at`` watermark advances.
+
+When ``SEARCH_OVERLAP_EMBEDDING`` is enabled the async path issues the
+keyword-only leg while the query is still being embedded, then runs the
+vector leg and fuses both client-side with Reciprocal Rank Fusion (the same
+fusion AI Search applies to hybrid queries).  With a non-zero
+``SEARCH_EMBEDDING_BUDGET_MS`` the keyword results are returned on their own
+when the embedding backend is slower than the budget.
+
+With ``SEARCH_RERANK_CANDIDATES`` set, every search over-fetches that many
+candidates and :func:`agent.reranker.rerank` picks the ``top`` returned to
+the caller (field boosts, MMR diversification, per-article cap).  The result
+cache holds the candidates, so a rerank never needs a second query.  MMR
+compares chunk vectors only when they are returned: always on the local
+backend, and from AI Search with ``SEARCH_SELECT_VECTORS``.
+
+With ``SEARCH_EXPAND_ADJACENT`` the async searches return each hit together
+with its neighbouring chunks (see :func:`expand_adjacent_chunks_async`).
 """
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import re
-from dataclasses import dataclass, field
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
 
+import numpy as np
 from opentelemetry import trace
 
 from azure.search.documents.models import VectorizedQuery
 
 from agent.client_factories import (
+    AsyncEmbeddingBackend,
     EmbeddingBackend,
+    create_async_query_embedding_backend,
+    create_async_search_client,
     create_query_embedding_backend,
     create_search_client,
 )
 from agent.config import config
+from agent.embedding_cache import EmbeddingCacheBackend, QueryEmbeddingCache, normalize_query
+from agent.reranker import RerankScorer, rerank
+from agent.search_result_cache import SearchResultCache
+from agent.ttl_cache import TTLCache
+
+if TYPE_CHECKING:
+    from agent.local_search_engine import LocalSearchIndex
 
 logger = logging.getLogger(__name__)
 tracer = trace.get_tracer(__name__)
 
 VECTOR_DIMENSIONS = config.embedding_vector_dimensions
 
+# AI Search caps ``top`` at 1000, so bulk id lookups are issued in batches of this size.
+_MAX_IDS_PER_QUERY = 1000
+
+# Articles per chunk-map query; keeps their chunks well under the ``top`` cap.
+_MAX_ARTICLES_PER_MAP_QUERY = 50
+
+# Rank constant for Reciprocal Rank Fusion — AI Search uses 60 for hybrid queries.
+RRF_K = 60
+
+_SELECT_FIELDS = [
+    "id",
+    "article_id",
+    "chunk_index",
+    "content",
+    "title",
+    "section_header",
+    "image_urls",
+    "department",
+    "summary",
+    "indexed_at",
+]
+
+_VECTOR_FIELD = "content_vector"
+
 
 @dataclass
 class SearchResult:
@@ -42,10 +106,23 @@ class SearchResult:
     indexed_at: str = ""
     image_urls: list[str] = field(default_factory=list)
     score: float = 0.0
+    # Chunk embedding, when the backend returned it; used for MMR reranking.
+    content_vector: Sequence[float] | None = field(default=None, repr=False, compare=False)
 
 
 _embedding_backend: EmbeddingBackend | None = None
+_async_embedding_backend: AsyncEmbeddingBackend | None = None
+_embedding_cache: QueryEmbeddingCache | None = None
+_result_cache: SearchResultCache | None = None
+_chunk_map_cache: TTLCache[str, dict[int, str]] | None = None
+_watermark_probe_task: asyncio.Task | None = None
+# Embeddings left running past the budget; the event loop only keeps weak
+# references to tasks, so they are held here until they finish.
+_background_embeddings: set[asyncio.Task] = set()
 _search_client = None
+_async_search_client = None
+_local_index: LocalSearchIndex | None = None
+_rerank_scorer: RerankScorer | None = None
 
 
 def _get_embedding_backend() -> EmbeddingBackend:
@@ -55,6 +132,79 @@ def _get_embedding_backend() -> EmbeddingBackend:
     return _embedding_backend
 
 
+def _get_async_embedding_backend() -> AsyncEmbeddingBackend:
+    global _async_embedding_backend
+    if _async_embedding_backend is None:
+        _async_embedding_backend = create_async_query_embedding_backend()
+    return _async_embedding_backend
+
+
+def _get_embedding_cache() -> QueryEmbeddingCache:
+    global _embedding_cache
+    if _embedding_cache is None:
+        _embedding_cache = QueryEmbeddingCache(
+            model=config.embedding_deployment_name,
+            dimensions=config.embedding_vector_dimensions,
+            max_entries=config.embedding_cache_max_entries,
+            ttl_seconds=config.embedding_cache_ttl_seconds,
+        )
+    return _embedding_cache
+
+
+def _get_result_cache() -> SearchResultCache:
+    global _result_cache
+    if _result_cache is None:
+        _result_cache = SearchResultCache(
+            max_entries=config.search_result_cache_max_entries,
+            ttl_seconds=config.search_result_cache_ttl_seconds,
+            watermark_interval_seconds=config.search_watermark_interval_seconds,
+        )
+    return _result_cache
+
+
+def _get_chunk_map_cache() -> TTLCache[str, dict[int, str]]:
+    global _chunk_map_cache
+    if _chunk_map_cache is None:
+        _chunk_map_cache = TTLCache(config.chunk_map_cache_max_entries, config.chunk_map_cache_ttl_seconds)
+    return _chunk_map_cache
+
+
+def configure_embedding_cache_backend(backend: EmbeddingCacheBackend | None) -> None:
+    """Plug in (or remove) a shared embedding cache tier used across replicas."""
+    _get_embedding_cache().set_shared_backend(backend)
+
+
+def configure_rerank_scorer(scorer: RerankScorer | None) -> None:
+    """Replace (or reset to the default) the scorer of the client-side rerank stage."""
+    global _rerank_scorer
+    _rerank_scorer = scorer
+
+
+def _candidate_count(top: int) -> int:
+    """Number of results to fetch for ``top`` — more when reranking is enabled."""
+    return max(top, config.search_rerank_candidates) if config.search_rerank_candidates > 0 else top
+
+
+def _search_select_fields() -> list[str]:
+    """Fields selected by ranked searches — plus the chunk vector when MMR can use it."""
+    if config.search_rerank_candidates > 0 and config.search_select_vectors:
+        return [*_SELECT_FIELDS, _VECTOR_FIELD]
+    return _SELECT_FIELDS
+
+
+def _rerank_results(query: str, results: list[SearchResult], top: int) -> list[SearchResult]:
+    if config.search_rerank_candidates <= 0:
+        return results
+    return rerank(
+        query,
+        results,
+        top=top,
+        scorer=_rerank_scorer,
+        mmr_lambda=config.search_mmr_lambda,
+        max_per_article=config.search_rerank_max_per_article,
+    )
+
+
 def _get_search_client():
     global _search_client
     if _search_client is None:
@@ -62,9 +212,59 @@ def _get_search_client():
     return _search_client
 
 
+def _get_async_search_client():
+    global _async_search_client
+    if _async_search_client is None:
+        _async_search_client = create_async_search_client()
+    return _async_search_client
+
+
+def _uses_local_backend() -> bool:
+    return config.search_backend == "local"
+
+
+def _get_local_index() -> LocalSearchIndex:
+    """Load the in-process snapshot on first use (``SEARCH_BACKEND=local``)."""
+    global _local_index
+    if _local_index is None:
+        from agent.local_search_engine import LocalSearchIndex
+
+        if not config.local_search_snapshot_dir:
+            raise RuntimeError("SEARCH_BACKEND=local requires LOCAL_SEARCH_SNAPSHOT_DIR")
+        _local_index = LocalSearchIndex.load(config.local_search_snapshot_dir)
+    return _local_index
+
+
 def _embed_query(query: str) -> list[float]:
-    """Embed a query string. Returns an environment-specific vector."""
+    """Embed a query string. Returns an environment-specific vector.
+
+    Vectors are served from the query-embedding cache when the normalized
+    query was embedded recently.
+    """
+    cache = _get_embedding_cache()
+    cached = cache.get(query)
+    if cached is not None:
+        logger.debug("Embedding cache hit for query (%d chars)", len(query))
+        return cached
+
     vector = _get_embedding_backend().embed([query])[0]
+    cache.put(query, vector)
+    logger.debug("Embedded query (%d chars) → %d-dim vector", len(query), len(vector))
+    return vector
+
+
+async def _embed_query_async(query: str) -> list[float]:
+    """Async counterpart of :func:`_embed_query` sharing the same cache."""
+    cached = _get_embedding_cache().get(query)
+    if cached is not None:
+        logger.debug("Embedding cache hit for query (%d chars)", len(query))
+        return cached
+    return await _embed_uncached_async(query)
+
+
+async def _embed_uncached_async(query: str) -> list[float]:
+    vector = (await _get_async_embedding_backend().embed([query]))[0]
+    _get_embedding_cache().put(query, vector)
     logger.debug("Embedded query (%d chars) → %d-dim vector", len(query), len(vector))
     return vector
 
@@ -94,19 +294,149 @@ def _normalize_security_filter_for_local_search(security_filter: str | None) ->
     return f"({joined})"
 
 
-def build_security_filter(departments: list[str]) -> str | None:
-    """Build the OData department filter used by KB search reads."""
+def build_security_filter(departments: Iterable[str]) -> str | None:
+    """Build the OData department filter used by KB search reads.
+
+    Filters are compiled once per department set.  Departments are sorted,
+    so every ordering of one set shares a filter — and a result-cache
+    partition.
+    """
+    return _compile_security_filter(frozenset(departments))
+
+
+@lru_cache(maxsize=256)
+def _compile_security_filter(departments: frozenset[str]) -> str | None:
     if not departments:
         return None
 
-    dept_list = ",".join(departments)
+    dept_list = ",".join(sorted(departments))
     return f"search.in(department, '{dept_list}', ',')"
 
 
+_DEPARTMENT_EQ_PATTERN = re.compile(r"department eq '([^']*)'")
+
+
+@lru_cache(maxsize=256)
+def _departments_from_security_filter(security_filter: str | None) -> frozenset[str] | None:
+    """Parse a department filter back into a set for the local backend.
+
+    Accepts the ``search.in`` form from :func:`build_security_filter` and its
+    dev-mode ``eq``/``or`` rewrite.  Any other filter is rejected rather than
+    silently ignored.  Parses are cached, as a request reuses one filter.
+    """
+    if not security_filter:
+        return None
+
+    match = re.fullmatch(r"search\.in\(department, '([^']*)', ','\)", security_filter)
+    if match:
+        return frozenset(part.strip() for part in match.group(1).split(",") if part.strip())
+
+    clauses = security_filter.removeprefix("(").removesuffix(")").split(" or ")
+    departments = [_DEPARTMENT_EQ_PATTERN.fullmatch(clause.strip()) for clause in clauses]
+    if all(departments):
+        return frozenset(department.group(1) for department in departments)
+
+    raise ValueError(f"Unsupported security filter for the local search backend: {security_filter}")
+
+
+def _search_local(
+    *,
+    search_text: str | None,
+    query_vector: list[float] | None,
+    top: int,
+    security_filter: str | None,
+) -> list[SearchResult]:
+    """Serve one search leg (or hybrid, fused with RRF) from the local snapshot."""
+    index = _get_local_index()
+    mask = index.department_mask(_departments_from_security_filter(security_filter))
+
+    ranked_lists: list[list[SearchResult]] = []
+    if query_vector is not None:
+        ranked_lists.append([
+            _to_search_result(index.document(row), score=score, content_vector=index.vector(row))
+            for row, score in index.vector_search(query_vector, top, mask=mask)
+        ])
+    if search_text:
+        ranked_lists.append([
+            _to_search_result(index.document(row), score=score, content_vector=index.vector(row))
+            for row, score in index.keyword_search(search_text, top, mask=mask)
+        ])
+
+    if len(ranked_lists) == 1:
+        return ranked_lists[0]
+    return reciprocal_rank_fusion(ranked_lists, top=top)
+
+
 def _escape_odata_string(value: str) -> str:
     return value.replace("'", "''")
 
 
+def _to_search_result(result, *, score: float, content_vector: Any = None) -> SearchResult:
+    """Project a raw AI Search document onto :class:`SearchResult`.
+
+    A selected ``content_vector`` is kept as a float32 array: the result cache
+    holds every over-fetched candidate, and a list of Python floats is ~8×
+    larger.
+    """
+    if content_vector is None and result.get(_VECTOR_FIELD):
+        content_vector = np.asarray(result[_VECTOR_FIELD], dtype=np.float32)
+    return SearchResult(
+        id=result["id"],
+        article_id=result["article_id"],
+        chunk_index=result.get("chunk_index", 0),
+        content=result["content"],
+        title=result.get("title", ""),
+        section_header=result.get("section_header", ""),
+        department=result.get("department", ""),
+        summary=result.get("summary", ""),
+        indexed_at=result.get("indexed_at", ""),
+        image_urls=result.get("image_urls") or [],
+        score=score,
+        content_vector=content_vector,
+    )
+
+
+def reciprocal_rank_fusion(
+    ranked_lists: Sequence[Sequence[SearchResult]],
+    *,
+    top: int,
+    k: int = RRF_K,
+) -> list[SearchResult]:
+    """Fuse ranked result lists by Reciprocal Rank Fusion.
+
+    Each chunk scores ``sum(1 / (k + rank))`` over the lists it appears in
+    (ranks are 1-based).  Duplicates collapse onto the first-seen result and
+    ties keep first-seen order, so fusion is deterministic.
+    """
+    fused: dict[str, SearchResult] = {}
+    scores: dict[str, float] = {}
+    for results in ranked_lists:
+        for rank, result in enumerate(results, start=1):
+            if result.id not in fused:
+                fused[result.id] = result
+                scores[result.id] = 0.0
+            scores[result.id] += 1.0 / (k + rank)
+
+    ordered = sorted(fused, key=lambda chunk_id: scores[chunk_id], reverse=True)
+    return [replace(fused[chunk_id], score=scores[chunk_id]) for chunk_id in ordered[:top]]
+
+
+def _record_search_request(span, query: str, top: int, security_filter: str | None) -> None:
+    span.set_attribute("search.query", query[:200])
+    span.set_attribute("search.top", top)
+    if security_filter:
+        span.set_attribute("search.filter", security_filter)
+
+
+def _log_search_results(query: str, results: list[SearchResult], top: int) -> None:
+    logger.info(
+        "Hybrid search for '%s' → %d results (top=%d)",
+        query[:80],
+        len(results),
+        top,
+    )
+
+
 def search_kb(query: str, top: int = 5, *, security_filter: str | None = None) -> list[SearchResult]:
     """Perform hybrid search (vector + keyword) against the kb-articles index.
 
@@ -131,110 +461,627 @@ def search_kb(query: str, top: int = 5, *, security_filter: str | None = None) -
 
     # Embed the query for vector search
     query_vector = _embed_query(query)
+    candidates = _candidate_count(top)
 
     vector_query = VectorizedQuery(
         vector=query_vector,
-        k=top,
-        fields="content_vector",
+        k=candidates,
+        fields=_VECTOR_FIELD,
     )
 
     with tracer.start_as_current_span("search_kb") as span:
-        span.set_attribute("search.query", query[:200])
-        span.set_attribute("search.top", top)
-        if security_filter:
-            span.set_attribute("search.filter", security_filter)
+        _record_search_request(span, query, top, security_filter)
+
+        if _uses_local_backend():
+            search_results = _search_local(
+                search_text=query,
+                query_vector=query_vector,
+                top=candidates,
+                security_filter=security_filter,
+            )
+        else:
+            results = _get_search_client().search(
+                search_text=query,
+                vector_queries=[vector_query],
+                select=_search_select_fields(),
+                top=candidates,
+                filter=security_filter,
+            )
+
+            search_results = [
+                _to_search_result(result, score=result.get("@search.score", 0.0))
+                for result in results
+            ]
+
+        search_results = _rerank_results(query, search_results, top)
+        span.set_attribute("search.result_count", len(search_results))
+
+    _log_search_results(query, search_results, top)
+    return search_results
 
-        results = _get_search_client().search(
-            search_text=query,
-            vector_queries=[vector_query],
-            select=["id", "article_id", "chunk_index", "content", "title", "section_header", "image_urls", "department", "summary", "indexed_at"],
+
+async def search_kb_async(
+    query: str,
+    top: int = 5,
+    *,
+    security_filter: str | None = None,
+) -> list[SearchResult]:
+    """Async variant of :func:`search_kb` on the aio ``SearchClient``.
+
+    Used from the agent's tool function so a slow embed or search does not
+    block the event loop shared by concurrent SSE streams.  A cached query
+    vector always goes straight to a single hybrid query; otherwise, with
+    ``search_overlap_embedding`` enabled, the keyword leg is overlapped with
+    embedding (see the module docstring).
+    """
+    if not query.strip():
+        return []
+
+    security_filter = _normalize_security_filter_for_local_search(security_filter)
+    _schedule_watermark_probe()
+
+    with tracer.start_as_current_span("search_kb") as span:
+        _record_search_request(span, query, top, security_filter)
+        candidates = _candidate_count(top)
+
+        query_vector = _get_embedding_cache().get(query)
+        if query_vector is not None or not config.search_overlap_embedding:
+            if query_vector is None:
+                query_vector = await _embed_uncached_async(query)
+            span.set_attribute("search.mode", "hybrid")
+            search_results = await _run_search_async(
+                search_text=query,
+                query_vector=query_vector,
+                top=candidates,
+                security_filter=security_filter,
+            )
+        else:
+            search_results = await _search_overlapped_async(query, candidates, security_filter, span)
+
+        search_results = _rerank_results(query, search_results, top)
+        if config.search_expand_adjacent:
+            search_results = await expand_adjacent_chunks_async(search_results, security_filter=security_filter)
+        span.set_attribute("search.result_count", len(search_results))
+
+    _log_search_results(query, search_results, top)
+    return search_results
+
+
+async def _run_search_async(
+    *,
+    search_text: str | None,
+    query_vector: list[float] | None,
+    top: int,
+    security_filter: str | None,
+) -> list[SearchResult]:
+    cache = _get_result_cache()
+    cache_key = cache.make_key(
+        security_filter=security_filter,
+        search_text=search_text,
+        query_vector=query_vector,
+        top=top,
+    )
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    if _uses_local_backend():
+        search_results = _search_local(
+            search_text=search_text,
+            query_vector=query_vector,
             top=top,
-            filter=security_filter,
+            security_filter=security_filter,
         )
+        cache.put(cache_key, search_results)
+        return search_results
 
-        search_results: list[SearchResult] = []
-        for result in results:
-            search_results.append(
-                SearchResult(
-                    id=result["id"],
-                    article_id=result["article_id"],
-                    chunk_index=result.get("chunk_index", 0),
-                    content=result["content"],
-                    title=result.get("title", ""),
-                    section_header=result.get("section_header", ""),
-                    department=result.get("department", ""),
-                    summary=result.get("summary", ""),
-                    indexed_at=result.get("indexed_at", ""),
-                    image_urls=result.get("image_urls") or [],
-                    score=result.get("@search.score", 0.0),
-                )
+    vector_queries = None
+    if query_vector is not None:
+        vector_queries = [VectorizedQuery(vector=query_vector, k=top, fields=_VECTOR_FIELD)]
+
+    results = await _get_async_search_client().search(
+        search_text=search_text,
+        vector_queries=vector_queries,
+        select=_search_select_fields(),
+        top=top,
+        filter=security_filter,
+    )
+    search_results = [
+        _to_search_result(result, score=result.get("@search.score", 0.0))
+        async for result in results
+    ]
+    cache.put(cache_key, search_results)
+    return search_results
+
+
+def _schedule_watermark_probe() -> None:
+    """Start a background ``indexed_at`` probe when one is due for the result cache."""
+    global _watermark_probe_task
+    if _uses_local_backend():
+        return
+    if _watermark_probe_task is not None and not _watermark_probe_task.done():
+        return
+    if not _get_result_cache().watermark_check_due():
+        return
+    _watermark_probe_task = asyncio.create_task(_refresh_index_watermark_async())
+
+
+async def _refresh_index_watermark_async() -> None:
+    """Advance the result-cache watermark if chunks were indexed since the last probe.
+
+    A steady-state probe is two count-only queries: documents newer than the
+    watermark, and documents stamped exactly with it.  Only when newer ones
+    exist is the newest ``indexed_at`` read, with one sorted ``top=1``
+    query; the first probe does the same to establish the watermark.  The
+    watermark only ever moves to a timestamp stored in the index, never to
+    local time: fn-index stamps a run's start time on all its chunks, and
+    chunks of that run can land after the probe, which changes the count at
+    the watermark instead.
+    """
+    cache = _get_result_cache()
+    watermark = cache.watermark
+    try:
+        if watermark is None or await _count_indexed(f"indexed_at gt '{_escape_odata_string(watermark)}'"):
+            newest = await _newest_indexed_at() or watermark or ""
+        else:
+            newest = watermark
+        count = await _count_indexed(f"indexed_at eq '{_escape_odata_string(newest)}'")
+    except Exception:
+        logger.warning("Index watermark probe failed", exc_info=True)
+        return
+
+    if cache.advance_watermark(newest, count):
+        _get_chunk_map_cache().clear()
+
+
+async def _count_indexed(filter_expression: str) -> int | None:
+    results = await _get_async_search_client().search(
+        search_text="*",
+        filter=filter_expression,
+        top=0,
+        include_total_count=True,
+    )
+    return await results.get_count()
+
+
+async def _newest_indexed_at() -> str | None:
+    results = await _get_async_search_client().search(
+        search_text="*",
+        filter="indexed_at gt ''",
+        order_by=["indexed_at desc"],
+        select=["indexed_at"],
+        top=1,
+    )
+    async for result in results:
+        return result.get("indexed_at")
+    return None
+
+
+async def _search_overlapped_async(
+    query: str,
+    top: int,
+    security_filter: str | None,
+    span,
+) -> list[SearchResult]:
+    """Run the keyword leg concurrently with embedding, then fuse with the vector leg."""
+    keyword_task = asyncio.create_task(
+        _run_search_async(search_text=query, query_vector=None, top=top, security_filter=security_filter)
+    )
+    embed_task = asyncio.create_task(_embed_uncached_async(query))
+
+    try:
+        budget_ms = config.search_embedding_budget_ms
+        done, _ = await asyncio.wait({embed_task}, timeout=budget_ms / 1000 if budget_ms > 0 else None)
+        if embed_task not in done:
+            # Let the embedding finish in the background so it still lands in
+            # the cache for the next turn; never block on it here.
+            _background_embeddings.add(embed_task)
+            embed_task.add_done_callback(_consume_background_embedding)
+            span.set_attribute("search.mode", "keyword_speculative")
+            logger.warning(
+                "Query embedding exceeded %d ms budget — returning keyword-only results",
+                budget_ms,
             )
+            return await keyword_task
+
+        query_vector = embed_task.result()
+        vector_results = await _run_search_async(
+            search_text=None,
+            query_vector=query_vector,
+            top=top,
+            security_filter=security_filter,
+        )
+        keyword_results = await keyword_task
+    except BaseException:
+        keyword_task.cancel()
+        embed_task.cancel()
+        raise
+
+    span.set_attribute("search.mode", "fused")
+    return reciprocal_rank_fusion([vector_results, keyword_results], top=top)
+
+
+def _consume_background_embedding(task: asyncio.Task) -> None:
+    _background_embeddings.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Background query embedding failed", exc_info=task.exception())
+
+
+async def search_kb_multi_async(
+    queries: Sequence[str],
+    top: int = 5,
+    *,
+    security_filter: str | None = None,
+) -> list[SearchResult]:
+    """Run several rephrasings of one question as a single batched search.
+
+    Uncached queries are embedded in one ``embed(texts)`` call, the hybrid
+    searches fan out concurrently, and the per-query rankings are fused by
+    chunk id with :func:`reciprocal_rank_fusion`.  Queries that normalize to
+    the same text are searched once.
+    """
+    by_key: dict[str, str] = {}
+    for query in queries:
+        if query.strip():
+            by_key.setdefault(normalize_query(query), query.strip())
+    unique_queries = list(by_key.values())
+    if not unique_queries:
+        return []
+
+    security_filter = _normalize_security_filter_for_local_search(security_filter)
+    _schedule_watermark_probe()
+
+    with tracer.start_as_current_span("search_kb_multi") as span:
+        span.set_attribute("search.query_count", len(unique_queries))
+        _record_search_request(span, " | ".join(unique_queries), top, security_filter)
+
+        cache = _get_embedding_cache()
+        vectors = {query: cache.get(query) for query in unique_queries}
+        missing = [query for query, vector in vectors.items() if vector is None]
+        if missing:
+            embedded = await _get_async_embedding_backend().embed(missing)
+            for query, vector in zip(missing, embedded):
+                cache.put(query, vector)
+                vectors[query] = vector
+            logger.debug("Embedded %d of %d queries in one batch", len(missing), len(unique_queries))
+
+        candidates = _candidate_count(top)
+        ranked_lists = await asyncio.gather(*(
+            _run_search_async(
+                search_text=query,
+                query_vector=vectors[query],
+                top=candidates,
+                security_filter=security_filter,
+            )
+            for query in unique_queries
+        ))
+        search_results = reciprocal_rank_fusion(ranked_lists, top=candidates)
+        search_results = _rerank_results(" ".join(unique_queries), search_results, top)
+        if config.search_expand_adjacent:
+            search_results = await expand_adjacent_chunks_async(search_results, security_filter=security_filter)
 
         span.set_attribute("search.result_count", len(search_results))
 
     logger.info(
-        "Hybrid search for '%s' → %d results (top=%d)",
-        query[:80],
+        "Batched hybrid search for %d queries → %d fused results (top=%d)",
+        len(unique_queries),
         len(search_results),
         top,
     )
     return search_results
 
 
+def _filter_chunk_by_department(
+    result,
+    document_id: str,
+    security_filter: str | None,
+    span,
+) -> SearchResult | None:
+    """Apply the department check shared by the sync and async chunk lookups."""
+    if not result:
+        span.set_attribute("search.result_count", 0)
+        return None
+
+    if security_filter:
+        security_filter = _normalize_security_filter_for_local_search(security_filter)
+        doc_department = result.get("department", "")
+        if security_filter and doc_department:
+            allowed = _check_department_access(doc_department, security_filter)
+            if not allowed:
+                span.set_attribute("search.result_count", 0)
+                logger.info("Chunk '%s' blocked by security filter", document_id)
+                return None
+
+    span.set_attribute("search.result_count", 1)
+    return _to_search_result(result, score=0.0)
+
+
 def get_chunk_by_id(document_id: str, *, security_filter: str | None = None) -> SearchResult | None:
     """Load a single chunk by its stable search document id."""
     normalized_id = document_id.strip()
     if not normalized_id:
         return None
 
-    select_fields = ["id", "article_id", "chunk_index", "content", "title", "section_header", "image_urls", "department", "summary", "indexed_at"]
-
     with tracer.start_as_current_span("get_chunk_by_id") as span:
         span.set_attribute("search.document_id", normalized_id)
 
         try:
-            result = _get_search_client().get_document(key=normalized_id, selected_fields=select_fields)
+            if _uses_local_backend():
+                result = _get_local_index().get(normalized_id)
+            else:
+                result = _get_search_client().get_document(key=normalized_id, selected_fields=_SELECT_FIELDS)
         except Exception:
             span.set_attribute("search.result_count", 0)
             logger.info("Chunk lookup for '%s' returned no results", normalized_id)
             return None
 
-        if not result:
+        return _filter_chunk_by_department(result, normalized_id, security_filter, span)
+
+
+async def get_chunk_by_id_async(
+    document_id: str,
+    *,
+    security_filter: str | None = None,
+) -> SearchResult | None:
+    """Async variant of :func:`get_chunk_by_id` on the aio ``SearchClient``."""
+    normalized_id = document_id.strip()
+    if not normalized_id:
+        return None
+
+    with tracer.start_as_current_span("get_chunk_by_id") as span:
+        span.set_attribute("search.document_id", normalized_id)
+
+        try:
+            if _uses_local_backend():
+                result = _get_local_index().get(normalized_id)
+            else:
+                result = await _get_async_search_client().get_document(
+                    key=normalized_id,
+                    selected_fields=_SELECT_FIELDS,
+                )
+        except Exception:
             span.set_attribute("search.result_count", 0)
+            logger.info("Chunk lookup for '%s' returned no results", normalized_id)
             return None
 
+        return _filter_chunk_by_department(result, normalized_id, security_filter, span)
+
+
+def _build_id_filter(document_ids: Sequence[str]) -> str:
+    """Build an OData filter matching any of ``document_ids``."""
+    return _build_in_filter("id", document_ids)
+
+
+def _build_in_filter(field_name: str, values: Sequence[str]) -> str:
+    """Build an OData filter matching ``field_name`` against any of ``values``.
+
+    Uses ``search.in`` in production and the equivalent ``eq``/``or`` form
+    for the local search simulator (see
+    :func:`_normalize_security_filter_for_local_search`) and for values that
+    contain the ``search.in`` delimiter.  Quotes are escaped in both forms.
+    """
+    if config.is_dev or any("," in value for value in values):
+        joined = " or ".join(f"{field_name} eq '{_escape_odata_string(value)}'" for value in values)
+        return f"({joined})"
+    return f"search.in({field_name}, '{','.join(_escape_odata_string(value) for value in values)}', ',')"
+
+
+def _prepare_chunk_id_batches(
+    document_ids: Sequence[str],
+    security_filter: str | None,
+) -> list[tuple[str, int]]:
+    """Return ``(filter, top)`` per batch of unique, non-empty chunk ids."""
+    unique_ids = list(dict.fromkeys(i.strip() for i in document_ids if i and i.strip()))
+    security_filter = _normalize_security_filter_for_local_search(security_filter)
+
+    batches: list[tuple[str, int]] = []
+    for start in range(0, len(unique_ids), _MAX_IDS_PER_QUERY):
+        batch = unique_ids[start:start + _MAX_IDS_PER_QUERY]
+        id_filter = _build_id_filter(batch)
         if security_filter:
-            security_filter = _normalize_security_filter_for_local_search(security_filter)
-            doc_department = result.get("department", "")
-            if security_filter and doc_department:
-                from agent.security_middleware import resolve_departments
-                allowed = _check_department_access(doc_department, security_filter)
-                if not allowed:
-                    span.set_attribute("search.result_count", 0)
-                    logger.info("Chunk '%s' blocked by security filter", normalized_id)
-                    return None
-
-        search_result = SearchResult(
-            id=result["id"],
-            article_id=result["article_id"],
-            chunk_index=result.get("chunk_index", 0),
-            content=result["content"],
-            title=result.get("title", ""),
-            section_header=result.get("section_header", ""),
-            department=result.get("department", ""),
-            summary=result.get("summary", ""),
-            indexed_at=result.get("indexed_at", ""),
-            image_urls=result.get("image_urls") or [],
-            score=0.0,
+            id_filter = f"{id_filter} and ({security_filter})"
+        batches.append((id_filter, len(batch)))
+    return batches
+
+
+def _get_local_chunks_by_ids(
+    document_ids: Sequence[str],
+    security_filter: str | None,
+) -> dict[str, SearchResult]:
+    departments = _departments_from_security_filter(security_filter)
+    index = _get_local_index()
+    chunks: dict[str, SearchResult] = {}
+    for document_id in dict.fromkeys(i.strip() for i in document_ids if i and i.strip()):
+        document = index.get(document_id)
+        if document is None:
+            continue
+        if departments is not None and document.get("department") not in departments:
+            continue
+        chunks[document_id] = _to_search_result(document, score=0.0)
+    return chunks
+
+
+def get_chunks_by_ids(
+    document_ids: Sequence[str],
+    *,
+    security_filter: str | None = None,
+) -> dict[str, SearchResult]:
+    """Load many chunks with one filtered query instead of one ``get_document`` each.
+
+    The department filter is applied server-side, so chunks outside the
+    caller's departments are simply absent from the returned mapping.
+    """
+    if _uses_local_backend():
+        return _get_local_chunks_by_ids(document_ids, security_filter)
+
+    batches = _prepare_chunk_id_batches(document_ids, security_filter)
+    if not batches:
+        return {}
+
+    chunks: dict[str, SearchResult] = {}
+    with tracer.start_as_current_span("get_chunks_by_ids") as span:
+        span.set_attribute("search.document_count", sum(top for _, top in batches))
+        for id_filter, top in batches:
+            results = _get_search_client().search(
+                search_text="*",
+                filter=id_filter,
+                select=_SELECT_FIELDS,
+                top=top,
+            )
+            for result in results:
+                chunks[result["id"]] = _to_search_result(result, score=0.0)
+        span.set_attribute("search.result_count", len(chunks))
+
+    return chunks
+
+
+async def get_chunks_by_ids_async(
+    document_ids: Sequence[str],
+    *,
+    security_filter: str | None = None,
+) -> dict[str, SearchResult]:
+    """Async variant of :func:`get_chunks_by_ids` on the aio ``SearchClient``."""
+    if _uses_local_backend():
+        return _get_local_chunks_by_ids(document_ids, security_filter)
+
+    batches = _prepare_chunk_id_batches(document_ids, security_filter)
+    if not batches:
+        return {}
+
+    chunks: dict[str, SearchResult] = {}
+    with tracer.start_as_current_span("get_chunks_by_ids") as span:
+        span.set_attribute("search.document_count", sum(top for _, top in batches))
+        for id_filter, top in batches:
+            results = await _get_async_search_client().search(
+                search_text="*",
+                filter=id_filter,
+                select=_SELECT_FIELDS,
+                top=top,
+            )
+            async for result in results:
+                chunks[result["id"]] = _to_search_result(result, score=0.0)
+        span.set_attribute("search.result_count", len(chunks))
+
+    return chunks
+
+
+async def _get_article_chunk_maps_async(article_ids: Sequence[str]) -> dict[str, dict[int, str]]:
+    """``chunk_index -> id`` for each article, served from the chunk-map cache.
+
+    Articles missing from the cache are fetched together with an id-only
+    query (``article_id`` is filterable), paged with ``skip`` since long
+    articles can push a batch past the ``top`` cap.  Pages are ordered by
+    the unique ``id`` key; without an ``order_by`` the service may return
+    rows in a different order per page.  The maps carry no
+    content, so they are shared across departments; the neighbour content
+    query applies the caller's security filter.
+    """
+    cache = _get_chunk_map_cache()
+    maps: dict[str, dict[int, str]] = {}
+    missing: list[str] = []
+    for article_id in dict.fromkeys(article_ids):
+        cached = cache.get(article_id)
+        if cached is None:
+            missing.append(article_id)
+        else:
+            maps[article_id] = cached
+
+    fetched: dict[str, dict[int, str]] = {article_id: {} for article_id in missing}
+    if _uses_local_backend():
+        index = _get_local_index()
+        fetched = {article_id: index.article_chunk_ids(article_id) for article_id in missing}
+    elif missing:
+        for start in range(0, len(missing), _MAX_ARTICLES_PER_MAP_QUERY):
+            batch = missing[start:start + _MAX_ARTICLES_PER_MAP_QUERY]
+            skip = 0
+            while True:
+                results = await _get_async_search_client().search(
+                    search_text="*",
+                    filter=_build_in_filter("article_id", batch),
+                    select=["id", "article_id", "chunk_index"],
+                    order_by=["id"],
+                    top=_MAX_IDS_PER_QUERY,
+                    skip=skip,
+                )
+                rows = 0
+                async for result in results:
+                    rows += 1
+                    fetched.setdefault(result["article_id"], {})[result.get("chunk_index", 0)] = result["id"]
+                if rows < _MAX_IDS_PER_QUERY:
+                    break
+                skip += rows
+
+    for article_id, chunk_ids in fetched.items():
+        cache.set(article_id, chunk_ids)
+        maps[article_id] = chunk_ids
+    return maps
+
+
+async def expand_adjacent_chunks_async(
+    results: Sequence[SearchResult],
+    *,
+    security_filter: str | None = None,
+) -> list[SearchResult]:
+    """Return ``results`` with each hit's neighbouring chunks around it.
+
+    Header-based chunks are sometimes too small to answer alone; adding
+    ``chunk_index ± 1`` of the same article is cheaper than another tool
+    call.  Each hit is replaced by ``[previous, hit, next]`` in reading
+    order, and a chunk already placed earlier is not repeated.  Neighbour
+    ids come from the per-article chunk map and their content from one
+    batched, department-filtered :func:`get_chunks_by_ids_async` lookup.
+    """
+    if not results:
+        return list(results)
+
+    with tracer.start_as_current_span("expand_adjacent_chunks") as span:
+        chunk_maps = await _get_article_chunk_maps_async([result.article_id for result in results])
+        hit_ids = {result.id for result in results}
+        neighbour_ids = [
+            chunk_id
+            for result in results
+            for offset in (-1, 1)
+            if (chunk_id := chunk_maps.get(result.article_id, {}).get(result.chunk_index + offset))
+            and chunk_id not in hit_ids
+        ]
+        neighbours = (
+            await get_chunks_by_ids_async(neighbour_ids, security_filter=security_filter)
+            if neighbour_ids
+            else {}
         )
-        span.set_attribute("search.result_count", 1)
-        return search_result
+        span.set_attribute("search.expanded_count", len(neighbours))
+
+    expanded: list[SearchResult] = []
+    placed: set[str] = set()
+    for result in results:
+        chunk_ids = chunk_maps.get(result.article_id, {})
+        previous = neighbours.get(chunk_ids.get(result.chunk_index - 1, ""))
+        following = neighbours.get(chunk_ids.get(result.chunk_index + 1, ""))
+        for chunk in (previous, result, following):
+            if chunk is not None and chunk.id not in placed:
+                placed.add(chunk.id)
+                expanded.append(chunk)
+    return expanded
 
 
 def _check_department_access(doc_department: str, security_filter: str) -> bool:
-    """Check if a document's department is allowed by the security filter."""
+    """Check if a document's department is allowed by the security filter.
+
+    Exact (case-insensitive) membership in the filter's department set;
+    an unparseable filter denies access.
+    """
     if not security_filter:
         return True
     if not doc_department:
         return True
-    return doc_department.lower() in security_filter.lower()
+    try:
+        allowed = _allowed_departments(security_filter)
+    except ValueError:
+        logger.warning("Unsupported security filter for chunk lookup: %s", security_filter)
+        return False
+    return doc_department.casefold() in allowed
+
+
+@lru_cache(maxsize=256)
+def _allowed_departments(security_filter: str) -> frozenset[str]:
+    return frozenset(department.casefold() for department in _departments_from_security_filter(security_filter) or ())
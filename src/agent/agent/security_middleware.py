@@ -2,8 +2,9 @@
 
 Reads JWT claims from :data:`middleware.request_context.user_claims_var`,
 resolves Entra group GUIDs to department names via
-:func:`agent.group_resolver.resolve_departments`, and writes the resolved
-values into ``context.kwargs`` so that tool functions receive them via
+:func:`agent.group_resolver.resolve_departments` — once per request, see
+:func:`request_departments` — and writes the resolved values into
+``context.kwargs`` so that tool functions receive them via
 ``FunctionInvocationContext`` (agent-framework 1.0.0+).
 
 Adds OTel span attributes so department filters are visible in traces.
@@ -23,8 +24,22 @@ logger = logging.getLogger(__name__)
 tracer = trace.get_tracer(__name__)
 
 
+async def request_departments() -> frozenset[str]:
+    """Departments of the current request's user, resolved on first use.
+
+    The result is kept in :data:`resolved_departments_var`, so every later
+    tool call and citation lookup of the request reuses it.
+    """
+    departments = resolved_departments_var.get()
+    if departments is None:
+        groups = user_claims_var.get().get("groups", [])
+        departments = await resolve_departments(groups) if groups else frozenset()
+        resolved_departments_var.set(departments)
+    return departments
+
+
 class SecurityFilterMiddleware(FunctionMiddleware):
-    """Resolves user groups once per tool invocation and injects departments."""
+    """Injects the request's resolved departments into every tool invocation."""
 
     async def process(
         self,
@@ -32,13 +47,8 @@ class SecurityFilterMiddleware(FunctionMiddleware):
         call_next,
     ) -> None:
         claims = user_claims_var.get()
-
-        # Resolve group GUIDs → department names
         groups = claims.get("groups", [])
-        departments = resolve_departments(groups) if groups else []
-
-        # Store in ContextVar for other middleware to observe
-        resolved_departments_var.set(departments)
+        departments = await request_departments()
 
         # Inject into tool kwargs so tools receive them via **kwargs
         context.kwargs["departments"] = departments
@@ -47,14 +57,14 @@ class SecurityFilterMiddleware(FunctionMiddleware):
 
         logger.debug(
             "SecurityFilterMiddleware: departments=%s for function=%s",
-            departments,
+            sorted(departments),
             context.function.name,
         )
 
         # Record security context on the current OTel span for trace visibility
         span = trace.get_current_span()
         if span.is_recording():
-            span.set_attribute("security.departments", departments)
+            span.set_attribute("security.departments", sorted(departments))
             span.set_attribute("security.groups", groups)
             span.set_attribute("security.user_id", claims.get("user_id", ""))
 
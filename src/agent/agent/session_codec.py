@@ -0,0 +1,92 @@
+"""Optional compression of persisted session payloads.
+
+Serialized sessions are JSON dominated by repeated keys (``role``,
+``contents``, ``type`` ...) and compacted tool payloads, so they compress
+well.  With ``SESSION_CODEC`` set to ``gzip``, the session
+repository stores each large field (the session, or a segment's messages)
+as base64 of the compressed compact JSON, and tags the document::
+
+    {"id": "...", "session": "H4sIAAAA...",
+     "codec": {"name": "gzip", "version": 1, "fields": ["session"]}}
+
+Documents without a ``codec`` tag are stored as plain JSON and are returned
+as-is, so older documents stay readable and switching codecs needs no
+migration — each document is rewritten in the configured codec on its next
+write.
+
+Only gzip is offered: the web app reads these documents too, and its Node
+runtime has no zstd decoder.
+"""
+
+from __future__ import annotations
+
+import base64
+import gzip
+import json
+from collections.abc import Iterable
+from typing import Any
+
+CODECS = ("none", "gzip")
+CODEC_VERSION = 1
+
+_GZIP_LEVEL = 6
+
+
+def resolve_codec(name: str) -> str:
+    """Validate a configured codec name.
+
+    Raises:
+        ValueError: If ``name`` is not a known codec.
+    """
+    if name not in CODECS:
+        raise ValueError(f"Unknown session codec: {name} (expected one of {', '.join(CODECS)})")
+    return name
+
+
+def encode_fields(doc: dict[str, Any], fields: Iterable[str], codec: str) -> dict[str, Any]:
+    """Return ``doc`` with ``fields`` compressed by ``codec`` (``none`` returns it unchanged)."""
+    if codec == "none":
+        return doc
+    encoded = dict(doc)
+    names = [field for field in fields if field in doc]
+    for field in names:
+        encoded[field] = _encode(doc[field], codec)
+    encoded["codec"] = {"name": codec, "version": CODEC_VERSION, "fields": names}
+    return encoded
+
+
+def decode_fields(doc: dict[str, Any]) -> dict[str, Any]:
+    """Return ``doc`` with its compressed fields decoded; untagged documents are returned as-is.
+
+    Raises:
+        ValueError: If the document uses an unknown codec or codec version.
+    """
+    tag = doc.get("codec")
+    if tag is None:
+        return doc
+    if not isinstance(tag, dict) or tag.get("name") not in CODECS or tag.get("version") != CODEC_VERSION:
+        raise ValueError(f"Unsupported session codec on document {doc.get('id')}: {tag!r}")
+
+    decoded = {key: value for key, value in doc.items() if key != "codec"}
+    for field in tag.get("fields", []):
+        decoded[field] = _decode(doc[field], tag["name"])
+    return decoded
+
+
+def _encode(value: Any, codec: str) -> str:
+    raw = json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode()
+    return base64.b64encode(_compress(raw, codec)).decode("ascii")
+
+
+def _decode(value: str, codec: str) -> Any:
+    return json.loads(_decompress(base64.b64decode(value), codec))
+
+
+def _compress(raw: bytes, codec: str) -> bytes:
+    return gzip.compress(raw, compresslevel=_GZIP_LEVEL, mtime=0)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "gzip":
+        return gzip.decompress(data)
+    return data
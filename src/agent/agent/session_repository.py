@@ -3,32 +3,95 @@
 Persists AgentSession state to the 'agent-sessions' container in Cosmos DB.
 Used by the from_agent_framework() adapter to auto-load sessions before
 each request and auto-save after.
+
+One conversation's session is read many times per turn (AG-UI and
+``/responses`` turns, connect-restore, and every citation lookup), so the
+repository keeps a size-bounded in-process cache of session documents keyed
+by conversation id, together with their ``_etag``:
+
+* Writes are write-through: the upserted session is cached under the ETag
+  Cosmos returns.
+* A cached session is revalidated with a conditional point read
+  (``If-None-Match``).  Cosmos answers ``304 Not Modified`` without a body
+  when no other replica has written the session since, so the cached copy
+  is served; otherwise the new document replaces it.
+* With ``revalidate_seconds`` above ``0``, reads within that window of the
+  last validation are served from memory without a round trip.
+
+Cached sessions are copied on the way in and out, so callers can mutate
+what they get back.
+
+With ``layout="segmented"`` sessions are written append-only, as a head
+document plus per-turn message segments (see :mod:`agent.session_segments`).
+The head is committed only if it is unchanged since it was read (its
+cached or freshly read ``_etag``); when another replica got there first the
+write is re-planned against the stored head.  Both layouts are always
+readable, so the setting only changes how sessions are written; a
+conversation stored as one document is migrated on its next write.
+
+With a ``codec`` other than ``none`` the session (or a segment's messages)
+is stored compressed (see :mod:`agent.session_codec`); uncompressed
+documents remain readable.
 """
 
 from __future__ import annotations
 
+import asyncio
+import copy
 import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, replace
 from typing import Any, Optional
 
+from azure.core import MatchConditions
 from azure.cosmos.aio import CosmosClient
-from azure.cosmos.exceptions import CosmosResourceNotFoundError
+from azure.cosmos.exceptions import (
+    CosmosAccessConditionFailedError,
+    CosmosResourceExistsError,
+    CosmosResourceNotFoundError,
+)
 from azure.ai.agentserver.agentframework.persistence import (
     SerializedAgentSessionRepository,
 )
 
 from agent.client_factories import create_async_cosmos_client
 from agent.search_result_store import compact_serialized_session_for_storage
+from agent.session_codec import decode_fields, encode_fields, resolve_codec
+from agent.session_segments import (
+    assemble_session,
+    is_segmented,
+    plan_segmented_write,
+    segment_ids,
+)
+from agent.ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+# Segmented writes that lose the head to another replica are re-planned
+# against the stored head this many times before giving up.
+_SEGMENTED_WRITE_ATTEMPTS = 3
+
+
+@dataclass(frozen=True)
+class _CachedSession:
+    etag: str
+    session: Any
+    validated_at: float
+    # Stored head without its session when the document is segmented.
+    head: dict[str, Any] | None = None
+
 
 class CosmosAgentSessionRepository(SerializedAgentSessionRepository):
     """Persists serialized AgentSession dicts to Cosmos DB.
 
     The 'agent-sessions' container uses partition key '/id'.
-    Each document has:
+    In the default ``document`` layout each document has:
       - id: conversation_id (partition key)
       - session: serialized session dict from AgentSession.to_dict()
+    The ``segmented`` layout adds ``layout``, ``generation``,
+    ``message_path`` and ``segments`` to that document and moves the
+    messages into segment documents.
     """
 
     def __init__(
@@ -36,11 +99,25 @@ class CosmosAgentSessionRepository(SerializedAgentSessionRepository):
         endpoint: str,
         database_name: str,
         container_name: str = "agent-sessions",
+        *,
+        layout: str = "document",
+        codec: str = "none",
+        cache_max_entries: int = 0,
+        cache_ttl_seconds: float = 0,
+        cache_revalidate_seconds: float = 0,
+        clock: Callable[[], float] = time.monotonic,
     ) -> None:
+        if layout not in ("document", "segmented"):
+            raise ValueError(f"Unknown session storage layout: {layout}")
         self._endpoint = endpoint
+        self._layout = layout
+        self._codec = resolve_codec(codec)
         self._database_name = database_name
         self._container_name = container_name
         self._client: CosmosClient | None = None
+        self._cache: TTLCache[str, _CachedSession] = TTLCache(cache_max_entries, cache_ttl_seconds, clock=clock)
+        self._revalidate_seconds = max(0.0, cache_revalidate_seconds)
+        self._clock = clock
 
     async def _get_container(self):
         """Lazy-init the Cosmos container client."""
@@ -49,6 +126,11 @@ class CosmosAgentSessionRepository(SerializedAgentSessionRepository):
         db = self._client.get_database_client(self._database_name)
         return db.get_container_client(self._container_name)
 
+    async def warm_up(self) -> None:
+        """Open the Cosmos connection ahead of the first request."""
+        container = await self._get_container()
+        await container.read()
+
     async def read_from_storage(
         self, conversation_id: Optional[str]
     ) -> Optional[Any]:
@@ -58,21 +140,42 @@ class CosmosAgentSessionRepository(SerializedAgentSessionRepository):
         """
         if not conversation_id or not conversation_id.strip():
             return None
+        cached = self._cache.get(conversation_id)
+        if cached is not None and self._clock() - cached.validated_at < self._revalidate_seconds:
+            return copy.deepcopy(cached.session)
+
         container = await self._get_container()
+        conditions = {"if_none_match": cached.etag} if cached is not None else {}
         try:
             doc = await container.read_item(
                 item=conversation_id,
                 partition_key=conversation_id,
+                **conditions,
             )
-            logger.info("Loaded session for conversation_id=%s", conversation_id)
-            return doc.get("session")
         except CosmosResourceNotFoundError:
+            self._cache.pop(conversation_id)
             logger.info(
                 "No session found for conversation_id=%s (new conversation)",
                 conversation_id,
             )
             return None
 
+        if cached is not None and not doc:
+            # 304 Not Modified: the SDK returns an empty body.
+            self._cache.set(conversation_id, replace(cached, validated_at=self._clock()))
+            logger.debug("Session unchanged for conversation_id=%s", conversation_id)
+            return copy.deepcopy(cached.session)
+
+        logger.info("Loaded session for conversation_id=%s", conversation_id)
+        doc = decode_fields(doc)
+        if is_segmented(doc):
+            session = assemble_session(doc, await self._read_segments(container, segment_ids(doc)))
+            self._remember(conversation_id, doc.get("_etag"), session, head=_head_metadata(doc))
+            return copy.deepcopy(session)
+        session = doc.get("session")
+        self._remember(conversation_id, doc.get("_etag"), session)
+        return copy.deepcopy(session)
+
     async def write_to_storage(
         self, conversation_id: Optional[str], serialized_session: Any
     ) -> None:
@@ -85,6 +188,127 @@ class CosmosAgentSessionRepository(SerializedAgentSessionRepository):
             return
         container = await self._get_container()
         compacted_session = compact_serialized_session_for_storage(serialized_session)
-        doc = {"id": conversation_id, "session": compacted_session}
-        await container.upsert_item(doc)
+        if self._layout == "segmented":
+            await self._write_segmented(container, conversation_id, compacted_session)
+            return
+
+        doc = encode_fields({"id": conversation_id, "session": compacted_session}, ("session",), self._codec)
+        try:
+            written = await container.upsert_item(doc)
+        except Exception:
+            # The write may or may not have landed; the next read must ask Cosmos.
+            self._cache.pop(conversation_id)
+            raise
         logger.info("Saved session for conversation_id=%s", conversation_id)
+        etag = written.get("_etag") if isinstance(written, dict) else None
+        self._remember(conversation_id, etag, copy.deepcopy(compacted_session))
+
+    async def _write_segmented(self, container, conversation_id: str, compacted_session: Any) -> None:
+        """Append the turn's messages as a segment, then point the head at it.
+
+        Raises:
+            CosmosAccessConditionFailedError: If other writers kept moving the
+                head for ``_SEGMENTED_WRITE_ATTEMPTS`` attempts.
+        """
+        head, etag = await self._stored_head(container, conversation_id)
+        for attempt in range(1, _SEGMENTED_WRITE_ATTEMPTS + 1):
+            plan = plan_segmented_write(conversation_id, compacted_session, head)
+            try:
+                await asyncio.gather(
+                    *(
+                        container.upsert_item(encode_fields(segment, ("messages",), self._codec))
+                        for segment in plan.segments
+                    )
+                )
+                written = await self._commit_head(container, plan.head, etag)
+                break
+            except (CosmosAccessConditionFailedError, CosmosResourceExistsError):
+                # Another replica wrote the head since it was read; our
+                # segments are unreferenced, so drop them and plan again.
+                self._cache.pop(conversation_id)
+                await self._delete_segments(container, [segment["id"] for segment in plan.segments])
+                if attempt == _SEGMENTED_WRITE_ATTEMPTS:
+                    raise
+                logger.info(
+                    "Session head for conversation_id=%s changed concurrently (attempt %d); re-planning",
+                    conversation_id,
+                    attempt,
+                )
+                head, etag = await self._read_head(container, conversation_id)
+            except Exception:
+                self._cache.pop(conversation_id)
+                raise
+
+        logger.info(
+            "Saved session for conversation_id=%s (%d new segment(s))",
+            conversation_id,
+            len(plan.segments),
+        )
+        written_etag = written.get("_etag") if isinstance(written, dict) else None
+        self._remember(
+            conversation_id, written_etag, copy.deepcopy(compacted_session), head=_head_metadata(plan.head)
+        )
+        await self._delete_segments(container, plan.stale_segment_ids)
+
+    async def _commit_head(self, container, head: dict[str, Any], etag: str | None) -> Any:
+        """Write the head only if it is unchanged since ``etag`` (or still absent)."""
+        body = encode_fields(head, ("session",), self._codec)
+        if etag is None:
+            return await container.create_item(body)
+        return await container.replace_item(
+            item=head["id"],
+            body=body,
+            etag=etag,
+            match_condition=MatchConditions.IfNotModified,
+        )
+
+    async def _delete_segments(self, container, ids: list[str]) -> None:
+        for segment_id in ids:
+            try:
+                await container.delete_item(item=segment_id, partition_key=segment_id)
+            except CosmosResourceNotFoundError:
+                pass
+            except Exception:
+                # Unreferenced by the head, so a leftover segment is only dead weight.
+                logger.warning("Failed to delete stale session segment %s", segment_id, exc_info=True)
+
+    async def _stored_head(self, container, conversation_id: str) -> tuple[dict[str, Any] | None, str | None]:
+        """The stored head and its ETag, from the cache when possible.
+
+        The head is ``None`` for new or single-document sessions; the ETag is
+        ``None`` only when no document exists.
+        """
+        cached = self._cache.get(conversation_id)
+        if cached is not None:
+            return cached.head, cached.etag
+        return await self._read_head(container, conversation_id)
+
+    async def _read_head(self, container, conversation_id: str) -> tuple[dict[str, Any] | None, str | None]:
+        try:
+            doc = await container.read_item(item=conversation_id, partition_key=conversation_id)
+        except CosmosResourceNotFoundError:
+            return None, None
+        return (_head_metadata(doc) if is_segmented(doc) else None), doc.get("_etag")
+
+    async def _read_segments(self, container, ids: list[str]) -> list[dict[str, Any]]:
+        if not ids:
+            return []
+        segments = await container.read_items(items=[(segment_id, segment_id) for segment_id in ids])
+        return [decode_fields(segment) for segment in segments]
+
+    def _remember(
+        self,
+        conversation_id: str,
+        etag: Any,
+        session: Any,
+        *,
+        head: dict[str, Any] | None = None,
+    ) -> None:
+        if isinstance(etag, str) and etag and session is not None:
+            self._cache.set(conversation_id, _CachedSession(etag, session, self._clock(), head))
+        else:
+            self._cache.pop(conversation_id)
+
+
+def _head_metadata(head: dict[str, Any]) -> dict[str, Any]:
+    return {key: value for key, value in head.items() if key not in ("session", "codec")}
@@ -0,0 +1,198 @@
+"""Append-only ("segmented") storage layout for serialized agent sessions.
+
+The ``document`` layout stores a conversation as one ``{"id", "session"}``
+document that is rewritten after every turn, so its size and write cost grow
+with the conversation.  The ``segmented`` layout splits it:
+
+* a small **head** document (``id`` = conversation id) holding the session
+  with its message list emptied, plus the ordered list of segments;
+* immutable **segment** documents, each holding a run of messages —
+  normally the messages one turn added.
+
+A turn that only appended messages writes one new segment and the head.
+When earlier messages changed (history compaction, a rewrite by the
+framework) every message is written again under a new ``generation`` of
+segment ids, and the previous generation is deleted once the head points at
+the new one — a reader never sees a head whose segments are missing.
+
+Each segment entry in the head carries a digest of its messages, which is
+how a write tells "appended" apart from "rewritten" without reading the
+segments back.  Segment ids end in a token unique to the write, so two
+replicas writing the same thread never overwrite each other's segments;
+the head is committed conditionally and the losing write is re-planned.
+
+The container is partitioned on ``/id``, so segments are point-read by id
+rather than queried from the head's partition.  Documents in the old
+``document`` layout are still read as-is and are migrated by the first
+segmented write.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import uuid
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+SEGMENTED_LAYOUT = "segmented"
+
+# Where a serialized session keeps its message list, most specific first.
+_MESSAGE_PATHS: tuple[tuple[str, ...], ...] = (
+    ("state", "in_memory", "messages"),
+    ("state", "messages"),
+    ("messages",),
+)
+# Messages per segment when a whole conversation is (re)written at once.
+_REWRITE_SEGMENT_MESSAGES = 50
+
+
+@dataclass(frozen=True)
+class SegmentedWrite:
+    """Documents one segmented write upserts, and the segments it retires.
+
+    Segments must be written before the head, and stale segments deleted
+    after it.
+    """
+
+    head: dict[str, Any]
+    segments: list[dict[str, Any]]
+    stale_segment_ids: list[str]
+
+
+def is_segmented(doc: Mapping[str, Any] | None) -> bool:
+    return doc is not None and doc.get("layout") == SEGMENTED_LAYOUT
+
+
+def segment_ids(head: Mapping[str, Any]) -> list[str]:
+    return [segment["id"] for segment in head.get("segments", [])]
+
+
+def plan_segmented_write(
+    conversation_id: str,
+    serialized_session: Any,
+    previous_head: Mapping[str, Any] | None,
+    *,
+    write_id: str | None = None,
+) -> SegmentedWrite:
+    """Plan the documents that store ``serialized_session`` in the segmented layout.
+
+    ``previous_head`` is the stored head document, or ``None`` for a new
+    conversation.  A document in the old layout is migrated: every message
+    is written as new segments.  ``write_id`` suffixes the new segment ids
+    (random by default).
+    """
+    write_id = write_id or uuid.uuid4().hex[:12]
+    path = _message_path(serialized_session)
+    messages = _get_path(serialized_session, path) if path else []
+    previous = previous_head if is_segmented(previous_head) else None
+
+    stored_segments = list(previous["segments"]) if previous else []
+    generation = previous["generation"] if previous else 0
+    appended_from = None
+    if previous and previous.get("message_path") == list(path or ()):
+        appended_from = _appended_from(messages, stored_segments)
+
+    if appended_from is None:
+        generation += 1
+        kept: list[dict[str, Any]] = []
+        new_runs = [
+            messages[start:start + _REWRITE_SEGMENT_MESSAGES]
+            for start in range(0, len(messages), _REWRITE_SEGMENT_MESSAGES)
+        ]
+    else:
+        kept = stored_segments
+        new_runs = [messages[appended_from:]] if len(messages) > appended_from else []
+
+    segments = [
+        {
+            "id": _segment_id(conversation_id, generation, len(kept) + offset, write_id),
+            "conversation_id": conversation_id,
+            "messages": run,
+        }
+        for offset, run in enumerate(new_runs)
+    ]
+    entries = kept + [
+        {"id": segment["id"], "count": len(segment["messages"]), "digest": _digest(segment["messages"])}
+        for segment in segments
+    ]
+
+    head = {
+        "id": conversation_id,
+        "layout": SEGMENTED_LAYOUT,
+        "generation": generation,
+        "message_path": list(path or ()),
+        "segments": entries,
+        "session": _with_path(serialized_session, path, []) if path else serialized_session,
+    }
+    live = {entry["id"] for entry in entries}
+    stale = [segment_id for segment_id in (segment_ids(previous) if previous else []) if segment_id not in live]
+    return SegmentedWrite(head=head, segments=segments, stale_segment_ids=stale)
+
+
+def assemble_session(head: Mapping[str, Any], segments: Sequence[Mapping[str, Any]]) -> Any:
+    """Rebuild the serialized session from its head and segment documents.
+
+    Raises:
+        ValueError: If a segment listed in the head is missing.
+    """
+    by_id = {segment["id"]: segment for segment in segments}
+    messages: list[Any] = []
+    for segment_id in segment_ids(head):
+        segment = by_id.get(segment_id)
+        if segment is None:
+            raise ValueError(f"Session {head.get('id')} is missing segment {segment_id}")
+        messages.extend(segment.get("messages", []))
+
+    session = head.get("session")
+    path = tuple(head.get("message_path") or ())
+    if not path or not isinstance(session, dict):
+        return session
+    return _with_path(session, path, messages)
+
+
+def _appended_from(messages: list[Any], stored_segments: list[Mapping[str, Any]]) -> int | None:
+    """Number of stored messages ``messages`` starts with, or ``None`` if it diverged."""
+    start = 0
+    for entry in stored_segments:
+        end = start + entry["count"]
+        if end > len(messages) or _digest(messages[start:end]) != entry["digest"]:
+            return None
+        start = end
+    return start
+
+
+def _message_path(session: Any) -> tuple[str, ...] | None:
+    for path in _MESSAGE_PATHS:
+        if isinstance(_get_path(session, path), list):
+            return path
+    return None
+
+
+def _get_path(value: Any, path: tuple[str, ...]) -> Any:
+    for key in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def _with_path(session: dict[str, Any], path: tuple[str, ...], messages: list[Any]) -> dict[str, Any]:
+    """Shallow-copy the dicts along ``path`` and set the message list at its end."""
+    root = dict(session)
+    parent = root
+    for key in path[:-1]:
+        parent[key] = dict(parent[key])
+        parent = parent[key]
+    parent[path[-1]] = messages
+    return root
+
+
+def _segment_id(conversation_id: str, generation: int, index: int, write_id: str) -> str:
+    return f"{conversation_id}:{generation}:{index}:{write_id}"
+
+
+def _digest(messages: list[Any]) -> str:
+    encoded = json.dumps(messages, sort_keys=True, separators=(",", ":"), default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()
@@ -0,0 +1,129 @@
+"""Write-behind persistence of agent sessions.
+
+Persisting the session at the end of a turn (compaction plus a Cosmos
+upsert) used to hold the AG-UI stream open, and the web app waited for it
+before the user could send the next message.  :class:`WriteBehindSessionRepository`
+takes the serialized session, returns immediately and writes it in the
+background:
+
+* **Coalescing** — one writer task per thread.  A turn that ends while the
+  previous write of its thread is still in flight replaces any queued state,
+  so only the latest session of a thread is written.
+* **Read-your-writes** — until its write has landed, reads of a thread on
+  this replica are served the queued state.
+* **Bounded backlog** — at most ``max_pending`` threads wait to be written;
+  beyond that a write is made inline, as without write-behind.
+* **Flush** — :meth:`flush` waits for queued writes, and runs on server
+  shutdown.
+
+A write that keeps failing after ``max_attempts`` is logged and dropped, like
+a failed inline write would have been.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+import logging
+import time
+from typing import Any, Optional
+
+from azure.ai.agentserver.agentframework.persistence import (
+    SerializedAgentSessionRepository,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindSessionRepository(SerializedAgentSessionRepository):
+    """Queues session writes to ``inner`` and flushes them in the background."""
+
+    def __init__(
+        self,
+        inner: SerializedAgentSessionRepository,
+        *,
+        max_pending: int = 256,
+        max_attempts: int = 3,
+        retry_delay_seconds: float = 0.5,
+        flush_timeout_seconds: float = 10.0,
+    ) -> None:
+        self._inner = inner
+        self._max_pending = max(1, max_pending)
+        self._max_attempts = max(1, max_attempts)
+        self._retry_delay_seconds = max(0.0, retry_delay_seconds)
+        self._flush_timeout_seconds = flush_timeout_seconds
+        # Latest serialized session per thread that is not yet written.
+        self._unflushed: dict[str, Any] = {}
+        self._writers: dict[str, asyncio.Task[None]] = {}
+
+    @property
+    def pending(self) -> int:
+        return len(self._unflushed)
+
+    async def warm_up(self) -> None:
+        await self._inner.warm_up()
+
+    async def read_from_storage(self, conversation_id: Optional[str]) -> Optional[Any]:
+        if conversation_id in self._unflushed:
+            return copy.deepcopy(self._unflushed[conversation_id])
+        return await self._inner.read_from_storage(conversation_id)
+
+    async def write_to_storage(self, conversation_id: Optional[str], serialized_session: Any) -> None:
+        if not conversation_id or not conversation_id.strip():
+            return
+        if conversation_id not in self._unflushed and len(self._unflushed) >= self._max_pending:
+            logger.warning(
+                "Session write-behind backlog full (%d threads); writing conversation_id=%s inline",
+                len(self._unflushed),
+                conversation_id,
+            )
+            await self._inner.write_to_storage(conversation_id, serialized_session)
+            return
+
+        self._unflushed[conversation_id] = serialized_session
+        if conversation_id not in self._writers:
+            self._writers[conversation_id] = asyncio.create_task(self._drain(conversation_id))
+
+    async def flush(self, timeout_seconds: float | None = None) -> bool:
+        """Wait until every queued write has been attempted; ``False`` on timeout."""
+        timeout = self._flush_timeout_seconds if timeout_seconds is None else timeout_seconds
+        deadline = time.monotonic() + timeout
+        while self._writers:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.error("Session write-behind flush timed out with %d thread(s) unwritten", self.pending)
+                return False
+            await asyncio.wait(list(self._writers.values()), timeout=remaining)
+        return True
+
+    async def _drain(self, conversation_id: str) -> None:
+        try:
+            while True:
+                session = self._unflushed[conversation_id]
+                await self._write(conversation_id, session)
+                if self._unflushed.get(conversation_id) is session:
+                    del self._unflushed[conversation_id]
+                    return
+        finally:
+            self._writers.pop(conversation_id, None)
+
+    async def _write(self, conversation_id: str, session: Any) -> None:
+        for attempt in range(1, self._max_attempts + 1):
+            try:
+                await self._inner.write_to_storage(conversation_id, session)
+                return
+            except Exception:
+                if attempt == self._max_attempts:
+                    logger.exception(
+                        "Dropping session write for conversation_id=%s after %d attempt(s)",
+                        conversation_id,
+                        attempt,
+                    )
+                    return
+                logger.warning(
+                    "Session write failed for conversation_id=%s (attempt %d); retrying",
+                    conversation_id,
+                    attempt,
+                    exc_info=True,
+                )
+                await asyncio.sleep(self._retry_delay_seconds * attempt)
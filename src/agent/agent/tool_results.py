@@ -0,0 +1,144 @@
+"""Shared, memoized parsing of JSON tool results.
+
+Every LLM call replays the whole conversation through the chat middleware,
+and the vision middleware, the grounding middleware and the session
+compactor each need the decoded search payloads.  Decoding every
+``function_result`` in the history separately per consumer made per-turn
+cost grow with history size × consumer count.
+
+Tool results are immutable strings, and the serialized session handed to the
+repository reuses the very same ``str`` objects as the live ``Content``
+items.  Parsed payloads are therefore memoized by the identity of the result
+string: the memo holds a reference to the string, so its ``id`` cannot be
+reused while the entry lives, and an identity hit always means the same
+text.  Only results that are new since the previous call are decoded.
+
+Parsed payloads are shared between consumers and must be treated as
+read-only.
+
+The search tools go one step further and return a :class:`SearchToolResult`.
+Its JSON text is rendered once, when the framework turns the return value
+into a ``function_result`` (see :func:`render_tool_result`), and the typed
+object rides along as the text item's ``raw_representation`` — which is never
+serialized — so in-process consumers read its rows without any decoding.
+Results restored from a persisted session fall back to the parse memo.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Any
+
+from agent_framework import Content, FunctionTool
+
+# Enough for every tool result of many concurrent long conversations; each
+# entry references a string that the session already keeps alive.
+_MAX_ENTRIES = 1024
+
+_memo: OrderedDict[int, tuple[str, Any]] = OrderedDict()
+_lock = threading.Lock()
+
+
+@dataclass(eq=False)
+class SearchToolResult:
+    """Search tool output; the JSON text for the model is rendered on first use.
+
+    ``results`` holds the ranked result rows in tool-payload form.  Treat an
+    instance as read-only once returned: ``text`` is cached.
+    """
+
+    results: list[dict[str, Any]] = field(default_factory=list)
+    summary: str = ""
+    error: str | None = None
+
+    @classmethod
+    def failure(cls, message: str) -> SearchToolResult:
+        return cls(error=message)
+
+    def to_dict(self) -> dict[str, Any]:
+        if self.error is not None:
+            return {"error": self.error}
+        return {"results": self.results, "summary": self.summary}
+
+    @cached_property
+    def text(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False)
+
+    def __str__(self) -> str:
+        return self.text
+
+
+def render_tool_result(result: Any) -> list[Content]:
+    """``result_parser`` for tools that may return a :class:`SearchToolResult`."""
+    if isinstance(result, SearchToolResult):
+        return [Content.from_text(result.text, raw_representation=result)]
+    return FunctionTool.parse_result(result)
+
+
+def typed_tool_result(content: Content) -> SearchToolResult | None:
+    """Return the typed payload a ``function_result`` was rendered from, if any."""
+    for item in content.items or ():
+        if isinstance(item.raw_representation, SearchToolResult):
+            return item.raw_representation
+    return None
+
+
+def parse_tool_result(value: Any) -> Any | None:
+    """Return the JSON-decoded tool result, or ``None`` if it is not JSON."""
+    if value is None:
+        return None
+    if not isinstance(value, str):
+        return _decode(str(value))
+
+    key = id(value)
+    with _lock:
+        entry = _memo.get(key)
+        if entry is not None and entry[0] is value:
+            _memo.move_to_end(key)
+            return entry[1]
+
+    parsed = _decode(value)
+    with _lock:
+        _memo[key] = (value, parsed)
+        _memo.move_to_end(key)
+        while len(_memo) > _MAX_ENTRIES:
+            _memo.popitem(last=False)
+    return parsed
+
+
+def search_result_items(content: Content) -> list[dict[str, Any]]:
+    """Return the search result rows of a ``function_result``.
+
+    Rows come straight from the typed payload when there is one, otherwise
+    from the parsed legacy list or current dict JSON payload.
+    """
+    typed = typed_tool_result(content)
+    if typed is not None:
+        return typed.results
+
+    payload = parse_tool_result(content.result)
+    if isinstance(payload, list):
+        return [item for item in payload if isinstance(item, dict)]
+
+    if isinstance(payload, dict):
+        results = payload.get("results")
+        if isinstance(results, list):
+            return [item for item in results if isinstance(item, dict)]
+
+    return []
+
+
+def clear_tool_result_cache() -> None:
+    with _lock:
+        _memo.clear()
+
+
+def _decode(text: str) -> Any | None:
+    try:
+        return json.loads(text)
+    except (json.JSONDecodeError, TypeError):
+        return None
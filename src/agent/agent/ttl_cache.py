@@ -0,0 +1,87 @@
+"""Bounded, thread-safe LRU cache with per-entry time-to-live.
+
+Used by the agent's hot-path caches (query embeddings, search results, ...)
+so each one shares the same eviction and expiry semantics.  Entries are
+evicted least-recently-used first once ``max_entries`` is reached, and are
+treated as missing once older than ``ttl_seconds``.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """LRU cache whose entries expire ``ttl_seconds`` after insertion.
+
+    A ``max_entries`` or ``ttl_seconds`` of ``0`` disables the cache: every
+    ``get`` misses and ``set`` is a no-op.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._max_entries = max(0, max_entries)
+        self._ttl_seconds = max(0.0, ttl_seconds)
+        self._clock = clock
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_entries > 0 and self._ttl_seconds > 0
+
+    @property
+    def ttl_seconds(self) -> float:
+        return self._ttl_seconds
+
+    def get(self, key: K) -> V | None:
+        """Return the cached value, or ``None`` when missing or expired."""
+        if not self.enabled:
+            return None
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: K, value: V) -> None:
+        """Insert or refresh ``key``, evicting the least-recently-used entry if full."""
+        if not self.enabled:
+            return
+        expires_at = self._clock() + self._ttl_seconds
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: K) -> V | None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        return entry[1] if entry is not None else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
@@ -13,13 +13,17 @@ architecture charts, and other visuals — not just the text descriptions.
 
 from __future__ import annotations
 
-import json
+import asyncio
 import logging
 from urllib.parse import unquote
 
 from agent_framework import ChatContext, ChatMiddleware, Content, Message
 
-from agent.image_service import download_image
+from agent.config import config
+from agent.image_service import ImageBlob, download_image_async
+from agent.tool_results import search_result_items
+from agent.ttl_cache import TTLCache
+from middleware.request_context import thread_id_var
 
 logger = logging.getLogger(__name__)
 
@@ -28,17 +32,123 @@ logger = logging.getLogger(__name__)
 MAX_VISION_IMAGES = 6
 
 
-def _extract_result_items(payload: object) -> list[dict]:
-    """Return search result items from legacy list or current dict payloads."""
-    if isinstance(payload, list):
-        return [item for item in payload if isinstance(item, dict)]
+# ``(thread id, tool-call id)`` pairs whose images were already attached.
+# Call ids are only unique within a conversation, so they are scoped by the
+# AG-UI thread id from :data:`thread_id_var`.  The map lives at module level
+# because the middleware is built per request (``create_agent`` runs on every
+# AG-UI request).
+_INJECTED_MAX_ENTRIES = 4096
+_INJECTED_TTL_SECONDS = 6 * 60 * 60
+_injected: TTLCache[tuple[str, str], bool] = TTLCache(_INJECTED_MAX_ENTRIES, _INJECTED_TTL_SECONDS)
+
+REATTACH_POLICIES = ("none", "latest", "all")
+
+
+def _image_keys(content: Content) -> list[tuple[str, str]]:
+    """Return the ``(article_id, image_path)`` pairs a tool result references."""
+    keys: list[tuple[str, str]] = []
+    for item in search_result_items(content):
+        for img_info in item.get("images", []):
+            url = img_info.get("url", "")
+            if "/api/images/" not in url:
+                continue
+
+            # Extract article_id and image_path from proxy URL
+            # Format: /api/images/{article_id}/{image_path}
+            try:
+                tail = url.split("/api/images/", 1)[1]
+                article_id, image_path = tail.split("/", 1)
+            except (IndexError, ValueError):
+                continue
+            keys.append((unquote(article_id), unquote(image_path)))
+    return keys
+
+
+def _function_results(messages: list[Message]) -> list[Content]:
+    return [
+        content
+        for msg in messages
+        for content in msg.contents
+        if content.type == "function_result" and content.result is not None
+    ]
+
+
+def _collect_image_keys(results: list[Content]) -> list[tuple[str, str]]:
+    """Return unique ``(article_id, image_path)`` pairs in first-seen order."""
+    candidates: list[tuple[str, str]] = []
+    seen_paths: set[str] = set()
+
+    for content in results:
+        for article_id, image_path in _image_keys(content):
+            # Deduplicate by blob path
+            blob_key = f"{article_id}/{image_path}"
+            if blob_key in seen_paths:
+                continue
+            seen_paths.add(blob_key)
+            candidates.append((article_id, image_path))
+
+    return candidates
+
+
+def _starts_turn(messages: list[Message]) -> bool:
+    """Whether this LLM call is the first of a user turn."""
+    return bool(messages) and messages[-1].role == "user"
+
+
+async def _download_images(candidates: list[tuple[str, str]]) -> list[tuple[str, ImageBlob]]:
+    """Download up to ``MAX_VISION_IMAGES`` candidates concurrently.
+
+    Candidates are fetched in waves sized to the images still needed, so a
+    failed download is backfilled by the next candidate.  At most
+    ``VISION_DOWNLOAD_CONCURRENCY`` downloads run at once, and downloads
+    still running at the ``VISION_DOWNLOAD_DEADLINE_MS`` deadline are
+    cancelled and dropped.  Results keep candidate order regardless of
+    completion order.
+    """
+    loop = asyncio.get_running_loop()
+    deadline_ms = config.vision_download_deadline_ms
+    deadline = loop.time() + deadline_ms / 1000 if deadline_ms > 0 else None
+    semaphore = asyncio.Semaphore(max(1, config.vision_download_concurrency))
+
+    async def fetch(article_id: str, image_path: str) -> ImageBlob | None:
+        async with semaphore:
+            return await download_image_async(article_id, image_path)
+
+    downloaded: dict[int, ImageBlob] = {}
+    next_index = 0
+    while len(downloaded) < MAX_VISION_IMAGES and next_index < len(candidates):
+        wave = range(next_index, min(len(candidates), next_index + MAX_VISION_IMAGES - len(downloaded)))
+        next_index = wave.stop
+        tasks = {index: asyncio.create_task(fetch(*candidates[index])) for index in wave}
+
+        timeout = None if deadline is None else max(0.0, deadline - loop.time())
+        _, late = await asyncio.wait(tasks.values(), timeout=timeout)
+        for task in late:
+            task.cancel()
+        if late:
+            await asyncio.gather(*late, return_exceptions=True)
+
+        for index, task in tasks.items():
+            if task in late:
+                continue
+            blob = task.result()
+            if blob is None:
+                logger.warning("Vision: could not download %s/%s", *candidates[index])
+                continue
+            downloaded[index] = blob
+
+        if late:
+            logger.warning(
+                "Vision: dropped %d image(s) that missed the %d ms download deadline",
+                len(late),
+                deadline_ms,
+            )
+            break
 
-    if isinstance(payload, dict):
-        results = payload.get("results")
-        if isinstance(results, list):
-            return [item for item in results if isinstance(item, dict)]
+    if next_index < len(candidates) and len(downloaded) >= MAX_VISION_IMAGES:
+        logger.info("Vision image cap reached (%d), skipping remaining images", MAX_VISION_IMAGES)
 
-    return []
+    return [("/".join(candidates[index]), downloaded[index]) for index in sorted(downloaded)]
 
 
 class VisionImageMiddleware(ChatMiddleware):
@@ -47,88 +157,61 @@ class VisionImageMiddleware(ChatMiddleware):
     This middleware intercepts the chat messages *after* the search tool has
     returned results and *before* the LLM generates its final answer.  It:
 
-    1. Scans messages for ``Content`` items where ``.type == "function_result"``.
-    2. Downloads the referenced images from blob storage.
+    1. Scans messages for ``Content`` items where ``.type == "function_result"``
+       that have not had their images attached yet.
+    2. Downloads the referenced images from blob storage concurrently,
+       bounded by a per-call concurrency cap and deadline.
     3. Appends a user message with the images as ``Content.from_data()`` items
        (base64 data URIs) so the model receives them as vision inputs.
 
     Images are deduplicated by their blob path and capped at
     ``MAX_VISION_IMAGES`` to keep token usage reasonable.
+
+    The appended message only lives for one LLM call, and each tool result's
+    images are attached once — on the call right after the tool ran.  The
+    ``VISION_REATTACH_POLICY`` setting decides what is re-sent later:
+
+    * ``none`` — nothing; every image is sent exactly once.
+    * ``latest`` — at the start of a follow-up turn, re-attach the images of
+      the most recent tool result that had any, so questions about "that
+      diagram" still work.
+    * ``all`` — every image in the history on every call (no tracking).
     """
 
+    def _is_new(self, content: Content) -> bool:
+        call_id = content.call_id
+        return not call_id or _injected.get((thread_id_var.get(), call_id)) is None
+
+    def _select_results(self, messages: list[Message]) -> list[Content]:
+        results = _function_results(messages)
+        policy = config.vision_reattach_policy
+        if policy == "all":
+            return results
+
+        fresh = [content for content in results if self._is_new(content)]
+        if fresh or policy != "latest" or not _starts_turn(messages):
+            return fresh
+
+        for content in reversed(results):
+            if _image_keys(content):
+                return [content]
+        return []
+
     async def process(self, context: ChatContext, next) -> None:  # noqa: A002
         """Intercept and inject images before the LLM call."""
+        selected = self._select_results(context.messages)
+        candidates = _collect_image_keys(selected)
+        downloaded = await _download_images(candidates) if candidates else []
+
         image_items: list[Content] = []
-        seen_paths: set[str] = set()
-
-        for msg in context.messages:
-            for content in msg.contents:
-                if content.type != "function_result":
-                    continue
-                if content.result is None:
-                    continue
-
-                # Parse the JSON tool result to find image references
-                try:
-                    parsed = json.loads(str(content.result))
-                except (json.JSONDecodeError, TypeError):
-                    continue
-
-                results = _extract_result_items(parsed)
-                if not results:
-                    continue
-
-                for result in results:
-                    if len(image_items) >= MAX_VISION_IMAGES:
-                        logger.info(
-                            "Vision image cap reached (%d), skipping remaining images",
-                            MAX_VISION_IMAGES,
-                        )
-                        break
-
-                    for img_info in result.get("images", []):
-                        url = img_info.get("url", "")
-                        if "/api/images/" not in url:
-                            continue
-
-                        # Extract article_id and image_path from proxy URL
-                        # Format: /api/images/{article_id}/{image_path}
-                        try:
-                            tail = url.split("/api/images/", 1)[1]
-                            article_id, image_path = tail.split("/", 1)
-                            article_id = unquote(article_id)
-                            image_path = unquote(image_path)
-                        except (IndexError, ValueError):
-                            continue
-
-                        # Deduplicate by blob path
-                        blob_key = f"{article_id}/{image_path}"
-                        if blob_key in seen_paths:
-                            continue
-                        seen_paths.add(blob_key)
-
-                        # Respect the cap
-                        if len(image_items) >= MAX_VISION_IMAGES:
-                            break
-
-                        blob = download_image(article_id, image_path)
-                        if blob is None:
-                            logger.warning(
-                                "Vision: could not download %s/%s",
-                                article_id,
-                                image_path,
-                            )
-                            continue
-
-                        image_items.append(
-                            Content.from_data(data=blob.data, media_type=blob.content_type)
-                        )
-                        logger.info(
-                            "Vision: attached %s (%d bytes, %s)",
-                            blob_key,
-                            len(blob.data),
-                            blob.content_type,
-                        )
+        for blob_key, blob in downloaded:
+            image_items.append(Content.from_data(data=blob.data, media_type=blob.content_type))
+            logger.info(
+                "Vision: attached %s (%d bytes, %s)",
+                blob_key,
+                len(blob.data),
+                blob.content_type,
+            )
 
         if image_items:
             # Append a user message with the images so the LLM can see them
@@ -150,3 +233,11 @@ class VisionImageMiddleware(ChatMiddleware):
             )
 
         await next()
+
+        # Only a call that reached the model counts; results whose images all
+        # failed to download are left for the next call as well.
+        if downloaded or not candidates:
+            thread_id = thread_id_var.get()
+            for content in selected:
+                if content.call_id:
+                    _injected.set((thread_id, content.call_id), True)
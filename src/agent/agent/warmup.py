@@ -0,0 +1,190 @@
+"""Startup warm-up for the agent service.
+
+The first request after a deploy used to pay for token acquisition, DNS and
+TLS on every backend it touched.  ``install_warmup`` runs those steps once
+when the server starts, on the shared credentials and connection pools from
+``agent.client_factories``:
+
+* Entra tokens for AI Services, AI Search, Storage and Cosmos (prod only);
+* one round trip each to AI Search, the embedding and chat endpoints, the
+  serving blob container and the Cosmos sessions container.
+
+``/readiness`` answers 503 until warm-up finishes.  Each step is
+best-effort: failures and timeouts are logged at error level and do not
+keep the pod out of rotation — the failing request path still reports its
+own error.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+from urllib.parse import urlsplit
+
+from starlette.responses import JSONResponse
+
+from agent.client_factories import (
+    _COGNITIVE_SCOPE,
+    close_shared_transports,
+    create_chat_client,
+    get_shared_async_credential,
+)
+from agent.config import config
+
+logger = logging.getLogger(__name__)
+
+_SEARCH_SCOPE = "https://search.azure.com/.default"
+_STORAGE_SCOPE = "https://storage.azure.com/.default"
+
+
+@dataclass
+class WarmupState:
+    """Readiness flag flipped once warm-up has finished."""
+
+    ready: bool = False
+
+
+def _cosmos_scope(endpoint: str) -> str:
+    parts = urlsplit(endpoint)
+    return f"{parts.scheme}://{parts.netloc}/.default"
+
+
+async def _acquire_tokens() -> None:
+    scopes = [_COGNITIVE_SCOPE, _SEARCH_SCOPE, _STORAGE_SCOPE]
+    if config.cosmos_endpoint:
+        scopes.append(_cosmos_scope(config.cosmos_endpoint))
+
+    credential = get_shared_async_credential()
+    await asyncio.gather(*(credential.get_token(scope) for scope in scopes))
+
+
+async def _open_search() -> None:
+    from agent import search_tool
+
+    await search_tool._get_async_search_client().get_document_count()
+
+
+async def _open_embeddings() -> None:
+    from agent import search_tool
+
+    await search_tool._get_async_embedding_backend().embed(["warm-up"])
+
+
+async def _open_chat() -> None:
+    await create_chat_client().client.models.list()
+
+
+async def _open_blob() -> None:
+    from agent.image_service import _get_blob_service_client
+
+    container = _get_blob_service_client().get_container_client(config.serving_container_name)
+    await container.get_container_properties()
+
+
+def warmup_steps(session_repository: Any | None = None) -> dict[str, Callable[[], Awaitable[None]]]:
+    """Named warm-up steps for the current configuration."""
+    steps: dict[str, Callable[[], Awaitable[None]]] = {}
+    if not config.is_dev:
+        steps["tokens"] = _acquire_tokens
+    if config.search_backend != "local":
+        steps["search"] = _open_search
+    steps["embeddings"] = _open_embeddings
+    steps["chat"] = _open_chat
+    if config.serving_blob_endpoint or config.azurite_connection_string:
+        steps["blob"] = _open_blob
+    if session_repository is not None and hasattr(session_repository, "warm_up"):
+        steps["cosmos"] = session_repository.warm_up
+    return steps
+
+
+async def _run_step(name: str, step: Callable[[], Awaitable[None]], timeout: float) -> bool:
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(step(), timeout=timeout)
+    except Exception as exc:  # noqa: BLE001 — warm-up is best-effort
+        logger.error("Warm-up step '%s' failed after %.0f ms: %r", name, (time.perf_counter() - started) * 1000, exc)
+        return False
+    logger.info("Warm-up step '%s' done in %.0f ms", name, (time.perf_counter() - started) * 1000)
+    return True
+
+
+async def warm_up(
+    steps: dict[str, Callable[[], Awaitable[None]]],
+    *,
+    timeout_seconds: float,
+) -> dict[str, bool]:
+    """Run ``steps`` concurrently, each bounded by ``timeout_seconds``.
+
+    Returns ``{step name: succeeded}``; never raises.
+    """
+    started = time.perf_counter()
+    outcomes = await asyncio.gather(*(_run_step(name, step, timeout_seconds) for name, step in steps.items()))
+    results = dict(zip(steps, outcomes))
+    failed = [name for name, succeeded in results.items() if not succeeded]
+    logger.log(
+        logging.ERROR if failed else logging.INFO,
+        "Warm-up finished in %.0f ms (%d/%d steps succeeded%s)",
+        (time.perf_counter() - started) * 1000,
+        len(outcomes) - len(failed),
+        len(outcomes),
+        f"; failed: {', '.join(failed)}" if failed else "",
+    )
+    return results
+
+
+def install_warmup(server: Any, *, session_repository: Any | None = None) -> WarmupState:
+    """Run warm-up in the server lifespan and gate ``/readiness`` on it.
+
+    Warm-up starts as a background task once the app has started, so
+    liveness probes are answered immediately.  On shutdown queued session
+    writes are flushed, then the shared connection pools and credentials are
+    closed.
+    """
+    state = WarmupState()
+    app_lifespan = server.app.router.lifespan_context
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        async with app_lifespan(app) as lifespan_state:
+            task: asyncio.Task | None = None
+            if config.startup_warmup:
+                async def run() -> None:
+                    try:
+                        await warm_up(
+                            warmup_steps(session_repository),
+                            timeout_seconds=config.startup_warmup_timeout_seconds,
+                        )
+                    finally:
+                        state.ready = True
+
+                task = asyncio.create_task(run())
+            else:
+                state.ready = True
+            try:
+                yield lifespan_state
+            finally:
+                if task is not None and not task.done():
+                    task.cancel()
+                    with contextlib.suppress(asyncio.CancelledError):
+                        await task
+                flush = getattr(session_repository, "flush", None)
+                if flush is not None:
+                    await flush()
+                await close_shared_transports()
+
+    server.app.router.lifespan_context = lifespan
+
+    agent_readiness = server.agent_readiness
+
+    async def readiness(request):
+        if not state.ready:
+            return JSONResponse({"status": "warming_up"}, status_code=503)
+        return await agent_readiness(request)
+
+    server.agent_readiness = readiness
+    return state
@@ -0,0 +1,146 @@
+"""Latency benchmark: in-process local search vs. AI Search.
+
+Times one hybrid search (vector + BM25, fused with RRF) per query on the
+local backend and, with ``--azure``, the equivalent hybrid query against the
+configured ``SEARCH_ENDPOINT`` (the AI Search simulator in dev).  Query
+vectors are taken from snapshot rows so both backends see identical input.
+
+Run from ``src/agent``::
+
+    # Synthetic snapshot, local backend only
+    .venv/bin/python -m benchmarks.bench_local_search --chunks 5000
+
+    # Exported snapshot, compared against the search simulator
+    .venv/bin/python -m agent.local_search_engine export ./data/search-snapshot
+    .venv/bin/python -m benchmarks.bench_local_search --snapshot ./data/search-snapshot --azure
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+
+import numpy as np
+
+from agent.local_search_engine import LocalSearchIndex, write_snapshot
+
+_VOCABULARY = (
+    "azure search index vector semantic ranker query filter storage blob container "
+    "identity network private endpoint latency throughput replica partition skillset "
+    "indexer chunk embedding model deployment quota region monitor alert"
+).split()
+
+
+def _synthetic_snapshot(directory: str, chunks: int, dimensions: int, seed: int) -> None:
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((chunks, dimensions)).astype(np.float32)
+    documents = []
+    for row in range(chunks):
+        words = rng.choice(_VOCABULARY, size=120)
+        documents.append({
+            "id": f"article-{row // 8}_{row % 8}",
+            "article_id": f"article-{row // 8}",
+            "chunk_index": row % 8,
+            "title": " ".join(words[:4]),
+            "section_header": "",
+            "content": " ".join(words),
+            "department": ("engineering", "finance", "research")[row % 3],
+            "content_vector": vectors[row].tolist(),
+        })
+    write_snapshot(directory, documents)
+
+
+def _percentiles(samples_ms: list[float]) -> str:
+    ordered = sorted(samples_ms)
+    q = statistics.quantiles(ordered, n=100) if len(ordered) > 1 else ordered * 99
+    return (
+        f"mean={statistics.fmean(ordered):7.2f}ms  p50={q[49]:7.2f}ms  "
+        f"p95={q[94]:7.2f}ms  p99={q[98]:7.2f}ms"
+    )
+
+
+async def _time_async(label: str, runs: list[Callable[[], Awaitable[object]]]) -> None:
+    samples = []
+    for run in runs:
+        started = time.perf_counter()
+        await run()
+        samples.append((time.perf_counter() - started) * 1000)
+    print(f"{label:<14} n={len(samples):<5} {_percentiles(samples)}")
+
+
+async def _benchmark(args: argparse.Namespace, snapshot: str) -> None:
+    from agent import search_tool
+    from agent.search_result_cache import SearchResultCache
+
+    index = LocalSearchIndex.load(snapshot)
+    # Measure the backends, not the result cache.
+    search_tool._result_cache = SearchResultCache(max_entries=0, ttl_seconds=0, watermark_interval_seconds=0)
+    search_tool._local_index = index
+
+    rng = np.random.default_rng(args.seed)
+    rows = rng.integers(0, len(index), size=args.queries)
+    queries = [
+        (index.document(int(row)).get("title") or "search", np.asarray(index._vectors[int(row)]).tolist())
+        for row in rows
+    ]
+    security_filter = "search.in(department, 'engineering', ',')" if args.filtered else None
+
+    print(f"snapshot: {len(index)} chunks × {index.dimensions} dims, top={args.top}, filtered={args.filtered}")
+
+    async def local(text: str, vector: list[float]) -> None:
+        search_tool._search_local(search_text=text, query_vector=vector, top=args.top, security_filter=security_filter)
+
+    await _time_async("local", [lambda t=text, v=vector: local(t, v) for text, vector in queries])
+
+    if args.azure:
+        from azure.search.documents.models import VectorizedQuery
+
+        client = search_tool._get_async_search_client()
+        azure_filter = search_tool._normalize_security_filter_for_local_search(security_filter)
+
+        async def azure(text: str, vector: list[float]) -> None:
+            results = await client.search(
+                search_text=text,
+                vector_queries=[VectorizedQuery(vector=vector, k=args.top, fields="content_vector")],
+                select=search_tool._SELECT_FIELDS,
+                top=args.top,
+                filter=azure_filter,
+            )
+            async for _ in results:
+                pass
+
+        await azure(*queries[0])  # warm the connection pool
+        await _time_async("ai-search", [lambda t=text, v=vector: azure(t, v) for text, vector in queries])
+        await client.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local search vs. AI Search latency benchmark")
+    parser.add_argument("--snapshot", help="Snapshot directory (default: synthesize one)")
+    parser.add_argument("--chunks", type=int, default=5000, help="Synthetic snapshot size")
+    parser.add_argument("--dimensions", type=int, default=1024, help="Synthetic vector dimensions")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--filtered", action="store_true", help="Apply a department filter")
+    parser.add_argument("--azure", action="store_true", help="Also time the configured SEARCH_ENDPOINT")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    if args.snapshot:
+        asyncio.run(_benchmark(args, args.snapshot))
+        return
+
+    if args.azure:
+        parser.error("--azure needs --snapshot exported from the same index")
+
+    with tempfile.TemporaryDirectory() as directory:
+        _synthetic_snapshot(directory, args.chunks, args.dimensions, args.seed)
+        asyncio.run(_benchmark(args, directory))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Storage benchmark: session documents with and without compression.
+
+Builds conversations the way the agent persists them — an ``AgentSession``
+whose in-memory history holds a user question, a search tool call with its
+result and an answer per turn — compacts them for storage, and encodes the
+``{"id", "session"}`` document with each codec.  Reported per conversation
+length:
+
+* ``stored``  — JSON bytes of the document as sent to Cosmos DB
+* ``indexed`` — scalar values in the document; the ``agent-sessions``
+  indexing policy indexes everything under ``/session``, and write RU
+  grows with the number of indexed values as well as with size
+* ``read RU`` — point-read charge proxy, ~1 RU per started KiB
+* ``encode`` / ``decode`` — CPU time from session dict to request body
+  and back, including the JSON (de)serialization the Cosmos SDK does
+  (median)
+
+Run from ``src/agent``::
+
+    .venv/bin/python -m benchmarks.bench_session_codec --turns 5 20 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import statistics
+import time
+from typing import Any
+
+from agent_framework import AgentSession, Content, Message
+
+from agent.search_result_store import compact_serialized_session_for_storage
+from agent.session_codec import decode_fields, encode_fields
+from agent.tool_results import SearchToolResult
+
+_VOCABULARY = (
+    "azure search index vector semantic ranker query filter storage blob container identity network "
+    "private endpoint latency throughput replica partition skillset indexer chunk embedding model "
+    "deployment quota region monitor alert configure enable portal resource pricing tier capacity "
+    "the a to of and for with in on by is are can you your when this that use set"
+).split()
+
+
+def _prose(rng: random.Random, chars: int) -> str:
+    words: list[str] = []
+    length = 0
+    while length < chars:
+        word = rng.choice(_VOCABULARY)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)[:chars]
+
+
+def _payload(rng: random.Random, turn: int, rows: int, content_chars: int) -> SearchToolResult:
+    results = []
+    for rank in range(1, rows + 1):
+        article_id = f"article-{rng.randrange(10_000):04d}"
+        results.append(
+            {
+                "ref_number": rank,
+                "chunk_id": f"{article_id}_{rank}",
+                "content": _prose(rng, content_chars),
+                "title": _prose(rng, 40).title(),
+                "section_header": _prose(rng, 30).capitalize(),
+                "article_id": article_id,
+                "chunk_index": rank,
+                "summary": _prose(rng, 400),
+                "indexed_at": "2026-01-01T00:00:00Z",
+                "image_urls": [f"images/figure-{turn}-{rank}.png"],
+                "images": [{"name": f"figure-{turn}-{rank}.png", "url": f"/api/images/{article_id}/images/figure.png"}],
+            }
+        )
+    return SearchToolResult(results=results, summary=f"{rows} results")
+
+
+def _session(turns: int, rows: int, content_chars: int) -> dict[str, Any]:
+    rng = random.Random(turns)
+    messages: list[Message] = []
+    for turn in range(turns):
+        call_id = f"call_{turn}"
+        messages.append(Message(role="user", contents=[f"How do I configure the semantic ranker? ({turn})"]))
+        messages.append(
+            Message(
+                role="assistant",
+                contents=[
+                    Content.from_function_call(
+                        call_id=call_id,
+                        name="search_knowledge_base",
+                        arguments={"query": f"semantic ranker configuration {turn}"},
+                    )
+                ],
+            )
+        )
+        messages.append(
+            Message(
+                role="tool",
+                contents=[
+                    Content.from_function_result(call_id=call_id, result=_payload(rng, turn, rows, content_chars).text)
+                ],
+            )
+        )
+        messages.append(Message(role="assistant", contents=[_prose(rng, 600) + " [1][2]"]))
+
+    session = AgentSession(session_id=f"session-{turns}")
+    session.state["in_memory"] = {"messages": messages}
+    return compact_serialized_session_for_storage(session.to_dict())
+
+
+def _scalars(value: Any) -> int:
+    if isinstance(value, dict):
+        return sum(_scalars(item) for item in value.values())
+    if isinstance(value, list):
+        return sum(_scalars(item) for item in value)
+    return 1
+
+
+def _median_ms(step, repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        step()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Session codec storage benchmark")
+    parser.add_argument("--turns", type=int, nargs="+", default=[5, 20, 50], help="Conversation lengths")
+    parser.add_argument("--rows", type=int, default=5, help="Search results per tool call")
+    parser.add_argument("--content-chars", type=int, default=3000, help="Chunk content size")
+    parser.add_argument("--repeats", type=int, default=20, help="Timing repetitions")
+    args = parser.parse_args()
+
+    codecs = ["none", "gzip"]
+    print(f"rows={args.rows} content={args.content_chars} chars, codecs={', '.join(codecs)}")
+    for turns in args.turns:
+        doc = {"id": f"conv-{turns}", "session": _session(turns, args.rows, args.content_chars)}
+        for codec in codecs:
+            encoded = encode_fields(doc, ("session",), codec)
+            body = json.dumps(encoded, separators=(",", ":"))
+            stored = len(body.encode())
+            encode_ms = _median_ms(lambda: json.dumps(encode_fields(doc, ("session",), codec)), args.repeats)
+            decode_ms = _median_ms(lambda: decode_fields(json.loads(body)), args.repeats)
+            print(
+                f"turns={turns:<4} {codec:<5} stored={stored / 1024:8.1f} KiB indexed={_scalars(encoded):6d} "
+                f"read RU≈{math.ceil(stored / 1024):4d} encode={encode_ms:6.2f} ms decode={decode_ms:6.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
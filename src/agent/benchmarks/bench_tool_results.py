@@ -0,0 +1,160 @@
+"""Allocation benchmark: search tool results consumed by the chat middleware.
+
+Replays a synthetic conversation in which every turn runs one search.  Each
+turn makes two LLM calls (tool call, then answer) — each call runs the vision
+and grounding middleware over the whole history — and then persists the
+compacted session.  Three ways of carrying tool results are compared:
+
+* ``reparse`` — JSON strings decoded by every consumer (no shared memo)
+* ``memo``    — JSON strings decoded once through the shared parse memo
+* ``typed``   — :class:`SearchToolResult` payloads read directly
+
+Peak traced memory, wall time and JSON bytes decoded by the middleware
+passes and by the persistence step are reported per turn, averaged over the
+last ``--turns`` turns.
+
+Run from ``src/agent``::
+
+    .venv/bin/python -m benchmarks.bench_tool_results --turns 20 --rows 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+import tracemalloc
+from collections.abc import Callable
+
+from agent_framework import Content, Message
+
+from agent import tool_results
+from agent.grounding_middleware import _latest_search_results
+from agent.search_result_store import compact_serialized_session_for_storage
+from agent.tool_results import SearchToolResult, render_tool_result
+from agent.vision_middleware import _collect_image_keys, _function_results
+
+MODES = ("reparse", "memo", "typed")
+_LLM_CALLS_PER_TURN = 2
+
+
+def _payload(turn: int, rows: int, content_chars: int) -> SearchToolResult:
+    body = ("Azure AI Search indexes chunked articles with vector and keyword fields. " * 64)[:content_chars]
+    return SearchToolResult(
+        results=[
+            {
+                "ref_number": rank,
+                "chunk_id": f"article-{turn}-{rank}_0",
+                "content": body,
+                "title": f"Article {turn}-{rank}",
+                "section_header": "Overview",
+                "article_id": f"article-{turn}-{rank}",
+                "chunk_index": 0,
+                "summary": body[:200],
+                "indexed_at": "2026-01-01T00:00:00Z",
+                "image_urls": ["images/diagram.png"],
+                "images": [{"name": "diagram.png", "url": f"/api/images/article-{turn}-{rank}/images/diagram.png"}],
+            }
+            for rank in range(1, rows + 1)
+        ],
+        summary=f"{rows} results",
+    )
+
+
+def _tool_message(mode: str, call_id: str, payload: SearchToolResult) -> Message:
+    result = render_tool_result(payload) if mode == "typed" else payload.text
+    return Message(role="tool", contents=[Content.from_function_result(call_id=call_id, result=result)])
+
+
+def _run_middleware(mode: str, messages: list[Message]) -> None:
+    consumers: list[Callable[[], object]] = [
+        lambda: _collect_image_keys(_function_results(messages)),
+        lambda: _latest_search_results(messages),
+    ]
+    for _call in range(_LLM_CALLS_PER_TURN):
+        for consumer in consumers:
+            if mode == "reparse":
+                tool_results.clear_tool_result_cache()
+            consumer()
+
+
+def _persist(mode: str, messages: list[Message]) -> None:
+    if mode == "reparse":
+        tool_results.clear_tool_result_cache()
+    compact_serialized_session_for_storage({"messages": [message.to_dict() for message in messages]})
+
+
+class _DecodeCounter:
+    """Wraps the tool-result decoder to count the JSON bytes it parses."""
+
+    def __init__(self) -> None:
+        self.decoded = 0
+        self._decode = tool_results._decode
+
+    def __call__(self, text: str):
+        self.decoded += len(text)
+        return self._decode(text)
+
+
+def _measure(counter: _DecodeCounter, step: Callable[[], None]) -> tuple[int, float, int]:
+    """Return peak traced bytes, wall time and decoded JSON bytes of ``step``."""
+    counter.decoded = 0
+    tracemalloc.reset_peak()
+    baseline, _ = tracemalloc.get_traced_memory()
+    started = time.perf_counter()
+    step()
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    return peak - baseline, elapsed_ms, counter.decoded
+
+
+def _run(mode: str, args: argparse.Namespace) -> dict[str, list[tuple[int, float, int]]]:
+    tool_results.clear_tool_result_cache()
+    counter = _DecodeCounter()
+    tool_results._decode = counter
+    messages: list[Message] = []
+    samples: dict[str, list[tuple[int, float, int]]] = {"middleware": [], "persist": []}
+
+    tracemalloc.start()
+    try:
+        for turn in range(args.history + args.turns):
+            messages.append(Message(role="user", contents=[f"question {turn}"]))
+            messages.append(_tool_message(mode, f"call_{turn}", _payload(turn, args.rows, args.content_chars)))
+
+            middleware = _measure(counter, lambda: _run_middleware(mode, messages))
+            persist = _measure(counter, lambda: _persist(mode, messages))
+            if turn >= args.history:
+                samples["middleware"].append(middleware)
+                samples["persist"].append(persist)
+    finally:
+        tracemalloc.stop()
+        tool_results._decode = counter._decode
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Tool-result allocation benchmark")
+    parser.add_argument("--history", type=int, default=20, help="Turns replayed before measuring")
+    parser.add_argument("--turns", type=int, default=20, help="Measured turns")
+    parser.add_argument("--rows", type=int, default=5, help="Search results per tool call")
+    parser.add_argument("--content-chars", type=int, default=3000, help="Chunk content size")
+    args = parser.parse_args()
+
+    print(
+        f"history={args.history} turns={args.turns} rows={args.rows} "
+        f"content={args.content_chars} chars, {_LLM_CALLS_PER_TURN} LLM calls/turn"
+    )
+    for mode in MODES:
+        columns = []
+        for step, samples in _run(mode, args).items():
+            peak_kib = statistics.fmean(peak for peak, _, _ in samples) / 1024
+            time_ms = statistics.fmean(elapsed for _, elapsed, _ in samples)
+            decoded_kib = statistics.fmean(decoded for _, _, decoded in samples) / 1024
+            columns.append(
+                f"{step}: peak={peak_kib:7.1f} KiB decoded={decoded_kib:8.1f} KiB {time_ms:6.2f} ms"
+            )
+        print(f"{mode:<8} " + "   ".join(columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -268,12 +268,12 @@ from agent_framework_ag_ui._types import AGUIRequest
 from fastapi import Depends, FastAPI, HTTPException
 from fastapi.responses import StreamingResponse
 
-from agent.group_resolver import resolve_departments
 from agent.image_service import get_image_url
-from agent.search_result_store import find_citation_reference
-from agent.search_tool import build_security_filter, get_chunk_by_id
-from middleware.request_context import user_claims_var
+from agent.search_result_store import find_citation_reference, find_citation_references
+from agent.search_tool import SearchResult, build_security_filter, get_chunk_by_id_async, get_chunks_by_ids_async
+from agent.security_middleware import request_departments
 from middleware.jwt_auth import JWTAuthMiddleware, require_jwt_auth
+from middleware.request_context import thread_id_var
 
 
 class _PersistedSessionAgent:
@@ -1470,6 +1470,7 @@ def _add_persisted_ag_ui_endpoint(
     async def agent_endpoint(request_body: AGUIRequest) -> StreamingResponse:
         try:
             input_data = request_body.model_dump(exclude_none=True)
+            thread_id_var.set(str(input_data.get("thread_id") or ""))
             logger.debug(
                 f"[{path}] Received request - Run ID: {input_data.get('run_id', 'no-run-id')}, "
                 f"Thread ID: {input_data.get('thread_id', 'no-thread-id')}, "
@@ -1598,6 +1599,49 @@ def _create_ag_ui_app(
     return ag_ui_app
 
 
+async def _citation_security_filter() -> str | None:
+    return build_security_filter(await request_departments())
+
+
+def _enrich_citation(stored_citation: dict[str, Any], current_chunk: SearchResult) -> dict[str, Any]:
+    """Merge a stored compact citation row with the live chunk from the index."""
+    citation = {
+        **stored_citation,
+        "chunk_id": current_chunk.id,
+        "article_id": current_chunk.article_id,
+        "chunk_index": current_chunk.chunk_index,
+        "title": current_chunk.title or stored_citation.get("title"),
+        "section_header": current_chunk.section_header or stored_citation.get("section_header"),
+        "summary": current_chunk.summary or stored_citation.get("summary"),
+        "content": current_chunk.content,
+        "indexed_at": current_chunk.indexed_at or stored_citation.get("indexed_at"),
+        "image_urls": list(current_chunk.image_urls),
+        "images": [
+            {"name": url.split("/")[-1], "url": get_image_url(current_chunk.article_id, url)}
+            for url in current_chunk.image_urls
+        ] if current_chunk.image_urls else [],
+        "content_source": "full",
+    }
+    status = "ready"
+    stored_indexed_at = stored_citation.get("indexed_at")
+    if (
+        isinstance(stored_indexed_at, str)
+        and stored_indexed_at
+        and current_chunk.indexed_at
+        and stored_indexed_at != current_chunk.indexed_at
+    ):
+        status = "stale"
+
+    return {"status": status, "citation": citation}
+
+
+def _stored_chunk_id(stored_citation: dict[str, Any]) -> str | None:
+    chunk_id = stored_citation.get("chunk_id")
+    if not isinstance(chunk_id, str) or not chunk_id.strip():
+        return None
+    return chunk_id
+
+
 def _create_citation_lookup_app(session_repository) -> FastAPI:
     """Build a protected API for transcript-scoped citation enrichment."""
     citation_app = FastAPI(
@@ -1608,6 +1652,65 @@ def _create_citation_lookup_app(session_repository) -> FastAPI:
         redirect_slashes=False,
     )
 
+    async def read_session(thread_id: str) -> Any:
+        try:
+            return await session_repository.read_from_storage(thread_id)
+        except Exception:
+            logger.exception("Failed to read session for citation lookup (thread=%s)", thread_id)
+            return None
+
+    async def resolve_references(references: dict[str, list[dict[str, Any]]]) -> dict[str, list[dict[str, Any]]]:
+        """Enrich every stored row with one bulk chunk lookup."""
+        chunk_ids = [
+            chunk_id
+            for rows in references.values()
+            for row in rows
+            if (chunk_id := _stored_chunk_id(row)) is not None
+        ]
+        try:
+            chunks = await get_chunks_by_ids_async(chunk_ids, security_filter=await _citation_security_filter())
+        except Exception:
+            logger.exception("Failed to fetch %d chunks for bulk citation lookup", len(chunk_ids))
+            chunks = {}
+
+        resolved: dict[str, list[dict[str, Any]]] = {}
+        for tool_call_id, rows in references.items():
+            entries: list[dict[str, Any]] = []
+            for row in rows:
+                chunk_id = _stored_chunk_id(row)
+                current_chunk = chunks.get(chunk_id) if chunk_id else None
+                if current_chunk is None:
+                    entries.append({"ref_number": row.get("ref_number"), "status": "missing"})
+                else:
+                    entries.append({"ref_number": row.get("ref_number"), **_enrich_citation(row, current_chunk)})
+            resolved[tool_call_id] = entries
+        return resolved
+
+    @citation_app.get(
+        "/{thread_id}",
+        dependencies=[Depends(require_jwt_auth)],
+    )
+    async def get_thread_citations(thread_id: str) -> dict[str, Any]:
+        serialized_session = await read_session(thread_id)
+        if not serialized_session:
+            return {"tool_calls": {}}
+
+        references = find_citation_references(serialized_session)
+        return {"tool_calls": await resolve_references(references)}
+
+    @citation_app.get(
+        "/{thread_id}/{tool_call_id}",
+        dependencies=[Depends(require_jwt_auth)],
+    )
+    async def get_tool_call_citations(thread_id: str, tool_call_id: str) -> dict[str, Any]:
+        serialized_session = await read_session(thread_id)
+        if not serialized_session:
+            return {"citations": []}
+
+        references = find_citation_references(serialized_session, tool_call_id=tool_call_id)
+        resolved = await resolve_references(references)
+        return {"citations": resolved.get(tool_call_id, [])}
+
     @citation_app.get(
         "/{thread_id}/{tool_call_id}/{ref_number}",
         dependencies=[Depends(require_jwt_auth)],
@@ -1616,12 +1719,7 @@ def _create_citation_lookup_app(session_repository) -> FastAPI:
         if ref_number < 1:
             return {"status": "missing"}
 
-        try:
-            serialized_session = await session_repository.read_from_storage(thread_id)
-        except Exception:
-            logger.exception("Failed to read session for citation lookup (thread=%s)", thread_id)
-            return {"status": "missing"}
-
+        serialized_session = await read_session(thread_id)
         if not serialized_session:
             return {"status": "missing"}
 
@@ -1633,49 +1731,20 @@ def _create_citation_lookup_app(session_repository) -> FastAPI:
         if not stored_citation:
             return {"status": "missing"}
 
-        chunk_id = stored_citation.get("chunk_id")
-        if not isinstance(chunk_id, str) or not chunk_id.strip():
+        chunk_id = _stored_chunk_id(stored_citation)
+        if chunk_id is None:
             return {"status": "missing"}
 
-        claims = user_claims_var.get()
-        groups = claims.get("groups", []) if isinstance(claims, dict) else []
-        departments = resolve_departments(groups) if groups else []
-        security_filter = build_security_filter(departments)
-
         try:
-            current_chunk = get_chunk_by_id(chunk_id, security_filter=security_filter)
+            current_chunk = await get_chunk_by_id_async(chunk_id, security_filter=await _citation_security_filter())
         except Exception:
             logger.exception("Failed to fetch chunk '%s' for citation lookup", chunk_id)
             return {"status": "missing"}
 
-        citation = {
-            **stored_citation,
-            "chunk_id": current_chunk.id,
-            "article_id": current_chunk.article_id,
-            "chunk_index": current_chunk.chunk_index,
-            "title": current_chunk.title or stored_citation.get("title"),
-            "section_header": current_chunk.section_header or stored_citation.get("section_header"),
-            "summary": current_chunk.summary or stored_citation.get("summary"),
-            "content": current_chunk.content,
-            "indexed_at": current_chunk.indexed_at or stored_citation.get("indexed_at"),
-            "image_urls": list(current_chunk.image_urls),
-            "images": [
-                {"name": url.split("/")[-1], "url": get_image_url(current_chunk.article_id, url)}
-                for url in current_chunk.image_urls
-            ] if current_chunk.image_urls else [],
-            "content_source": "full",
-        }
-        status = "ready"
-        stored_indexed_at = stored_citation.get("indexed_at")
-        if (
-            isinstance(stored_indexed_at, str)
-            and stored_indexed_at
-            and current_chunk.indexed_at
-            and stored_indexed_at != current_chunk.indexed_at
-        ):
-            status = "stale"
-
-        return {"status": status, "citation": citation}
+        if current_chunk is None:
+            return {"status": "missing"}
+
+        return _enrich_citation(stored_citation, current_chunk)
 
     return citation_app
 
@@ -1709,7 +1778,20 @@ def main() -> None:
         endpoint=config.cosmos_endpoint,
         database_name=config.cosmos_database_name,
         container_name=config.cosmos_sessions_container,
+        layout=config.session_storage_layout,
+        codec=config.session_codec,
+        cache_max_entries=config.session_cache_max_entries,
+        cache_ttl_seconds=config.session_cache_ttl_seconds,
+        cache_revalidate_seconds=config.session_cache_revalidate_seconds,
     )
+    if config.session_write_behind:
+        from agent.session_write_behind import WriteBehindSessionRepository
+
+        session_repo = WriteBehindSessionRepository(
+            session_repo,
+            max_pending=config.session_write_behind_max_pending,
+            flush_timeout_seconds=config.session_write_behind_flush_timeout_seconds,
+        )
     logger.info("[KB-AGENT] Session persistence enabled (Cosmos DB)")
 
     # from_agent_framework() handles both Agent and Callable[[], Workflow].
@@ -1787,6 +1869,12 @@ def main() -> None:
 
     if session_repo is not None:
         server.app.mount("/citations", _create_citation_lookup_app(session_repo))
+
+    # Pre-acquire tokens and open pooled connections before /readiness
+    # reports ready, so the first routed request doesn't pay for them.
+    from agent.warmup import install_warmup
+
+    install_warmup(server, session_repository=session_repo)
     server.run()
 
 
@@ -22,7 +22,7 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from starlette.responses import JSONResponse
 
-from middleware.request_context import user_claims_var
+from middleware.request_context import resolved_departments_var, user_claims_var
 
 logger = logging.getLogger(__name__)
 
@@ -58,8 +58,14 @@ def _get_header_groups(request: Request) -> list[str]:
     return [group.strip() for group in header_groups.split(",") if group.strip()]
 
 
+def _set_claims(claims: dict) -> None:
+    user_claims_var.set(claims)
+    # Departments are resolved lazily from the new claims.
+    resolved_departments_var.set(None)
+
+
 def _set_dev_claims(request: Request) -> None:
-    user_claims_var.set({
+    _set_claims({
         "user_id": "dev-user",
         "tenant_id": "dev-tenant",
         "groups": _get_header_groups(request) or ["dev-group-guid"],
@@ -113,7 +119,7 @@ def _validate_request(request: Request) -> None:
     if not groups:
         groups = _get_header_groups(request)
 
-    user_claims_var.set({
+    _set_claims({
         "user_id": claims.get("oid", ""),
         "tenant_id": claims.get("tid", ""),
         "groups": groups,
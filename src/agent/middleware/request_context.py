@@ -3,7 +3,8 @@
 Defines ``ContextVar`` instances that carry JWT claims and resolved
 department names through the async call stack.  Set by
 :class:`middleware.jwt_auth.JWTAuthMiddleware` and read by
-:class:`agent.security_middleware.SecurityFilterMiddleware`.
+:class:`agent.security_middleware.SecurityFilterMiddleware`.  The AG-UI
+thread id travels the same way.
 """
 
 from __future__ import annotations
@@ -17,11 +18,20 @@ Keys: ``user_id``, ``tenant_id``, ``groups`` (list[str]), ``roles`` (list[str]).
 Default dev claims are set when ``REQUIRE_AUTH=false``.
 """
 
-resolved_departments_var: ContextVar[list[str]] = ContextVar(
-    "resolved_departments", default=[]
+resolved_departments_var: ContextVar[frozenset[str] | None] = ContextVar(
+    "resolved_departments", default=None
 )
-"""Department names resolved from Entra group GUIDs.
+"""Department names resolved from Entra group GUIDs, or ``None`` until resolved.
 
-Populated by :class:`agent.security_middleware.SecurityFilterMiddleware`
-after calling :func:`agent.group_resolver.resolve_departments`.
+Populated on first use by :func:`agent.security_middleware.request_departments`
+and reset by the auth middleware whenever it sets new claims, so groups are
+resolved once per request.
+"""
+
+thread_id_var: ContextVar[str] = ContextVar("thread_id", default="")
+"""AG-UI thread id of the current request, or ``""`` outside one.
+
+Set by the AG-UI endpoint in ``main.py`` and read by
+:class:`agent.vision_middleware.VisionImageMiddleware` to scope its
+per-conversation state.
 """
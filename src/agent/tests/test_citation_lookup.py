@@ -2,11 +2,14 @@
 
 from __future__ import annotations
 
+from unittest.mock import AsyncMock
+
 from starlette.applications import Starlette
 from starlette.testclient import TestClient
 
 import pytest
 
+from agent.search_tool import SearchResult
 from main import _create_citation_lookup_app
 
 
@@ -18,6 +21,39 @@ class _FakeSessionRepository:
         return self.serialized_session if conversation_id == "thread-123" else None
 
 
+def _tool_message(tool_call_id: str, chunk_ids: list[str]) -> dict:
+    return {
+        "id": f"msg-{tool_call_id}",
+        "role": "tool",
+        "toolCallId": tool_call_id,
+        "toolName": "search_knowledge_base",
+        "content": {
+            "results": [
+                {"ref_number": index, "chunk_id": chunk_id, "article_id": chunk_id.rsplit("_", 1)[0]}
+                for index, chunk_id in enumerate(chunk_ids, start=1)
+            ],
+        },
+    }
+
+
+def _search_result(chunk_id: str) -> SearchResult:
+    return SearchResult(
+        id=chunk_id,
+        article_id=chunk_id.rsplit("_", 1)[0],
+        chunk_index=int(chunk_id.rsplit("_", 1)[1]),
+        content=f"Full content of {chunk_id}",
+        title="Overview",
+        section_header="Intro",
+    )
+
+
+def _async_chunk_lookup(chunk):
+    async def _lookup(document_id: str, security_filter: str | None = None):
+        return chunk
+
+    return _lookup
+
+
 class TestCitationLookupEndpoint:
     def test_mount_enforces_auth_when_enabled(self, monkeypatch: pytest.MonkeyPatch) -> None:
         monkeypatch.setenv("REQUIRE_AUTH", "true")
@@ -80,7 +116,7 @@ class TestCitationLookupEndpoint:
 
         client = TestClient(app, raise_server_exceptions=False)
         with pytest.MonkeyPatch.context() as route_patch:
-            route_patch.setattr("main.get_chunk_by_id", lambda document_id, security_filter=None: _Chunk())
+            route_patch.setattr("main.get_chunk_by_id_async", _async_chunk_lookup(_Chunk()))
             response = client.get("/citations/thread-123/tool-call-1/1")
 
         assert response.status_code == 200
@@ -146,7 +182,7 @@ class TestCitationLookupEndpoint:
 
         client = TestClient(app, raise_server_exceptions=False)
         with pytest.MonkeyPatch.context() as route_patch:
-            route_patch.setattr("main.get_chunk_by_id", lambda document_id, security_filter=None: _Chunk())
+            route_patch.setattr("main.get_chunk_by_id_async", _async_chunk_lookup(_Chunk()))
             response = client.get("/citations/thread-123/tool-call-1/1")
 
         assert response.status_code == 200
@@ -196,14 +232,17 @@ class TestCitationLookupEndpoint:
         captured: dict[str, str | None] = {}
         client = TestClient(app, raise_server_exceptions=False)
         with pytest.MonkeyPatch.context() as route_patch:
-            route_patch.setattr("main.resolve_departments", lambda groups: ["engineering", "marketing"])
+            route_patch.setattr(
+                "agent.security_middleware.resolve_departments",
+                AsyncMock(return_value=frozenset({"engineering", "marketing"})),
+            )
 
-            def _fake_get_chunk(document_id: str, security_filter: str | None = None):
+            async def _fake_get_chunk(document_id: str, security_filter: str | None = None):
                 captured["document_id"] = document_id
                 captured["security_filter"] = security_filter
                 return _Chunk()
 
-            route_patch.setattr("main.get_chunk_by_id", _fake_get_chunk)
+            route_patch.setattr("main.get_chunk_by_id_async", _fake_get_chunk)
             response = client.get(
                 "/citations/thread-123/tool-call-1/1",
                 headers={"x-user-groups": "group-a,group-b"},
@@ -280,9 +319,120 @@ class TestCitationLookupEndpoint:
 
         client = TestClient(app, raise_server_exceptions=False)
         with pytest.MonkeyPatch.context() as route_patch:
-            route_patch.setattr("main.get_chunk_by_id", lambda document_id, security_filter=None: _Chunk())
+            route_patch.setattr("main.get_chunk_by_id_async", _async_chunk_lookup(_Chunk()))
             response = client.get("/citations/thread-123/tool-call-1/1")
 
         assert response.status_code == 200
         assert response.json()["status"] == "ready"
-        assert response.json()["citation"]["content"] == "Full chunk content loaded on demand."
\ No newline at end of file
+        assert response.json()["citation"]["content"] == "Full chunk content loaded on demand."
+
+    def test_returns_missing_when_chunk_is_not_visible(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setenv("REQUIRE_AUTH", "false")
+
+        serialized_session = {
+            "state": {
+                "messages": [
+                    {
+                        "id": "tool-1",
+                        "role": "tool",
+                        "toolCallId": "tool-call-1",
+                        "toolName": "search_knowledge_base",
+                        "content": {
+                            "results": [{"ref_number": 1, "chunk_id": "article-1_0", "article_id": "article-1"}],
+                        },
+                    },
+                ],
+            },
+        }
+
+        app = Starlette()
+        app.mount("/citations", _create_citation_lookup_app(_FakeSessionRepository(serialized_session)))
+        client = TestClient(app, raise_server_exceptions=False)
+        with pytest.MonkeyPatch.context() as route_patch:
+            route_patch.setattr("main.get_chunk_by_id_async", _async_chunk_lookup(None))
+            response = client.get("/citations/thread-123/tool-call-1/1")
+
+        assert response.status_code == 200
+        assert response.json() == {"status": "missing"}
+
+
+class TestBulkCitationLookupEndpoints:
+    def _app(self, serialized_session) -> tuple[TestClient, _FakeSessionRepository]:
+        repository = _FakeSessionRepository(serialized_session)
+        reads: list[str] = []
+        original_read = repository.read_from_storage
+
+        async def counting_read(conversation_id: str):
+            reads.append(conversation_id)
+            return await original_read(conversation_id)
+
+        repository.read_from_storage = counting_read
+        repository.reads = reads
+        app = Starlette()
+        app.mount("/citations", _create_citation_lookup_app(repository))
+        return TestClient(app, raise_server_exceptions=False), repository
+
+    def test_tool_call_citations_use_one_session_read_and_one_chunk_query(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setenv("REQUIRE_AUTH", "false")
+        client, repository = self._app({
+            "state": {
+                "messages": [
+                    _tool_message("tool-call-1", ["a_0", "a_1", "b_4"]),
+                    _tool_message("tool-call-2", ["c_0"]),
+                ],
+            },
+        })
+        lookups: list[tuple[list[str], str | None]] = []
+
+        async def _fake_get_chunks(document_ids, security_filter=None):
+            lookups.append((list(document_ids), security_filter))
+            return {chunk_id: _search_result(chunk_id) for chunk_id in ("a_0", "b_4")}
+
+        with pytest.MonkeyPatch.context() as route_patch:
+            route_patch.setattr(
+                "agent.security_middleware.resolve_departments",
+                AsyncMock(return_value=frozenset({"engineering"})),
+            )
+            route_patch.setattr("main.get_chunks_by_ids_async", _fake_get_chunks)
+            response = client.get("/citations/thread-123/tool-call-1", headers={"x-user-groups": "group-a"})
+
+        assert response.status_code == 200
+        citations = response.json()["citations"]
+        assert [(c["ref_number"], c["status"]) for c in citations] == [(1, "ready"), (2, "missing"), (3, "ready")]
+        assert citations[2]["citation"]["content"] == "Full content of b_4"
+        assert repository.reads == ["thread-123"]
+        assert lookups == [(["a_0", "a_1", "b_4"], "search.in(department, 'engineering', ',')")]
+
+    def test_thread_citations_group_rows_by_tool_call(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setenv("REQUIRE_AUTH", "false")
+        client, repository = self._app({
+            "state": {
+                "messages": [
+                    _tool_message("tool-call-1", ["a_0"]),
+                    _tool_message("tool-call-2", ["c_0", "c_1"]),
+                ],
+            },
+        })
+
+        async def _fake_get_chunks(document_ids, security_filter=None):
+            return {chunk_id: _search_result(chunk_id) for chunk_id in document_ids}
+
+        with pytest.MonkeyPatch.context() as route_patch:
+            route_patch.setattr("main.get_chunks_by_ids_async", _fake_get_chunks)
+            response = client.get("/citations/thread-123")
+
+        assert response.status_code == 200
+        tool_calls = response.json()["tool_calls"]
+        assert list(tool_calls) == ["tool-call-1", "tool-call-2"]
+        assert [c["citation"]["chunk_id"] for c in tool_calls["tool-call-2"]] == ["c_0", "c_1"]
+        assert repository.reads == ["thread-123"]
+
+    def test_unknown_thread_returns_empty(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setenv("REQUIRE_AUTH", "false")
+        client, _ = self._app(None)
+
+        assert client.get("/citations/thread-404").json() == {"tool_calls": {}}
+        assert client.get("/citations/thread-404/tool-call-1").json() == {"citations": []}
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 
 def test_chat_factory_uses_ollama_chat_client_in_dev(monkeypatch):
@@ -72,4 +72,128 @@ def test_async_cosmos_factory_disables_endpoint_discovery_in_dev(monkeypatch):
         kwargs = mock_client.call_args.kwargs
         assert kwargs["credential"] == "emulator-key"
         assert kwargs["connection_verify"] is False
-        assert kwargs["enable_endpoint_discovery"] is False
\ No newline at end of file
+        assert kwargs["enable_endpoint_discovery"] is False
+
+
+def test_async_search_factory_uses_api_key_in_dev(monkeypatch):
+    monkeypatch.setenv("ENVIRONMENT", "dev")
+    monkeypatch.setenv("SEARCH_ENDPOINT", "https://localhost:7250")
+    monkeypatch.setenv("SEARCH_API_KEY", "dev-admin-key")
+
+    from agent import config as cfg_mod
+    from agent.client_factories import create_async_search_client
+
+    cfg_mod._config = None
+
+    with patch("agent.client_factories.AsyncSearchClient") as mock_client:
+        create_async_search_client()
+        assert mock_client.call_args.kwargs["connection_verify"] is False
+
+
+def test_async_query_embedding_backend_uses_ollama_in_dev(monkeypatch):
+    import asyncio
+
+    monkeypatch.setenv("ENVIRONMENT", "dev")
+    monkeypatch.setenv("OLLAMA_ENDPOINT", "http://localhost:11434/v1")
+    monkeypatch.setenv("EMBEDDING_DEPLOYMENT_NAME", "mxbai-embed-large")
+
+    from agent import config as cfg_mod
+    from agent.client_factories import create_async_query_embedding_backend
+
+    cfg_mod._config = None
+
+    mock_client = MagicMock()
+    mock_client.embeddings.create = AsyncMock(return_value=MagicMock(data=[MagicMock(embedding=[0.3, 0.4])]))
+
+    with patch("agent.client_factories.AsyncOpenAI", return_value=mock_client):
+        backend = create_async_query_embedding_backend()
+        assert asyncio.run(backend.embed(["query"])) == [[0.3, 0.4]]
+        mock_client.embeddings.create.assert_awaited_once_with(model="mxbai-embed-large", input=["query"])
+
+
+def test_prod_clients_share_one_credential_and_pooled_session(monkeypatch):
+    monkeypatch.setenv("ENVIRONMENT", "prod")
+    monkeypatch.setenv("SEARCH_ENDPOINT", "https://search.example.net")
+    monkeypatch.setenv("SEARCH_INDEX_NAME", "kb-articles")
+
+    from agent import client_factories
+    from agent import config as cfg_mod
+
+    cfg_mod._config = None
+    shared_credential = MagicMock()
+    monkeypatch.setattr(client_factories, "_credential", shared_credential)
+    monkeypatch.setattr(client_factories, "_requests_session", None)
+
+    with patch("agent.client_factories.SearchClient") as search_client, \
+            patch("agent.client_factories.BlobServiceClient") as blob_client:
+        client_factories.create_search_client()
+        client_factories.create_blob_service_client("https://blob.example.net")
+
+    search_kwargs = search_client.call_args.kwargs
+    blob_kwargs = blob_client.call_args.kwargs
+    assert search_kwargs["credential"] is shared_credential
+    assert blob_kwargs["credential"] is shared_credential
+    assert search_kwargs["transport"].session is blob_kwargs["transport"].session
+    adapter = search_kwargs["transport"].session.get_adapter("https://search.example.net")
+    assert adapter._pool_maxsize == cfg_mod.get_config().http_pool_max_per_host
+
+
+def test_async_transport_opens_on_the_shared_pool_and_survives_client_close(monkeypatch):
+    import asyncio
+
+    monkeypatch.setenv("ENVIRONMENT", "dev")
+    monkeypatch.setenv("HTTP_POOL_MAX_PER_HOST", "7")
+
+    from agent import client_factories
+    from agent import config as cfg_mod
+
+    cfg_mod._config = None
+
+    async def scenario():
+        first = client_factories._async_transport(connection_verify=False)
+        second = client_factories._async_transport()
+        await first.open()
+        await second.open()
+        assert first.session is second.session
+        assert first.session.connector.limit_per_host == 7
+
+        await first.close()
+        assert not second.session.closed
+
+        await client_factories.close_shared_transports()
+        assert second.session.closed
+
+    asyncio.run(scenario())
+
+
+def test_chat_clients_reuse_one_sdk_client(monkeypatch):
+    monkeypatch.setenv("ENVIRONMENT", "dev")
+    monkeypatch.setenv("OLLAMA_ENDPOINT", "http://localhost:11434/v1")
+    monkeypatch.setenv("AGENT_MODEL_DEPLOYMENT_NAME", "phi4-mini")
+
+    from agent import client_factories
+    from agent import config as cfg_mod
+
+    cfg_mod._config = None
+    monkeypatch.setattr(client_factories, "_async_openai_client", None)
+
+    first = client_factories.create_chat_client()
+    second = client_factories.create_chat_client()
+
+    assert first is not second
+    assert first.client is second.client
+
+
+def test_http2_flag_is_honoured_not_silently_dropped(monkeypatch):
+    monkeypatch.setenv("HTTP2_ENABLED", "true")
+
+    from agent import client_factories
+    from agent import config as cfg_mod
+
+    cfg_mod._config = None
+    monkeypatch.setattr(client_factories, "_async_httpx_client", None)
+
+    options = client_factories._httpx_options()
+    assert options["http2"] is True
+    # httpx raises ImportError here when h2 is missing.
+    assert client_factories._get_async_httpx_client() is not None
@@ -23,7 +23,8 @@ pytestmark = pytest.mark.integration
 class TestContextualFilteringE2E:
     """Integration tests for the full contextual filtering pipeline."""
 
-    def test_e2e_dev_mode_applies_filter(self, monkeypatch) -> None:
+    @pytest.mark.asyncio
+    async def test_e2e_dev_mode_applies_filter(self, monkeypatch) -> None:
         """In dev mode, default claims apply engineering filter to search."""
         monkeypatch.setenv("REQUIRE_AUTH", "false")
 
@@ -38,10 +39,10 @@ class TestContextualFilteringE2E:
         from agent.kb_agent import search_knowledge_base
 
         # Call with departments kwarg (as SecurityFilterMiddleware would inject)
-        result = search_knowledge_base(
+        result = await search_knowledge_base(
             "azure search", departments=["engineering"]
         )
-        parsed = json.loads(result)
+        parsed = json.loads(result.text)
         results = parsed["results"] if isinstance(parsed, dict) else parsed
 
         assert len(results) > 0
@@ -49,7 +50,8 @@ class TestContextualFilteringE2E:
         for item in results:
             assert item.get("article_id"), "Result should have an article_id"
 
-    def test_e2e_filter_visible_in_logs(self, monkeypatch, caplog) -> None:
+    @pytest.mark.asyncio
+    async def test_e2e_filter_visible_in_logs(self, monkeypatch, caplog) -> None:
         """The OData filter expression appears in agent logs."""
         monkeypatch.setenv("REQUIRE_AUTH", "false")
 
@@ -63,7 +65,7 @@ class TestContextualFilteringE2E:
         from agent.kb_agent import search_knowledge_base
 
         with caplog.at_level(logging.DEBUG, logger="agent.kb_agent"):
-            search_knowledge_base(
+            await search_knowledge_base(
                 "azure search", departments=["engineering"]
             )
 
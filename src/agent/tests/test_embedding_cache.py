@@ -0,0 +1,106 @@
+"""Tests for the query-embedding cache and its LRU/TTL primitive."""
+
+from __future__ import annotations
+
+from unittest.mock import MagicMock
+
+from agent.embedding_cache import QueryEmbeddingCache, normalize_query
+from agent.ttl_cache import TTLCache
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTTLCache:
+    def test_evicts_least_recently_used(self) -> None:
+        cache: TTLCache[str, int] = TTLCache(max_entries=2, ttl_seconds=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1  # refresh "a" so "b" becomes LRU
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert len(cache) == 2
+
+    def test_entries_expire_after_ttl(self) -> None:
+        clock = _FakeClock()
+        cache: TTLCache[str, int] = TTLCache(max_entries=10, ttl_seconds=30, clock=clock)
+        cache.set("a", 1)
+
+        clock.now += 29
+        assert cache.get("a") == 1
+        clock.now += 1
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_zero_size_disables_cache(self) -> None:
+        cache: TTLCache[str, int] = TTLCache(max_entries=0, ttl_seconds=30)
+        cache.set("a", 1)
+
+        assert not cache.enabled
+        assert cache.get("a") is None
+
+
+class TestQueryEmbeddingCache:
+    def _cache(self, **kwargs) -> QueryEmbeddingCache:
+        defaults = {"model": "text-embedding-3-small", "dimensions": 3, "max_entries": 8, "ttl_seconds": 60}
+        defaults.update(kwargs)
+        return QueryEmbeddingCache(**defaults)
+
+    def test_normalize_query_collapses_case_and_whitespace(self) -> None:
+        assert normalize_query("  How do I   configure\tSemantic Ranker ") == "how do i configure semantic ranker"
+
+    def test_normalized_identical_queries_share_an_entry(self) -> None:
+        cache = self._cache()
+        cache.put("How do I configure semantic ranker", [0.1, 0.2, 0.3])
+
+        assert cache.get("how do i  configure semantic ranker") == [0.1, 0.2, 0.3]
+
+    def test_key_includes_model_and_dimensions(self) -> None:
+        small = self._cache()
+        other_model = self._cache(model="mxbai-embed-large")
+        other_dims = self._cache(dimensions=1024)
+
+        keys = {small.make_key("q"), other_model.make_key("q"), other_dims.make_key("q")}
+        assert len(keys) == 3
+
+    def test_shared_backend_is_consulted_on_local_miss(self) -> None:
+        shared = MagicMock()
+        shared.get.return_value = [1.0, 2.0, 3.0]
+        cache = self._cache(shared_backend=shared)
+
+        assert cache.get("query") == [1.0, 2.0, 3.0]
+        # Promoted into the local tier — second lookup does not hit the backend.
+        assert cache.get("query") == [1.0, 2.0, 3.0]
+        shared.get.assert_called_once_with(cache.make_key("query"))
+
+    def test_shared_backend_vector_with_wrong_dimensions_is_ignored(self) -> None:
+        shared = MagicMock()
+        shared.get.return_value = [1.0, 2.0]
+        cache = self._cache(shared_backend=shared)
+
+        assert cache.get("query") is None
+
+    def test_put_writes_through_to_shared_backend(self) -> None:
+        shared = MagicMock()
+        cache = self._cache(shared_backend=shared)
+
+        cache.put("query", [0.5, 0.5, 0.5])
+
+        shared.set.assert_called_once_with(cache.make_key("query"), [0.5, 0.5, 0.5], 60)
+
+    def test_shared_backend_errors_are_treated_as_misses(self) -> None:
+        shared = MagicMock()
+        shared.get.side_effect = ConnectionError("redis down")
+        shared.set.side_effect = ConnectionError("redis down")
+        cache = self._cache(max_entries=0, shared_backend=shared)
+
+        assert cache.get("query") is None
+        cache.put("query", [0.1, 0.2, 0.3])
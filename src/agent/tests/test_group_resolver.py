@@ -1,21 +1,163 @@
-"""Tests for group-to-department resolver."""
+"""Tests for group-to-department resolution."""
 
 from __future__ import annotations
 
-from agent.group_resolver import resolve_departments
+import asyncio
+import json
+
+import pytest
+
+from agent.group_resolver import (
+    GroupResolver,
+    MappingDepartmentProvider,
+    SimulatedDepartmentProvider,
+    resolve_departments,
+)
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _CountingProvider:
+    def __init__(self, mapping: dict[str, str], *, delay: float = 0.0) -> None:
+        self.mapping = mapping
+        self.delay = delay
+        self.calls: list[frozenset[str]] = []
+        self.fail = False
+
+    async def departments_for_groups(self, group_guids: frozenset[str]) -> frozenset[str]:
+        self.calls.append(group_guids)
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("graph unavailable")
+        return frozenset(self.mapping[group] for group in group_guids if group in self.mapping)
+
+
+def _resolver(provider, clock: _Clock) -> GroupResolver:
+    return GroupResolver(
+        provider,
+        ttl_seconds=100,
+        negative_ttl_seconds=10,
+        refresh_ahead_seconds=80,
+        clock=clock,
+    )
 
 
 class TestResolveDepartments:
     """Simulated group resolver maps GUIDs to department names."""
 
-    def test_non_empty_groups_return_engineering(self):
-        result = resolve_departments(["group-guid-1", "group-guid-2"])
-        assert result == ["engineering"]
+    @pytest.mark.asyncio
+    async def test_non_empty_groups_return_engineering(self):
+        assert await resolve_departments(["group-guid-1", "group-guid-2"]) == frozenset({"engineering"})
+
+    @pytest.mark.asyncio
+    async def test_empty_groups_return_empty(self):
+        assert await resolve_departments([]) == frozenset()
+
+    @pytest.mark.asyncio
+    async def test_simulated_provider(self):
+        assert await SimulatedDepartmentProvider().departments_for_groups(frozenset({"g"})) == {"engineering"}
+
+
+class TestGroupResolver:
+    @pytest.mark.asyncio
+    async def test_group_sets_are_cached_regardless_of_order(self) -> None:
+        provider = _CountingProvider({"a": "engineering", "b": "finance"})
+        resolver = _resolver(provider, _Clock())
+
+        assert await resolver.resolve(["a", "b"]) == {"engineering", "finance"}
+        assert await resolver.resolve(["b", "a", "a"]) == {"engineering", "finance"}
+        assert len(provider.calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_unmapped_groups_use_the_negative_ttl(self) -> None:
+        clock = _Clock()
+        provider = _CountingProvider({"a": "engineering"})
+        resolver = _resolver(provider, clock)
+
+        await resolver.resolve(["a"])
+        assert await resolver.resolve(["unknown"]) == frozenset()
+        clock.now = 11
+        provider.mapping["unknown"] = "research"
+
+        assert await resolver.resolve(["unknown"]) == {"research"}
+        assert await resolver.resolve(["a"]) == {"engineering"}
+        assert provider.calls == [{"a"}, {"unknown"}, {"unknown"}]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_lookups_share_one_provider_call(self) -> None:
+        provider = _CountingProvider({"a": "engineering"}, delay=0.01)
+        resolver = _resolver(provider, _Clock())
+
+        results = await asyncio.gather(*(resolver.resolve(["a"]) for _ in range(5)))
+
+        assert results == [frozenset({"engineering"})] * 5
+        assert len(provider.calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_aging_entries_are_served_while_refreshed_in_background(self) -> None:
+        clock = _Clock()
+        provider = _CountingProvider({"a": "engineering"}, delay=0.01)
+        resolver = _resolver(provider, clock)
+        await resolver.resolve(["a"])
+
+        clock.now = 90
+        provider.mapping["a"] = "finance"
+        assert await resolver.resolve(["a"]) == {"engineering"}
+        await asyncio.sleep(0.05)
+
+        assert await resolver.resolve(["a"]) == {"finance"}
+        assert len(provider.calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_keeps_the_entry_until_expiry(self) -> None:
+        clock = _Clock()
+        provider = _CountingProvider({"a": "engineering"})
+        resolver = _resolver(provider, clock)
+        await resolver.resolve(["a"])
+
+        provider.fail = True
+        clock.now = 90
+        assert await resolver.resolve(["a"]) == {"engineering"}
+        await asyncio.sleep(0)
+        assert await resolver.resolve(["a"]) == {"engineering"}
+
+        clock.now = 101
+        with pytest.raises(RuntimeError):
+            await resolver.resolve(["a"])
+
+
+class TestMappingDepartmentProvider:
+    @pytest.mark.asyncio
+    async def test_yaml_mapping_with_single_and_multiple_departments(self, tmp_path) -> None:
+        path = tmp_path / "groups.yaml"
+        path.write_text("groups:\n  g1: engineering\n  g2: [finance, research]\n", encoding="utf-8")
+
+        provider = MappingDepartmentProvider.from_file(path)
+
+        assert await provider.departments_for_groups(frozenset({"g1", "g2", "g3"})) == {
+            "engineering",
+            "finance",
+            "research",
+        }
+
+    @pytest.mark.asyncio
+    async def test_bare_json_mapping(self, tmp_path) -> None:
+        path = tmp_path / "groups.json"
+        path.write_text(json.dumps({"g1": ["engineering"]}), encoding="utf-8")
+
+        provider = MappingDepartmentProvider.from_file(path)
+
+        assert await provider.departments_for_groups(frozenset({"g1"})) == {"engineering"}
 
-    def test_single_group_returns_engineering(self):
-        result = resolve_departments(["single-guid"])
-        assert result == ["engineering"]
+    def test_invalid_departments_are_rejected(self, tmp_path) -> None:
+        path = tmp_path / "groups.yaml"
+        path.write_text("groups:\n  g1: {name: engineering}\n", encoding="utf-8")
 
-    def test_empty_groups_return_empty(self):
-        result = resolve_departments([])
-        assert result == []
+        with pytest.raises(ValueError):
+            MappingDepartmentProvider.from_file(path)
@@ -0,0 +1,222 @@
+"""Tests for the vision image cache and cached ``download_image_async``."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from azure.core.exceptions import ResourceNotFoundError, ResourceNotModifiedError
+
+from agent.image_cache import ImageCache
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _cache(**kwargs) -> ImageCache:
+    options = {"max_bytes": 10, "revalidate_seconds": 0}
+    options.update(kwargs)
+    return ImageCache(**options)
+
+
+class TestImageCache:
+    def test_evicts_least_recently_used_by_bytes(self) -> None:
+        cache = _cache()
+        cache.put("a/1.png", data=b"aaaa", content_type="image/png", etag="1")
+        cache.put("a/2.png", data=b"bbbb", content_type="image/png", etag="1")
+        assert cache.get("a/1.png") is not None  # refresh recency
+
+        cache.put("a/3.png", data=b"cccc", content_type="image/png", etag="1")
+
+        assert cache.get("a/2.png") is None
+        assert cache.get("a/1.png").data == b"aaaa"
+        assert cache.memory_bytes == 8
+
+    def test_oversized_image_and_disabled_cache_are_not_stored(self) -> None:
+        cache = _cache()
+        cache.put("a/huge.png", data=b"x" * 11, content_type="image/png", etag="1")
+        disabled = _cache(max_bytes=0)
+        disabled.put("a/1.png", data=b"x", content_type="image/png", etag="1")
+
+        assert len(cache) == 0
+        assert disabled.get("a/1.png") is None
+
+    def test_evicted_images_spill_to_disk_and_are_promoted(self, tmp_path) -> None:
+        cache = _cache(disk_dir=tmp_path, disk_max_bytes=100)
+        cache.put("a/1.png", data=b"aaaaaa", content_type="image/png", etag="1")
+        cache.put("a/2.png", data=b"bbbbbb", content_type="image/png", etag="1")
+
+        assert cache.disk_bytes == 6
+        assert len(list(tmp_path.iterdir())) == 1
+
+        promoted = cache.get("a/1.png")
+
+        assert promoted.data == b"aaaaaa"
+        assert promoted.content_type == "image/png"
+        assert cache.memory_bytes == 6
+        # a/2.png was pushed out to disk in turn; a/1.png's spill file is gone.
+        assert cache.disk_bytes == 6
+        assert len(list(tmp_path.iterdir())) == 1
+
+    def test_disk_tier_respects_its_own_budget(self, tmp_path) -> None:
+        cache = _cache(max_bytes=4, disk_dir=tmp_path, disk_max_bytes=8)
+        for name in ("1", "2", "3", "4"):
+            cache.put(f"a/{name}.png", data=b"xxxx", content_type="image/png", etag="1")
+
+        assert cache.disk_bytes == 8
+        assert cache.get("a/1.png") is None
+        assert cache.get("a/3.png") is not None
+
+    def test_revalidation_is_due_after_interval(self) -> None:
+        clock = _Clock()
+        cache = _cache(revalidate_seconds=60, clock=clock)
+        cache.put("a/1.png", data=b"a", content_type="image/png", etag="1")
+        entry = cache.get("a/1.png")
+
+        clock.now = 59
+        assert not cache.needs_revalidation(entry)
+        clock.now = 60
+        assert cache.needs_revalidation(entry)
+        cache.mark_validated(entry)
+        assert not cache.needs_revalidation(entry)
+
+    def test_hit_ratio(self) -> None:
+        cache = _cache()
+        cache.record_lookup(hit=False)
+        cache.record_lookup(hit=True)
+        cache.record_lookup(hit=True)
+        cache.record_lookup(hit=True)
+
+        assert cache.hit_ratio == 0.75
+
+
+def _download(data: bytes, etag: str) -> MagicMock:
+    download = MagicMock()
+    download.readall = AsyncMock(return_value=data)
+    download.properties.etag = etag
+    download.properties.content_settings.content_type = "image/png"
+    return download
+
+
+class TestCachedDownloadImage:
+    @pytest.fixture
+    def blob_client(self, monkeypatch) -> MagicMock:
+        from agent import image_service
+
+        clock = _Clock()
+        blob_client = MagicMock()
+        blob_client.download_blob = AsyncMock()
+        service = MagicMock()
+        service.get_blob_client.return_value = blob_client
+        monkeypatch.setattr(image_service, "_blob_service_client", service)
+        monkeypatch.setattr(image_service, "_image_cache", _cache(max_bytes=1024, revalidate_seconds=60, clock=clock))
+        monkeypatch.setattr(image_service, "config", SimpleNamespace(serving_container_name="serving"))
+        blob_client.clock = clock
+        blob_client.service = service
+        return blob_client
+
+    @pytest.mark.asyncio
+    async def test_repeat_download_is_served_from_cache(self, blob_client) -> None:
+        from agent.image_service import _image_cache, download_image_async
+
+        blob_client.download_blob.return_value = _download(b"png-bytes", '"0x1"')
+
+        first = await download_image_async("article", "images/a.png")
+        second = await download_image_async("article", "images/a.png")
+
+        assert first.data == second.data == b"png-bytes"
+        blob_client.download_blob.assert_awaited_once_with()
+        assert _image_cache.hit_ratio == 0.5
+
+    @pytest.mark.asyncio
+    async def test_stale_entry_is_revalidated_with_etag(self, blob_client) -> None:
+        from azure.core import MatchConditions
+
+        from agent.image_service import download_image_async
+
+        blob_client.download_blob.return_value = _download(b"png-bytes", '"0x1"')
+        await download_image_async("article", "images/a.png")
+        blob_client.clock.now = 61
+        blob_client.download_blob.side_effect = ResourceNotModifiedError("not modified")
+
+        blob = await download_image_async("article", "images/a.png")
+
+        assert blob.data == b"png-bytes"
+        blob_client.download_blob.assert_called_with(etag='"0x1"', match_condition=MatchConditions.IfModified)
+
+    @pytest.mark.asyncio
+    async def test_changed_blob_replaces_cached_bytes(self, blob_client) -> None:
+        from agent.image_service import download_image_async
+
+        blob_client.download_blob.return_value = _download(b"old", '"0x1"')
+        await download_image_async("article", "images/a.png")
+        blob_client.clock.now = 61
+        blob_client.download_blob.return_value = _download(b"new", '"0x2"')
+
+        assert (await download_image_async("article", "images/a.png")).data == b"new"
+        assert (await download_image_async("article", "images/a.png")).data == b"new"
+        assert blob_client.download_blob.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_vision_derivative_is_preferred(self, blob_client) -> None:
+        from agent.image_service import download_image_async
+
+        blob_client.download_blob.return_value = _download(b"webp-bytes", '"0x1"')
+
+        blob = await download_image_async("article", "images/a.png")
+
+        assert blob.data == b"webp-bytes"
+        blob_client.service.get_blob_client.assert_called_once_with(
+            container="serving",
+            blob="article/vision/images/a.webp",
+        )
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_original_and_revalidates_it(self, blob_client) -> None:
+        from agent.image_service import download_image_async
+
+        blob_client.download_blob.side_effect = [
+            ResourceNotFoundError("no derivative"),
+            _download(b"png-bytes", '"0x1"'),
+            ResourceNotFoundError("still no derivative"),
+            ResourceNotModifiedError("not modified"),
+        ]
+
+        assert (await download_image_async("article", "images/a.png")).data == b"png-bytes"
+        blob_client.clock.now = 61
+        assert (await download_image_async("article", "images/a.png")).data == b"png-bytes"
+
+        requested = [call.kwargs["blob"] for call in blob_client.service.get_blob_client.call_args_list]
+        assert requested == [
+            "article/vision/images/a.webp",
+            "article/images/a.png",
+            "article/vision/images/a.webp",
+            "article/images/a.png",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_cached_original_switches_to_a_new_derivative(self, blob_client) -> None:
+        from agent.image_service import download_image_async
+
+        blob_client.download_blob.side_effect = [
+            ResourceNotFoundError("no derivative"),
+            _download(b"png-bytes", '"0x1"'),
+            _download(b"webp-bytes", '"0x2"'),
+            ResourceNotModifiedError("not modified"),
+        ]
+
+        await download_image_async("article", "images/a.png")
+        blob_client.clock.now = 61
+        assert (await download_image_async("article", "images/a.png")).data == b"webp-bytes"
+        blob_client.clock.now = 122
+        assert (await download_image_async("article", "images/a.png")).data == b"webp-bytes"
+
+        requested = [call.kwargs["blob"] for call in blob_client.service.get_blob_client.call_args_list]
+        assert requested[2:] == ["article/vision/images/a.webp", "article/vision/images/a.webp"]
+        assert blob_client.download_blob.call_args.kwargs["etag"] == '"0x2"'
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
@@ -16,14 +16,17 @@ from agent.kb_agent import (
     _SYSTEM_PROMPT,
     _SYSTEM_PROMPT_PATH,
     _get_system_prompt_path,
+    _coerce_search_queries,
     _load_system_prompt,
     _normalize_search_query,
     create_agent,
     search_knowledge_base,
+    search_knowledge_base_multi,
 )
 from agent.scope_config import AgentScopeConfig, load_scope_config
 from agent.search_tool import SearchResult
 from agent.security_middleware import SecurityFilterMiddleware
+from agent.tool_results import render_tool_result
 from agent_framework import (
     CompactionProvider,
     FunctionInvocationContext,
@@ -190,9 +193,10 @@ class TestSearchKnowledgeBaseTool:
             "Azure AI Search"
         )
 
+    @pytest.mark.asyncio
     @patch("agent.kb_agent.get_image_url")
-    @patch("agent.kb_agent.search_kb")
-    def test_returns_json_results(self, mock_search: MagicMock, mock_get_url: MagicMock) -> None:
+    @patch("agent.kb_agent.search_kb_async", new_callable=AsyncMock)
+    async def test_returns_json_results(self, mock_search: MagicMock, mock_get_url: MagicMock) -> None:
         mock_search.return_value = [
             SearchResult(
                 id="article_0",
@@ -208,8 +212,8 @@ class TestSearchKnowledgeBaseTool:
         ]
         mock_get_url.return_value = "/api/images/article/images/fig.png"
 
-        result = search_knowledge_base("test query")
-        parsed = json.loads(result)
+        result = await search_knowledge_base("test query")
+        parsed = json.loads(result.text)
 
         assert "results" in parsed
         assert "summary" in parsed
@@ -217,19 +221,21 @@ class TestSearchKnowledgeBaseTool:
         assert parsed["results"][0]["title"] == "Test Article"
         assert parsed["results"][0]["content"] == "Test content"
 
+    @pytest.mark.asyncio
     @patch("agent.kb_agent.get_image_url")
-    @patch("agent.kb_agent.search_kb")
-    def test_accepts_typed_query_wrapper(self, mock_search: MagicMock, mock_get_url: MagicMock) -> None:
+    @patch("agent.kb_agent.search_kb_async", new_callable=AsyncMock)
+    async def test_accepts_typed_query_wrapper(self, mock_search: MagicMock, mock_get_url: MagicMock) -> None:
         mock_search.return_value = []
         mock_get_url.return_value = "/api/images/article/images/fig.png"
 
-        search_knowledge_base({"type": "string", "value": "Azure Content Understanding"})
+        await search_knowledge_base({"type": "string", "value": "Azure Content Understanding"})
 
-        mock_search.assert_called_once_with("Azure Content Understanding", security_filter=None)
+        mock_search.assert_awaited_once_with("Azure Content Understanding", security_filter=None)
 
+    @pytest.mark.asyncio
     @patch("agent.kb_agent.get_image_url")
-    @patch("agent.kb_agent.search_kb")
-    def test_includes_citation_fields(self, mock_search: MagicMock, mock_get_url: MagicMock) -> None:
+    @patch("agent.kb_agent.search_kb_async", new_callable=AsyncMock)
+    async def test_includes_citation_fields(self, mock_search: MagicMock, mock_get_url: MagicMock) -> None:
         """Function result includes chunk_index and image_urls for citation extraction."""
         mock_search.return_value = [
             SearchResult(
@@ -241,16 +247,17 @@ class TestSearchKnowledgeBaseTool:
         ]
         mock_get_url.return_value = "/api/images/a/images/fig.png"
 
-        result = search_knowledge_base("query")
-        parsed = json.loads(result)
+        result = await search_knowledge_base("query")
+        parsed = json.loads(result.text)
 
         assert parsed["results"][0]["article_id"] == "a"
         assert parsed["results"][0]["chunk_index"] == 3
         assert parsed["results"][0]["image_urls"] == ["images/fig.png"]
 
+    @pytest.mark.asyncio
     @patch("agent.kb_agent.get_image_url")
-    @patch("agent.kb_agent.search_kb")
-    def test_resolves_images(self, mock_search: MagicMock, mock_get_url: MagicMock) -> None:
+    @patch("agent.kb_agent.search_kb_async", new_callable=AsyncMock)
+    async def test_resolves_images(self, mock_search: MagicMock, mock_get_url: MagicMock) -> None:
         mock_search.return_value = [
             SearchResult(
                 id="a_0", article_id="article", chunk_index=0,
@@ -261,23 +268,25 @@ class TestSearchKnowledgeBaseTool:
         ]
         mock_get_url.return_value = "/api/images/article/images/fig.png"
 
-        result = search_knowledge_base("query")
-        parsed = json.loads(result)
+        result = await search_knowledge_base("query")
+        parsed = json.loads(result.text)
 
         assert len(parsed["results"][0]["images"]) == 1
         assert "fig.png" in parsed["results"][0]["images"][0]["url"]
 
-    @patch("agent.kb_agent.search_kb")
-    def test_handles_search_error(self, mock_search: MagicMock) -> None:
+    @pytest.mark.asyncio
+    @patch("agent.kb_agent.search_kb_async", new_callable=AsyncMock)
+    async def test_handles_search_error(self, mock_search: MagicMock) -> None:
         mock_search.side_effect = RuntimeError("connection error")
 
-        result = search_knowledge_base("query")
-        parsed = json.loads(result)
+        result = await search_knowledge_base("query")
+        parsed = json.loads(result.text)
 
         assert "error" in parsed
 
-    def test_handles_malformed_query_wrapper(self) -> None:
-        parsed = json.loads(search_knowledge_base({"type": "string"}))
+    @pytest.mark.asyncio
+    async def test_handles_malformed_query_wrapper(self) -> None:
+        parsed = json.loads((await search_knowledge_base({"type": "string"})).text)
         assert parsed["error"] == "Search query was missing or malformed."
 
 
@@ -318,8 +327,9 @@ class TestCreateAgent:
         mock_create_chat_client.return_value = MagicMock()
         create_agent()
 
-        call_kwargs = mock_agent_cls.call_args
-        assert search_knowledge_base in call_kwargs.kwargs["tools"]
+        tools = mock_agent_cls.call_args.kwargs["tools"]
+        assert [tool.func for tool in tools] == [search_knowledge_base, search_knowledge_base_multi]
+        assert all(tool.result_parser is render_tool_result for tool in tools)
 
     @patch("agent.kb_agent.Agent")
     @patch("agent.kb_agent.create_chat_client")
@@ -483,58 +493,64 @@ class TestSDKUpgradeValidation:
 class TestSecurityFilterWiring:
     """Test that search_knowledge_base builds OData filter from departments."""
 
-    @patch("agent.kb_agent.search_kb")
-    def test_passes_security_filter_with_departments(self, mock_search: MagicMock) -> None:
+    @pytest.mark.asyncio
+    @patch("agent.kb_agent.search_kb_async", new_callable=AsyncMock)
+    async def test_passes_security_filter_with_departments(self, mock_search: MagicMock) -> None:
         mock_search.return_value = []
 
-        search_knowledge_base("query", departments=["engineering"])
+        await search_knowledge_base("query", departments=["engineering"])
 
         mock_search.assert_called_once()
         call_kwargs = mock_search.call_args
         assert call_kwargs.kwargs["security_filter"] == "search.in(department, 'engineering', ',')"
 
-    @patch("agent.kb_agent.search_kb")
-    def test_passes_security_filter_with_multiple_departments(self, mock_search: MagicMock) -> None:
+    @pytest.mark.asyncio
+    @patch("agent.kb_agent.search_kb_async", new_callable=AsyncMock)
+    async def test_passes_security_filter_with_multiple_departments(self, mock_search: MagicMock) -> None:
         mock_search.return_value = []
 
-        search_knowledge_base("query", departments=["engineering", "research"])
+        await search_knowledge_base("query", departments=["engineering", "research"])
 
         call_kwargs = mock_search.call_args
         assert call_kwargs.kwargs["security_filter"] == "search.in(department, 'engineering,research', ',')"
 
-    @patch("agent.kb_agent.search_kb")
-    def test_no_filter_when_departments_empty(self, mock_search: MagicMock) -> None:
+    @pytest.mark.asyncio
+    @patch("agent.kb_agent.search_kb_async", new_callable=AsyncMock)
+    async def test_no_filter_when_departments_empty(self, mock_search: MagicMock) -> None:
         mock_search.return_value = []
 
-        search_knowledge_base("query", departments=[])
+        await search_knowledge_base("query", departments=[])
 
         call_kwargs = mock_search.call_args
         assert call_kwargs.kwargs["security_filter"] is None
 
-    @patch("agent.kb_agent.search_kb")
-    def test_no_filter_when_no_kwargs(self, mock_search: MagicMock) -> None:
+    @pytest.mark.asyncio
+    @patch("agent.kb_agent.search_kb_async", new_callable=AsyncMock)
+    async def test_no_filter_when_no_kwargs(self, mock_search: MagicMock) -> None:
         mock_search.return_value = []
 
-        search_knowledge_base("query")
+        await search_knowledge_base("query")
 
         call_kwargs = mock_search.call_args
         assert call_kwargs.kwargs["security_filter"] is None
 
-    @patch("agent.kb_agent.search_kb")
-    def test_reads_departments_from_function_invocation_context(self, mock_search: MagicMock) -> None:
+    @pytest.mark.asyncio
+    @patch("agent.kb_agent.search_kb_async", new_callable=AsyncMock)
+    async def test_reads_departments_from_function_invocation_context(self, mock_search: MagicMock) -> None:
         """When the framework injects a FunctionInvocationContext, departments come from ctx.kwargs."""
         mock_search.return_value = []
 
         ctx = MagicMock(spec=FunctionInvocationContext)
         ctx.kwargs = {"departments": ["engineering"], "roles": ["contributor"], "tenant_id": "t1"}
 
-        search_knowledge_base("query", ctx=ctx)
+        await search_knowledge_base("query", ctx=ctx)
 
         call_kwargs = mock_search.call_args
         assert call_kwargs.kwargs["security_filter"] == "search.in(department, 'engineering', ',')"
 
-    @patch("agent.kb_agent.search_kb")
-    def test_ctx_takes_precedence_over_kwargs(self, mock_search: MagicMock) -> None:
+    @pytest.mark.asyncio
+    @patch("agent.kb_agent.search_kb_async", new_callable=AsyncMock)
+    async def test_ctx_takes_precedence_over_kwargs(self, mock_search: MagicMock) -> None:
         """ctx.kwargs should be preferred when both ctx and **kwargs provide departments."""
         mock_search.return_value = []
 
@@ -542,7 +558,7 @@ class TestSecurityFilterWiring:
         ctx.kwargs = {"departments": ["research"]}
 
         # Even if departments= is also passed via **kwargs, ctx wins
-        search_knowledge_base("query", ctx=ctx, departments=["engineering"])
+        await search_knowledge_base("query", ctx=ctx, departments=["engineering"])
 
         call_kwargs = mock_search.call_args
         assert call_kwargs.kwargs["security_filter"] == "search.in(department, 'research', ',')"
@@ -555,3 +571,45 @@ class TestSecurityFilterWiring:
         assert "ctx" not in schema_properties, (
             "ctx (FunctionInvocationContext) should be auto-detected and hidden from LLM schema"
         )
+
+
+class TestSearchKnowledgeBaseMultiTool:
+    """Test the batched search_knowledge_base_multi tool function."""
+
+    def test_coerce_search_queries_normalizes_and_caps(self) -> None:
+        queries = ["  one ", {"type": "string", "value": "two"}, "", "three", "four", "five"]
+
+        assert _coerce_search_queries(queries) == ["one", "two", "three", "four"]
+
+    def test_coerce_search_queries_accepts_single_string(self) -> None:
+        assert _coerce_search_queries("only") == ["only"]
+
+    def test_coerce_search_queries_rejects_empty(self) -> None:
+        with pytest.raises(ValueError):
+            _coerce_search_queries(["", "  "])
+
+    @pytest.mark.asyncio
+    @patch("agent.kb_agent.get_image_url", return_value="/api/images/a/images/x.png")
+    @patch("agent.kb_agent.search_kb_multi_async", new_callable=AsyncMock)
+    async def test_returns_single_ranked_payload(self, mock_search: MagicMock, _mock_url: MagicMock) -> None:
+        mock_search.return_value = [
+            SearchResult(id="a_0", article_id="a", chunk_index=0, content="A", title="Alpha", section_header=""),
+            SearchResult(id="b_2", article_id="b", chunk_index=2, content="B", title="Beta", section_header=""),
+        ]
+
+        payload = json.loads((await search_knowledge_base_multi(["q1", "q2"], departments=["engineering"])).text)
+
+        assert [(r["ref_number"], r["chunk_id"]) for r in payload["results"]] == [(1, "a_0"), (2, "b_2")]
+        mock_search.assert_awaited_once_with(
+            ["q1", "q2"],
+            security_filter="search.in(department, 'engineering', ',')",
+        )
+
+    @pytest.mark.asyncio
+    @patch("agent.kb_agent.search_kb_multi_async", new_callable=AsyncMock)
+    async def test_search_failure_returns_error(self, mock_search: MagicMock) -> None:
+        mock_search.side_effect = RuntimeError("boom")
+
+        payload = json.loads((await search_knowledge_base_multi(["q1"])).text)
+
+        assert payload == {"error": "Search failed. Please try again."}
@@ -0,0 +1,168 @@
+"""Tests for the in-process local search backend."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from agent.local_search_engine import LocalSearchIndex, tokenize, write_snapshot
+from agent.search_result_cache import SearchResultCache
+
+
+def _chunk(chunk_id: str, vector: list[float], *, title: str, content: str, department: str = "engineering") -> dict:
+    article_id, chunk_index = chunk_id.rsplit("_", 1)
+    return {
+        "id": chunk_id,
+        "article_id": article_id,
+        "chunk_index": int(chunk_index),
+        "title": title,
+        "section_header": "",
+        "content": content,
+        "department": department,
+        "content_vector": vector,
+        "@search.score": 1.0,
+    }
+
+
+_CHUNKS = [
+    _chunk("search_0", [1.0, 0.0, 0.0], title="Semantic ranker", content="Configure the semantic ranker for queries."),
+    _chunk("search_1", [0.8, 0.6, 0.0], title="Vector search", content="Vector search uses HNSW graphs."),
+    _chunk("finance_0", [0.9, 0.1, 0.0], title="Budgets", content="Semantic budgets.", department="finance"),
+    _chunk("storage_0", [0.0, 0.0, 2.0], title="Blob storage", content="Blob tiers and lifecycle rules."),
+]
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path):
+    write_snapshot(tmp_path, _CHUNKS)
+    return tmp_path
+
+
+class TestLocalSearchIndex:
+    def test_snapshot_round_trip_is_memory_mapped_and_normalized(self, snapshot_dir) -> None:
+        index = LocalSearchIndex.load(snapshot_dir)
+
+        assert len(index) == 4
+        assert index.dimensions == 3
+        assert isinstance(index._vectors, np.memmap)
+        assert np.allclose(np.linalg.norm(np.asarray(index._vectors), axis=1), 1.0)
+        assert "content_vector" not in index.get("storage_0")
+        assert "@search.score" not in index.get("storage_0")
+
+    def test_vector_search_ranks_by_cosine_similarity(self, snapshot_dir) -> None:
+        index = LocalSearchIndex.load(snapshot_dir)
+
+        hits = index.vector_search([2.0, 0.0, 0.0], top=2)
+
+        assert [index.document(row)["id"] for row, _ in hits] == ["search_0", "finance_0"]
+        assert hits[0][1] == pytest.approx(1.0)
+
+    def test_department_mask_excludes_other_departments(self, snapshot_dir) -> None:
+        index = LocalSearchIndex.load(snapshot_dir)
+        mask = index.department_mask(frozenset({"engineering"}))
+
+        hits = index.vector_search([1.0, 0.0, 0.0], top=4, mask=mask)
+
+        assert "finance_0" not in [index.document(row)["id"] for row, _ in hits]
+        assert len(hits) == 3
+
+    def test_keyword_search_scores_only_matching_chunks(self, snapshot_dir) -> None:
+        index = LocalSearchIndex.load(snapshot_dir)
+
+        hits = index.keyword_search("semantic ranker", top=5)
+
+        assert [index.document(row)["id"] for row, _ in hits] == ["search_0", "finance_0"]
+        assert index.keyword_search("kubernetes", top=5) == []
+
+    def test_query_vector_dimension_mismatch_is_rejected(self, snapshot_dir) -> None:
+        index = LocalSearchIndex.load(snapshot_dir)
+
+        with pytest.raises(ValueError):
+            index.vector_search([1.0, 0.0], top=1)
+
+    def test_tokenize_is_case_insensitive(self) -> None:
+        assert tokenize("Semantic-Ranker, HNSW!") == ["semantic", "ranker", "hnsw"]
+
+
+class TestLocalBackendInSearchTool:
+    @pytest.fixture(autouse=True)
+    def _local_backend(self, monkeypatch, snapshot_dir) -> None:
+        from agent import search_tool
+
+        monkeypatch.setattr(
+            search_tool,
+            "config",
+            SimpleNamespace(
+                is_dev=True,
+                search_backend="local",
+                search_rerank_candidates=0,
+                search_expand_adjacent=False,
+            ),
+        )
+        monkeypatch.setattr(search_tool, "_local_index", LocalSearchIndex.load(snapshot_dir))
+        monkeypatch.setattr(
+            search_tool,
+            "_result_cache",
+            SearchResultCache(max_entries=0, ttl_seconds=0, watermark_interval_seconds=0),
+        )
+
+    @pytest.mark.asyncio
+    async def test_hybrid_leg_fuses_vector_and_keyword_hits(self) -> None:
+        from agent import search_tool
+
+        results = await search_tool._run_search_async(
+            search_text="semantic ranker",
+            query_vector=[1.0, 0.0, 0.0],
+            top=3,
+            security_filter="department eq 'engineering'",
+        )
+
+        assert results[0].id == "search_0"
+        assert all(result.department == "engineering" for result in results)
+
+    def test_sync_search_honours_search_in_filter(self, monkeypatch) -> None:
+        from agent import search_tool
+
+        monkeypatch.setattr(search_tool, "_embed_query", lambda query: [0.0, 0.0, 1.0])
+
+        results = search_tool.search_kb("blob tiers", top=2, security_filter="search.in(department, 'finance', ',')")
+
+        assert [result.id for result in results] == ["finance_0"]
+
+    def test_unsupported_filter_is_rejected(self) -> None:
+        from agent import search_tool
+
+        with pytest.raises(ValueError):
+            search_tool._search_local(
+                search_text="blob",
+                query_vector=None,
+                top=3,
+                security_filter="title eq 'x'",
+            )
+
+    @pytest.mark.asyncio
+    async def test_chunk_lookups_are_served_locally(self) -> None:
+        from agent import search_tool
+
+        chunk = await search_tool.get_chunk_by_id_async("storage_0")
+        chunks = await search_tool.get_chunks_by_ids_async(
+            ["storage_0", "finance_0", "missing_0"],
+            security_filter="search.in(department, 'engineering', ',')",
+        )
+
+        assert chunk is not None and chunk.title == "Blob storage"
+        assert list(chunks) == ["storage_0"]
+
+    @pytest.mark.asyncio
+    async def test_adjacent_chunks_are_expanded_locally(self, monkeypatch) -> None:
+        from agent import search_tool
+        from agent.ttl_cache import TTLCache
+
+        monkeypatch.setattr(search_tool, "_chunk_map_cache", TTLCache(max_entries=8, ttl_seconds=60))
+        hit = search_tool._to_search_result(search_tool._get_local_index().get("search_0"), score=1.0)
+
+        expanded = await search_tool.expand_adjacent_chunks_async([hit])
+
+        assert [result.id for result in expanded] == ["search_0", "search_1"]
@@ -0,0 +1,176 @@
+"""Tests for the client-side rerank stage."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from agent.reranker import FieldBoostScorer, rerank
+from agent.search_result_cache import SearchResultCache
+from agent.search_tool import SearchResult
+
+
+def _result(
+    chunk_id: str,
+    score: float,
+    *,
+    title: str = "Doc",
+    section_header: str = "",
+    vector: list[float] | None = None,
+) -> SearchResult:
+    article_id, chunk_index = chunk_id.rsplit("_", 1)
+    return SearchResult(
+        id=chunk_id,
+        article_id=article_id,
+        chunk_index=int(chunk_index),
+        content=f"Body of {chunk_id}",
+        title=title,
+        section_header=section_header,
+        score=score,
+        content_vector=vector,
+    )
+
+
+class TestFieldBoostScorer:
+    def test_title_and_section_matches_are_boosted(self) -> None:
+        results = [
+            _result("a_0", 1.0, title="Blob lifecycle"),
+            _result("b_0", 0.9, title="Semantic ranker"),
+            _result("c_0", 0.9, title="Other", section_header="Configure the semantic ranker"),
+            _result("d_0", 0.0, title="Other"),
+        ]
+
+        scores = FieldBoostScorer().score("semantic ranker", results)
+
+        assert np.argmax(scores) == 1
+        assert scores[2] > FieldBoostScorer().score("", results)[2]
+
+    def test_equal_retrieval_scores_do_not_divide_by_zero(self) -> None:
+        scores = FieldBoostScorer().score("", [_result("a_0", 0.5), _result("b_0", 0.5)])
+
+        assert scores.tolist() == [1.0, 1.0]
+
+
+class TestRerank:
+    def test_per_article_cap_keeps_other_articles(self) -> None:
+        results = [_result("a_0", 0.9), _result("a_1", 0.8), _result("a_2", 0.7), _result("b_0", 0.1)]
+
+        reranked = rerank("query", results, top=3, max_per_article=2, penalize_adjacent=False)
+
+        assert [result.id for result in reranked] == ["a_0", "a_1", "b_0"]
+
+    def test_cap_can_return_fewer_than_top(self) -> None:
+        results = [_result("a_0", 0.9), _result("a_1", 0.8), _result("a_2", 0.7)]
+
+        assert len(rerank("query", results, top=3, max_per_article=1)) == 1
+
+    def test_mmr_skips_near_duplicate_vectors(self) -> None:
+        results = [
+            _result("a_0", 0.9, vector=[1.0, 0.0]),
+            _result("b_0", 0.85, vector=[0.99, 0.01]),
+            _result("c_0", 0.6, vector=[0.0, 1.0]),
+        ]
+
+        assert [r.id for r in rerank("query", results, top=2, mmr_lambda=0.5)] == ["a_0", "c_0"]
+        assert [r.id for r in rerank("query", results, top=2, mmr_lambda=1.0)] == ["a_0", "b_0"]
+
+    def test_missing_vectors_fall_back_to_relevance_order(self) -> None:
+        results = [_result("a_0", 0.9, vector=[1.0, 0.0]), _result("b_0", 0.85), _result("c_0", 0.6)]
+
+        assert [r.id for r in rerank("query", results, top=2, mmr_lambda=0.5)] == ["a_0", "b_0"]
+
+    def test_adjacent_chunks_of_one_article_are_treated_as_duplicates(self) -> None:
+        results = [_result("a_3", 0.9), _result("a_4", 0.85), _result("a_7", 0.8), _result("b_0", 0.4)]
+
+        reranked = rerank("query", results, top=3, mmr_lambda=0.5)
+
+        assert [result.id for result in reranked] == ["a_3", "a_7", "b_0"]
+        assert [r.id for r in rerank("query", results, top=2, penalize_adjacent=False)] == ["a_3", "a_4"]
+
+    def test_custom_scorer_and_rerank_scores(self) -> None:
+        class Reverse:
+            def score(self, query, results):
+                return np.arange(len(results), dtype=np.float64)
+
+        reranked = rerank("query", [_result("a_0", 0.9), _result("b_0", 0.1)], top=2, scorer=Reverse())
+
+        assert [(result.id, result.score) for result in reranked] == [("b_0", 1.0), ("a_0", 0.0)]
+
+
+class TestSearchToolRerank:
+    @pytest.fixture(autouse=True)
+    def _rerank_config(self, monkeypatch) -> None:
+        from agent import search_tool
+
+        monkeypatch.setattr(
+            search_tool,
+            "config",
+            SimpleNamespace(
+                is_dev=False,
+                search_backend="azure",
+                search_rerank_candidates=30,
+                search_rerank_max_per_article=1,
+                search_mmr_lambda=0.7,
+                search_select_vectors=False,
+            ),
+        )
+        monkeypatch.setattr(
+            search_tool,
+            "_result_cache",
+            SearchResultCache(max_entries=0, ttl_seconds=0, watermark_interval_seconds=0),
+        )
+        monkeypatch.setattr(search_tool, "_embed_query", lambda query: [0.1, 0.2])
+
+    @patch("agent.search_tool._get_search_client")
+    def test_search_kb_over_fetches_and_reranks(self, mock_get_client: MagicMock) -> None:
+        from agent.search_tool import search_kb
+
+        mock_client = MagicMock()
+        mock_client.search.return_value = [
+            {"id": chunk_id, "article_id": chunk_id.rsplit("_", 1)[0], "content": "", "@search.score": score}
+            for chunk_id, score in [("a_0", 0.9), ("a_1", 0.8), ("b_0", 0.5), ("c_0", 0.4)]
+        ]
+        mock_get_client.return_value = mock_client
+
+        results = search_kb("query", top=2)
+
+        call_kwargs = mock_client.search.call_args.kwargs
+        assert call_kwargs["top"] == 30
+        assert call_kwargs["vector_queries"][0].k == 30
+        assert [result.id for result in results] == ["a_0", "b_0"]
+
+    @patch("agent.search_tool._get_search_client")
+    def test_selected_vectors_drive_mmr(self, mock_get_client: MagicMock, monkeypatch) -> None:
+        from agent import search_tool
+
+        monkeypatch.setattr(search_tool.config, "search_select_vectors", True)
+        monkeypatch.setattr(search_tool.config, "search_rerank_max_per_article", 0)
+        monkeypatch.setattr(search_tool.config, "search_mmr_lambda", 0.5)
+        mock_client = MagicMock()
+        mock_client.search.return_value = [
+            {"id": "a_0", "article_id": "a", "content": "", "@search.score": 0.9, "content_vector": [1.0, 0.0]},
+            {"id": "b_0", "article_id": "b", "content": "", "@search.score": 0.85, "content_vector": [1.0, 0.01]},
+            {"id": "c_0", "article_id": "c", "content": "", "@search.score": 0.6, "content_vector": [0.0, 1.0]},
+        ]
+        mock_get_client.return_value = mock_client
+
+        results = search_tool.search_kb("query", top=2)
+
+        assert "content_vector" in mock_client.search.call_args.kwargs["select"]
+        assert [result.id for result in results] == ["a_0", "c_0"]
+        assert results[0].content_vector.dtype == np.float32
+
+    def test_configured_scorer_is_used(self, monkeypatch) -> None:
+        from agent import search_tool
+
+        scorer = MagicMock()
+        scorer.score.return_value = np.array([0.0, 1.0])
+        monkeypatch.setattr(search_tool, "_rerank_scorer", None)
+        search_tool.configure_rerank_scorer(scorer)
+
+        results = search_tool._rerank_results("query", [_result("a_0", 0.9), _result("b_0", 0.1)], top=1)
+
+        assert [result.id for result in results] == ["b_0"]
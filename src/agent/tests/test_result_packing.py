@@ -0,0 +1,82 @@
+"""Tests for token-budgeted packing of search tool results."""
+
+from __future__ import annotations
+
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from agent.result_packing import EstimatingTokenizer, pack_results
+
+
+def _row(ref_number: int, content: str, summary: str = "") -> dict:
+    return {
+        "ref_number": ref_number,
+        "chunk_id": f"a_{ref_number}",
+        "content": content,
+        "summary": summary,
+    }
+
+
+def _pack(rows: list[dict], budget_tokens: int) -> list[dict]:
+    return pack_results(rows, budget_tokens=budget_tokens, tokenizer=EstimatingTokenizer())
+
+
+class TestPackResults:
+    def test_rows_within_budget_are_untouched(self) -> None:
+        rows = [_row(1, "x" * 400), _row(2, "y" * 400)]
+
+        assert _pack(rows, 200) == [_row(1, "x" * 400), _row(2, "y" * 400)]
+
+    def test_overflowing_row_is_truncated_and_later_rows_use_summaries(self) -> None:
+        rows = [
+            _row(1, "word " * 200),  # 250 tokens
+            _row(2, "word " * 400, summary="second summary"),
+            _row(3, "word " * 400, summary="third summary"),
+            _row(4, "word " * 400),
+        ]
+
+        packed = _pack(rows, 400)
+
+        assert packed[0]["content"] == "word " * 200
+        assert packed[1]["content_source"] == "truncated"
+        assert packed[1]["content"].endswith("word…")
+        assert len(packed[1]["content"]) <= 150 * 4
+        assert (packed[2]["content"], packed[2]["content_source"]) == ("third summary", "summary")
+        assert (packed[3]["content"], packed[3]["content_source"]) == ("", "omitted")
+        assert [(row["ref_number"], row["chunk_id"]) for row in packed] == [(n, f"a_{n}") for n in range(1, 5)]
+
+    def test_too_little_budget_left_falls_back_to_summary(self) -> None:
+        rows = [_row(1, "x" * 780), _row(2, "y" * 4000, summary="short")]
+
+        packed = _pack(rows, 200)
+
+        assert (packed[1]["content"], packed[1]["content_source"]) == ("short", "summary")
+
+    def test_zero_budget_disables_packing(self) -> None:
+        rows = [_row(1, "x" * 100_000)]
+
+        assert _pack(rows, 0)[0]["content"] == "x" * 100_000
+
+
+class TestSearchToolPacking:
+    @pytest.mark.asyncio
+    @patch("agent.kb_agent.search_kb_async", new_callable=AsyncMock)
+    async def test_tool_payload_respects_budget(self, mock_search: AsyncMock, monkeypatch) -> None:
+        from agent.kb_agent import search_knowledge_base
+        from agent.search_tool import SearchResult
+
+        monkeypatch.setattr("agent.kb_agent.config", SimpleNamespace(search_result_token_budget=100))
+        mock_search.return_value = [
+            SearchResult(id=f"a_{i}", article_id="a", chunk_index=i, content="z" * 1000, title="T",
+                         section_header="", summary=f"summary {i}")
+            for i in range(3)
+        ]
+
+        payload = json.loads((await search_knowledge_base("query")).text)
+
+        assert [row["content_source"] for row in payload["results"][1:]] == ["summary", "summary"]
+        assert payload["results"][0]["content_source"] == "truncated"
+        assert [row["ref_number"] for row in payload["results"]] == [1, 2, 3]
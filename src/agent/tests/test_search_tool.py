@@ -3,13 +3,27 @@
 from __future__ import annotations
 
 from types import SimpleNamespace
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from agent.search_result_cache import SearchResultCache
+from agent.ttl_cache import TTLCache
 from agent.search_tool import SearchResult, _normalize_security_filter_for_local_search, search_kb
 
 
+@pytest.fixture(autouse=True)
+def _disable_result_cache(monkeypatch) -> None:
+    """Keep the process-wide search result cache from leaking between tests."""
+    from agent import search_tool
+
+    monkeypatch.setattr(
+        search_tool,
+        "_result_cache",
+        SearchResultCache(max_entries=0, ttl_seconds=0, watermark_interval_seconds=0),
+    )
+
+
 class TestSearchResult:
     """Test the SearchResult dataclass."""
 
@@ -134,6 +148,15 @@ class TestLocalFilterNormalization:
 
         assert normalized == "(department eq 'engineering' or department eq 'research')"
 
+    def test_security_filter_is_shared_by_every_ordering_of_a_set(self) -> None:
+        from agent.search_tool import build_security_filter
+
+        first = build_security_filter(["research", "engineering"])
+
+        assert first == "search.in(department, 'engineering,research', ',')"
+        assert build_security_filter(frozenset({"engineering", "research"})) is first
+        assert build_security_filter([]) is None
+
     def test_keeps_filter_unchanged_outside_dev(self, monkeypatch) -> None:
         monkeypatch.setattr(
             "agent.search_tool.config",
@@ -142,3 +165,600 @@ class TestLocalFilterNormalization:
 
         original = "search.in(department, 'engineering', ',')"
         assert _normalize_security_filter_for_local_search(original) == original
+
+
+class TestEmbedQueryCache:
+    def test_repeated_query_embeds_once(self, monkeypatch) -> None:
+        from agent import search_tool
+        from agent.embedding_cache import QueryEmbeddingCache
+
+        backend = MagicMock()
+        backend.embed.return_value = [[0.1, 0.2]]
+        monkeypatch.setattr(search_tool, "_embedding_backend", backend)
+        monkeypatch.setattr(
+            search_tool,
+            "_embedding_cache",
+            QueryEmbeddingCache(model="m", dimensions=2, max_entries=4, ttl_seconds=60),
+        )
+
+        assert search_tool._embed_query("Semantic ranker setup") == [0.1, 0.2]
+        assert search_tool._embed_query("semantic  ranker setup") == [0.1, 0.2]
+
+        backend.embed.assert_called_once_with(["Semantic ranker setup"])
+
+
+class _AsyncResults:
+    """Minimal stand-in for the aio ``AsyncSearchItemPaged`` iterator."""
+
+    def __init__(self, items: list[dict], count: int | None = None) -> None:
+        self._items = list(items)
+        self._count = len(self._items) if count is None else count
+
+    async def get_count(self) -> int:
+        return self._count
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> dict:
+        if not self._items:
+            raise StopAsyncIteration
+        return self._items.pop(0)
+
+
+class TestSearchKbAsync:
+    @pytest.mark.asyncio
+    async def test_empty_query_returns_empty(self) -> None:
+        from agent.search_tool import search_kb_async
+
+        assert await search_kb_async("   ") == []
+
+    @pytest.mark.asyncio
+    @patch("agent.search_tool._async_search_client")
+    @patch("agent.search_tool._embed_uncached_async", new_callable=AsyncMock)
+    async def test_hybrid_search_uses_aio_client(self, mock_embed: AsyncMock, mock_client: MagicMock) -> None:
+        from agent.search_tool import search_kb_async
+
+        mock_embed.return_value = [0.1] * 1536
+        mock_client.search = AsyncMock(return_value=_AsyncResults([{
+            "id": "article_0",
+            "article_id": "article",
+            "chunk_index": 0,
+            "content": "Body",
+            "title": "Title",
+            "section_header": "Intro",
+            "image_urls": None,
+            "@search.score": 0.42,
+        }]))
+
+        results = await search_kb_async("query", top=3, security_filter="department eq 'engineering'")
+
+        assert [r.id for r in results] == ["article_0"]
+        assert results[0].score == 0.42
+        call_kwargs = mock_client.search.call_args.kwargs
+        assert call_kwargs["top"] == 3
+        assert call_kwargs["vector_queries"][0].k == 3
+        assert call_kwargs["filter"] == "department eq 'engineering'"
+
+
+def _doc(chunk_id: str, score: float = 0.0) -> dict:
+    return {
+        "id": chunk_id,
+        "article_id": chunk_id.rsplit("_", 1)[0],
+        "chunk_index": int(chunk_id.rsplit("_", 1)[1]),
+        "content": f"Body of {chunk_id}",
+        "@search.score": score,
+    }
+
+
+class TestReciprocalRankFusion:
+    def test_chunks_in_both_lists_rank_first(self) -> None:
+        from agent.search_tool import reciprocal_rank_fusion
+
+        def results(*ids: str) -> list[SearchResult]:
+            return [
+                SearchResult(id=i, article_id="a", chunk_index=0, content="", title="", section_header="")
+                for i in ids
+            ]
+
+        fused = reciprocal_rank_fusion([results("a_1", "a_2", "a_3"), results("a_3", "a_4")], top=4)
+
+        # a_2 and a_4 tie on rank 2 — first-seen order breaks the tie.
+        assert [r.id for r in fused] == ["a_3", "a_1", "a_2", "a_4"]
+        assert fused[0].score == pytest.approx(1 / 63 + 1 / 61)
+
+
+class TestSearchKbOverlap:
+    @pytest.fixture(autouse=True)
+    def _isolated_cache(self, monkeypatch) -> None:
+        from agent import search_tool
+        from agent.embedding_cache import QueryEmbeddingCache
+
+        monkeypatch.setattr(
+            search_tool,
+            "_embedding_cache",
+            QueryEmbeddingCache(model="m", dimensions=2, max_entries=4, ttl_seconds=60),
+        )
+
+    def _config(self, monkeypatch, *, budget_ms: int) -> None:
+        from agent import search_tool
+
+        monkeypatch.setattr(
+            search_tool,
+            "config",
+            SimpleNamespace(
+                is_dev=False,
+                search_backend="azure",
+                search_overlap_embedding=True,
+                search_embedding_budget_ms=budget_ms,
+                search_rerank_candidates=0,
+                search_expand_adjacent=False,
+            ),
+        )
+
+    @pytest.mark.asyncio
+    @patch("agent.search_tool._async_search_client")
+    async def test_keyword_and_vector_legs_are_fused(self, mock_client: MagicMock, monkeypatch) -> None:
+        from agent import search_tool
+
+        self._config(monkeypatch, budget_ms=0)
+        backend = MagicMock()
+        backend.embed = AsyncMock(return_value=[[0.1, 0.2]])
+        monkeypatch.setattr(search_tool, "_async_embedding_backend", backend)
+
+        async def fake_search(**kwargs):
+            if kwargs["vector_queries"] is None:
+                return _AsyncResults([_doc("kw_0"), _doc("both_0")])
+            return _AsyncResults([_doc("both_0"), _doc("vec_0")])
+
+        mock_client.search = AsyncMock(side_effect=fake_search)
+
+        results = await search_tool.search_kb_async("query", top=3)
+
+        assert [r.id for r in results] == ["both_0", "kw_0", "vec_0"]
+        legs = [call.kwargs for call in mock_client.search.call_args_list]
+        assert {leg["search_text"] for leg in legs} == {"query", None}
+
+    @pytest.mark.asyncio
+    @patch("agent.search_tool._async_search_client")
+    async def test_slow_embedding_returns_keyword_results(self, mock_client: MagicMock, monkeypatch) -> None:
+        import asyncio
+
+        from agent import search_tool
+
+        self._config(monkeypatch, budget_ms=10)
+        release = asyncio.Event()
+
+        async def slow_embed(texts):
+            await release.wait()
+            return [[0.1, 0.2]]
+
+        backend = MagicMock()
+        backend.embed = slow_embed
+        monkeypatch.setattr(search_tool, "_async_embedding_backend", backend)
+        mock_client.search = AsyncMock(return_value=_AsyncResults([_doc("kw_0", 3.2)]))
+
+        results = await search_tool.search_kb_async("query", top=3)
+
+        assert [r.id for r in results] == ["kw_0"]
+        mock_client.search.assert_awaited_once()
+        # Strongly referenced so it cannot be garbage-collected mid-flight.
+        assert len(search_tool._background_embeddings) == 1
+
+        # The embedding still completes in the background and warms the cache.
+        release.set()
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert search_tool._embedding_cache.get("query") == [0.1, 0.2]
+        assert not search_tool._background_embeddings
+
+    @pytest.mark.asyncio
+    @patch("agent.search_tool._async_search_client")
+    async def test_cached_vector_skips_overlap(self, mock_client: MagicMock, monkeypatch) -> None:
+        from agent import search_tool
+
+        self._config(monkeypatch, budget_ms=10)
+        search_tool._embedding_cache.put("query", [0.1, 0.2])
+        mock_client.search = AsyncMock(return_value=_AsyncResults([_doc("hy_0", 0.5)]))
+
+        results = await search_tool.search_kb_async("query", top=3)
+
+        assert [r.id for r in results] == ["hy_0"]
+        call_kwargs = mock_client.search.call_args.kwargs
+        assert call_kwargs["search_text"] == "query"
+        assert call_kwargs["vector_queries"][0].vector == [0.1, 0.2]
+
+
+class TestSearchKbMultiAsync:
+    @pytest.mark.asyncio
+    @patch("agent.search_tool._async_search_client")
+    async def test_batches_embeddings_and_fuses_by_chunk_id(self, mock_client: MagicMock, monkeypatch) -> None:
+        from agent import search_tool
+        from agent.embedding_cache import QueryEmbeddingCache
+
+        cache = QueryEmbeddingCache(model="m", dimensions=2, max_entries=8, ttl_seconds=60)
+        cache.put("cached query", [0.9, 0.9])
+        monkeypatch.setattr(search_tool, "_embedding_cache", cache)
+        monkeypatch.setattr(
+            search_tool,
+            "config",
+            SimpleNamespace(
+                is_dev=False,
+                search_backend="azure",
+                search_rerank_candidates=0,
+                search_expand_adjacent=False,
+            ),
+        )
+        backend = MagicMock()
+        backend.embed = AsyncMock(return_value=[[0.1, 0.2], [0.3, 0.4]])
+        monkeypatch.setattr(search_tool, "_async_embedding_backend", backend)
+
+        rankings = {
+            "first": [_doc("shared_0"), _doc("first_0")],
+            "second": [_doc("shared_0"), _doc("second_0")],
+            "cached query": [_doc("cached_0")],
+        }
+
+        async def fake_search(**kwargs):
+            return _AsyncResults(rankings[kwargs["search_text"]])
+
+        mock_client.search = AsyncMock(side_effect=fake_search)
+
+        results = await search_tool.search_kb_multi_async(
+            ["first", "second", "  FIRST ", "cached query", ""],
+            top=4,
+        )
+
+        backend.embed.assert_awaited_once_with(["first", "second"])
+        assert mock_client.search.await_count == 3
+        assert results[0].id == "shared_0"
+        assert sorted(r.id for r in results) == ["cached_0", "first_0", "second_0", "shared_0"]
+
+    @pytest.mark.asyncio
+    async def test_blank_queries_return_empty(self) -> None:
+        from agent.search_tool import search_kb_multi_async
+
+        assert await search_kb_multi_async(["", "  "]) == []
+
+
+class TestSearchResultCaching:
+    def _enable_cache(self, monkeypatch, clock=None) -> SearchResultCache:
+        from agent import search_tool
+
+        kwargs = {"clock": clock} if clock is not None else {}
+        cache = SearchResultCache(max_entries=16, ttl_seconds=60, watermark_interval_seconds=15, **kwargs)
+        monkeypatch.setattr(search_tool, "_result_cache", cache)
+        return cache
+
+    @pytest.mark.asyncio
+    @patch("agent.search_tool._async_search_client")
+    async def test_identical_search_is_served_from_cache(self, mock_client: MagicMock, monkeypatch) -> None:
+        from agent import search_tool
+
+        self._enable_cache(monkeypatch)
+        mock_client.search = AsyncMock(side_effect=lambda **_: _AsyncResults([_doc("a_0", 1.0)]))
+        eng = "search.in(department, 'engineering', ',')"
+
+        first = await search_tool._run_search_async(
+            search_text="Query", query_vector=[0.1], top=5, security_filter=eng,
+        )
+        second = await search_tool._run_search_async(
+            search_text="query", query_vector=[0.1], top=5, security_filter=eng,
+        )
+
+        assert [r.id for r in first] == [r.id for r in second] == ["a_0"]
+        mock_client.search.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    @patch("agent.search_tool._async_search_client")
+    async def test_results_never_cross_security_filters(self, mock_client: MagicMock, monkeypatch) -> None:
+        from agent import search_tool
+
+        self._enable_cache(monkeypatch)
+        mock_client.search = AsyncMock(side_effect=lambda **kwargs: _AsyncResults([_doc("a_0")]))
+
+        for security_filter in ("department eq 'engineering'", "department eq 'finance'", None):
+            await search_tool._run_search_async(
+                search_text="query",
+                query_vector=[0.1],
+                top=5,
+                security_filter=security_filter,
+            )
+
+        assert mock_client.search.await_count == 3
+
+    @staticmethod
+    def _fake_index(stamps: list[str]):
+        """Answer the watermark probe's count-only and newest-row queries from ``stamps``."""
+
+        async def fake_search(**kwargs):
+            op, value = kwargs["filter"].split(" ", 2)[1:]
+            value = value.strip("'")
+            matches = [s for s in stamps if (s > value if op == "gt" else s == value)]
+            if kwargs.get("order_by"):
+                return _AsyncResults([{"indexed_at": s} for s in sorted(matches, reverse=True)[:1]])
+            assert kwargs["top"] == 0 and kwargs["include_total_count"] is True
+            return _AsyncResults([], count=len(matches))
+
+        return AsyncMock(side_effect=fake_search)
+
+    @pytest.mark.asyncio
+    @patch("agent.search_tool._async_search_client")
+    async def test_first_probe_reads_newest_run_once(self, mock_client: MagicMock, monkeypatch) -> None:
+        from agent import search_tool
+
+        cache = self._enable_cache(monkeypatch)
+        mock_client.search = self._fake_index(["2026-01-01T00:00:00+00:00", "2026-01-02T00:00:00+00:00"])
+
+        await search_tool._refresh_index_watermark_async()
+
+        newest, count = mock_client.search.call_args_list
+        assert newest.kwargs["order_by"] == ["indexed_at desc"]
+        assert newest.kwargs["top"] == 1
+        assert count.kwargs["filter"] == "indexed_at eq '2026-01-02T00:00:00+00:00'"
+        assert cache.watermark == "2026-01-02T00:00:00+00:00"
+
+    @pytest.mark.asyncio
+    @patch("agent.search_tool._async_search_client")
+    async def test_advancing_watermark_flushes_cache(self, mock_client: MagicMock, monkeypatch) -> None:
+        from agent import search_tool
+
+        cache = self._enable_cache(monkeypatch)
+        cache.advance_watermark("2026-01-01T00:00:00+00:00", 1)
+        key = cache.make_key(security_filter=None, search_text="q", query_vector=None, top=5)
+        cache.put(key, [])
+        mock_client.search = self._fake_index(["2026-01-01T00:00:00+00:00", "2026-01-02T00:00:00+00:00"])
+
+        await search_tool._refresh_index_watermark_async()
+
+        assert mock_client.search.call_args_list[0].kwargs["filter"] == "indexed_at gt '2026-01-01T00:00:00+00:00'"
+        assert cache.get(key) is None
+        # Advanced to the observed indexed_at, not to the local probe time.
+        assert cache.watermark == "2026-01-02T00:00:00+00:00"
+
+    @pytest.mark.asyncio
+    @patch("agent.search_tool._async_search_client")
+    async def test_late_chunks_of_the_same_run_flush_cache(self, mock_client: MagicMock, monkeypatch) -> None:
+        from agent import search_tool
+
+        cache = self._enable_cache(monkeypatch)
+        run = "2026-01-02T00:00:00+00:00"
+        mock_client.search = self._fake_index([run, run])
+        await search_tool._refresh_index_watermark_async()
+        key = cache.make_key(security_filter=None, search_text="q", query_vector=None, top=5)
+        cache.put(key, [])
+
+        # Unchanged: same timestamp, same count.
+        await search_tool._refresh_index_watermark_async()
+        assert cache.get(key) == []
+
+        # A later chunk of the same run carries the run's (older) timestamp.
+        mock_client.search = self._fake_index([run, run, run])
+        await search_tool._refresh_index_watermark_async()
+        assert cache.get(key) is None
+        assert cache.watermark == run
+
+    @pytest.mark.asyncio
+    @patch("agent.search_tool._async_search_client")
+    async def test_unchanged_watermark_keeps_cache(self, mock_client: MagicMock, monkeypatch) -> None:
+        from agent import search_tool
+
+        cache = self._enable_cache(monkeypatch)
+        cache.advance_watermark("2026-01-01T00:00:00+00:00", 1)
+        key = cache.make_key(security_filter=None, search_text="q", query_vector=None, top=5)
+        cache.put(key, [])
+        mock_client.search = self._fake_index(["2026-01-01T00:00:00+00:00"])
+
+        await search_tool._refresh_index_watermark_async()
+
+        # Steady state is two count-only queries; the newest row is not read.
+        assert mock_client.search.await_count == 2
+        assert all(call.kwargs["top"] == 0 for call in mock_client.search.call_args_list)
+        assert cache.get(key) == []
+        assert cache.watermark == "2026-01-01T00:00:00+00:00"
+
+    def test_watermark_check_is_claimed_once_per_interval(self) -> None:
+        now = [100.0]
+        cache = SearchResultCache(max_entries=4, ttl_seconds=60, watermark_interval_seconds=15, clock=lambda: now[0])
+
+        assert cache.watermark_check_due() is True
+        assert cache.watermark_check_due() is False
+        now[0] += 15
+        assert cache.watermark_check_due() is True
+
+
+class TestGetChunkByIdAsync:
+    @pytest.mark.asyncio
+    @patch("agent.search_tool._async_search_client")
+    async def test_returns_chunk(self, mock_client: MagicMock) -> None:
+        from agent.search_tool import get_chunk_by_id_async
+
+        mock_client.get_document = AsyncMock(return_value={
+            "id": "article_1",
+            "article_id": "article",
+            "chunk_index": 1,
+            "content": "Body",
+            "department": "engineering",
+        })
+
+        chunk = await get_chunk_by_id_async(" article_1 ", security_filter="search.in(department, 'engineering', ',')")
+
+        assert chunk is not None
+        assert chunk.id == "article_1"
+        mock_client.get_document.assert_awaited_once()
+        assert mock_client.get_document.call_args.kwargs["key"] == "article_1"
+
+    @pytest.mark.asyncio
+    @patch("agent.search_tool._async_search_client")
+    async def test_blocks_other_departments(self, mock_client: MagicMock) -> None:
+        from agent.search_tool import get_chunk_by_id_async
+
+        mock_client.get_document = AsyncMock(return_value={
+            "id": "article_1",
+            "article_id": "article",
+            "content": "Body",
+            "department": "finance",
+        })
+
+        chunk = await get_chunk_by_id_async("article_1", security_filter="search.in(department, 'engineering', ',')")
+
+        assert chunk is None
+
+    @pytest.mark.asyncio
+    @patch("agent.search_tool._async_search_client")
+    async def test_department_prefix_is_not_a_match(self, mock_client: MagicMock) -> None:
+        from agent.search_tool import get_chunk_by_id_async
+
+        mock_client.get_document = AsyncMock(return_value={
+            "id": "article_1",
+            "article_id": "article",
+            "content": "Body",
+            "department": "eng",
+        })
+
+        chunk = await get_chunk_by_id_async(
+            "article_1",
+            security_filter="search.in(department, 'engineering,Research', ',')",
+        )
+        allowed = await get_chunk_by_id_async(
+            "article_1",
+            security_filter="search.in(department, 'research,ENG', ',')",
+        )
+
+        assert chunk is None
+        assert allowed is not None
+
+    @pytest.mark.asyncio
+    @patch("agent.search_tool._async_search_client")
+    async def test_lookup_errors_return_none(self, mock_client: MagicMock) -> None:
+        from agent.search_tool import get_chunk_by_id_async
+
+        mock_client.get_document = AsyncMock(side_effect=RuntimeError("not found"))
+
+        assert await get_chunk_by_id_async("article_1") is None
+
+
+class TestExpandAdjacentChunks:
+    @pytest.fixture(autouse=True)
+    def _isolated_chunk_maps(self, monkeypatch) -> None:
+        from agent import search_tool
+
+        monkeypatch.setattr(search_tool, "config", SimpleNamespace(is_dev=False, search_backend="azure"))
+        monkeypatch.setattr(search_tool, "_chunk_map_cache", TTLCache(max_entries=16, ttl_seconds=60))
+
+    @pytest.mark.asyncio
+    @patch("agent.search_tool._async_search_client")
+    async def test_neighbours_surround_hits_in_reading_order(self, mock_client: MagicMock) -> None:
+        from agent import search_tool
+
+        article_chunks = {"a": [0, 1, 2, 3], "b": [0]}
+
+        async def fake_search(**kwargs):
+            if kwargs["select"] == ["id", "article_id", "chunk_index"]:
+                return _AsyncResults([
+                    {"id": f"{article}_{index}", "article_id": article, "chunk_index": index}
+                    for article, indexes in article_chunks.items()
+                    for index in indexes
+                ])
+            return _AsyncResults([_doc("a_0"), _doc("a_3")])
+
+        mock_client.search = AsyncMock(side_effect=fake_search)
+        hits = [search_tool._to_search_result(_doc(chunk_id), score=1.0) for chunk_id in ("a_1", "b_0", "a_2")]
+
+        expanded = await search_tool.expand_adjacent_chunks_async(
+            hits,
+            security_filter="search.in(department, 'engineering', ',')",
+        )
+
+        assert [result.id for result in expanded] == ["a_0", "a_1", "b_0", "a_2", "a_3"]
+        map_query, content_query = mock_client.search.call_args_list
+        assert map_query.kwargs["filter"] == "search.in(article_id, 'a,b', ',')"
+        assert content_query.kwargs["filter"] == (
+            "search.in(id, 'a_0,a_3', ',') and (search.in(department, 'engineering', ','))"
+        )
+
+    @pytest.mark.asyncio
+    @patch("agent.search_tool._async_search_client")
+    async def test_chunk_map_query_pages_past_the_top_cap(self, mock_client: MagicMock) -> None:
+        from agent import search_tool
+
+        total = search_tool._MAX_IDS_PER_QUERY + 5
+        rows = [{"id": f"long_{index}", "article_id": "long", "chunk_index": index} for index in range(total)]
+
+        async def fake_search(**kwargs):
+            skip = kwargs.get("skip", 0)
+            return _AsyncResults(rows[skip:skip + kwargs["top"]])
+
+        mock_client.search = AsyncMock(side_effect=fake_search)
+
+        maps = await search_tool._get_article_chunk_maps_async(["long"])
+
+        assert len(maps["long"]) == total
+        assert maps["long"][total - 1] == f"long_{total - 1}"
+        assert [call.kwargs["skip"] for call in mock_client.search.call_args_list] == [
+            0,
+            search_tool._MAX_IDS_PER_QUERY,
+        ]
+        assert all(call.kwargs["order_by"] == ["id"] for call in mock_client.search.call_args_list)
+
+    @pytest.mark.asyncio
+    @patch("agent.search_tool._async_search_client")
+    async def test_cached_chunk_map_skips_the_map_query(self, mock_client: MagicMock) -> None:
+        from agent import search_tool
+
+        search_tool._get_chunk_map_cache().set("solo", {0: "solo_0"})
+        mock_client.search = AsyncMock()
+
+        hits = [search_tool._to_search_result(_doc("solo_0"), score=1.0)]
+        expanded = await search_tool.expand_adjacent_chunks_async(hits)
+
+        assert [result.id for result in expanded] == ["solo_0"]
+        mock_client.search.assert_not_called()
+
+
+class TestGetChunksByIds:
+    @patch("agent.search_tool._search_client")
+    def test_single_filtered_query_with_security_filter(self, mock_client: MagicMock, monkeypatch) -> None:
+        from agent import search_tool
+
+        monkeypatch.setattr(search_tool, "config", SimpleNamespace(is_dev=False, search_backend="azure"))
+        mock_client.search.return_value = [_doc("a_0"), _doc("b_2")]
+
+        chunks = search_tool.get_chunks_by_ids(
+            ["a_0", "b_2", "a_0", " "],
+            security_filter="search.in(department, 'engineering', ',')",
+        )
+
+        assert sorted(chunks) == ["a_0", "b_2"]
+        mock_client.search.assert_called_once()
+        call_kwargs = mock_client.search.call_args.kwargs
+        assert call_kwargs["filter"] == (
+            "search.in(id, 'a_0,b_2', ',') and (search.in(department, 'engineering', ','))"
+        )
+        assert call_kwargs["top"] == 2
+
+    def test_id_filter_escapes_quotes_and_avoids_the_delimiter(self, monkeypatch) -> None:
+        from agent import search_tool
+
+        monkeypatch.setattr(search_tool, "config", SimpleNamespace(is_dev=False))
+
+        assert search_tool._build_id_filter(["o'neil_0", "b_1"]) == "search.in(id, 'o''neil_0,b_1', ',')"
+        assert search_tool._build_id_filter(["a,b_0", "c_1"]) == "(id eq 'a,b_0' or id eq 'c_1')"
+
+    @pytest.mark.asyncio
+    @patch("agent.search_tool._async_search_client")
+    async def test_async_lookup_uses_eq_filter_in_dev(self, mock_client: MagicMock, monkeypatch) -> None:
+        from agent import search_tool
+
+        monkeypatch.setattr(search_tool, "config", SimpleNamespace(is_dev=True, search_backend="azure"))
+        mock_client.search = AsyncMock(return_value=_AsyncResults([_doc("a_0")]))
+
+        chunks = await search_tool.get_chunks_by_ids_async(["a_0", "b_2"])
+
+        assert list(chunks) == ["a_0"]
+        assert mock_client.search.call_args.kwargs["filter"] == "(id eq 'a_0' or id eq 'b_2')"
+
+    def test_empty_ids_skip_the_query(self) -> None:
+        from agent.search_tool import get_chunks_by_ids
+
+        assert get_chunks_by_ids([]) == {}
@@ -19,7 +19,7 @@ from middleware.request_context import user_claims_var, resolved_departments_var
 def _reset_context_vars():
     """Reset ContextVars before each test."""
     token_claims = user_claims_var.set({})
-    token_depts = resolved_departments_var.set([])
+    token_depts = resolved_departments_var.set(None)
     yield
     user_claims_var.reset(token_claims)
     resolved_departments_var.reset(token_depts)
@@ -45,7 +45,7 @@ class TestSecurityFilterMiddleware:
 
         await middleware.process(context, call_next)
 
-        assert context.kwargs["departments"] == ["engineering"]
+        assert context.kwargs["departments"] == frozenset({"engineering"})
         assert context.kwargs["roles"] == ["contributor"]
         assert context.kwargs["tenant_id"] == "t1"
         call_next.assert_awaited_once()
@@ -67,7 +67,7 @@ class TestSecurityFilterMiddleware:
 
         await middleware.process(context, call_next)
 
-        assert context.kwargs["departments"] == []
+        assert context.kwargs["departments"] == frozenset()
         call_next.assert_awaited_once()
 
     @pytest.mark.asyncio
@@ -81,7 +81,7 @@ class TestSecurityFilterMiddleware:
 
         await middleware.process(context, call_next)
 
-        assert context.kwargs["departments"] == []
+        assert context.kwargs["departments"] == frozenset()
         assert context.kwargs["roles"] == []
         assert context.kwargs["tenant_id"] == ""
         call_next.assert_awaited_once()
@@ -102,7 +102,24 @@ class TestSecurityFilterMiddleware:
 
         await middleware.process(context, call_next)
 
-        assert resolved_departments_var.get() == ["engineering"]
+        assert resolved_departments_var.get() == frozenset({"engineering"})
+
+    @pytest.mark.asyncio
+    async def test_groups_are_resolved_once_per_request(self) -> None:
+        user_claims_var.set({"user_id": "u1", "groups": ["group-guid-1"], "roles": []})
+        middleware = SecurityFilterMiddleware()
+        context = MagicMock()
+        context.kwargs = {}
+        context.function.name = "search_knowledge_base"
+
+        with patch(
+            "agent.security_middleware.resolve_departments",
+            AsyncMock(return_value=frozenset({"engineering"})),
+        ) as resolve:
+            await middleware.process(context, AsyncMock())
+            await middleware.process(context, AsyncMock())
+
+        resolve.assert_awaited_once_with(["group-guid-1"])
 
     @pytest.mark.asyncio
     async def test_sets_otel_span_attributes(self) -> None:
@@ -0,0 +1,47 @@
+"""Tests for compressed session payloads."""
+
+from __future__ import annotations
+
+import pytest
+
+from agent.session_codec import decode_fields, encode_fields, resolve_codec
+
+_SESSION = {"state": {"in_memory": {"messages": [{"role": "user", "contents": [{"type": "text", "text": "é" * 50}]}]}}}
+
+
+def test_gzip_roundtrip_tags_the_document() -> None:
+    doc = encode_fields({"id": "conv-1", "session": _SESSION}, ("session",), "gzip")
+
+    assert doc["codec"] == {"name": "gzip", "version": 1, "fields": ["session"]}
+    assert isinstance(doc["session"], str)
+    assert decode_fields(doc) == {"id": "conv-1", "session": _SESSION}
+
+
+def test_none_codec_and_untagged_documents_pass_through() -> None:
+    doc = {"id": "conv-1", "session": _SESSION}
+
+    assert encode_fields(doc, ("session",), "none") is doc
+    assert decode_fields(doc) is doc
+
+
+def test_missing_fields_are_not_encoded() -> None:
+    doc = encode_fields({"id": "conv-1"}, ("session",), "gzip")
+
+    assert doc["codec"]["fields"] == []
+    assert decode_fields(doc) == {"id": "conv-1"}
+
+
+def test_unknown_codec_version_is_rejected() -> None:
+    doc = encode_fields({"id": "conv-1", "session": _SESSION}, ("session",), "gzip")
+    doc["codec"]["version"] = 2
+
+    with pytest.raises(ValueError, match="Unsupported session codec"):
+        decode_fields(doc)
+
+
+def test_resolve_codec() -> None:
+    with pytest.raises(ValueError):
+        resolve_codec("brotli")
+    with pytest.raises(ValueError):
+        resolve_codec("zstd")
+    assert resolve_codec("gzip") == "gzip"
@@ -5,9 +5,16 @@ from __future__ import annotations
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
-from azure.cosmos.exceptions import CosmosHttpResponseError, CosmosResourceNotFoundError
+from azure.core import MatchConditions
+from azure.cosmos.exceptions import (
+    CosmosAccessConditionFailedError,
+    CosmosHttpResponseError,
+    CosmosResourceExistsError,
+    CosmosResourceNotFoundError,
+)
 
 from agent.session_repository import CosmosAgentSessionRepository
+from agent.session_segments import segment_ids
 
 
 @pytest.fixture
@@ -553,3 +560,324 @@ async def test_write_replaces_entire_document(
     upserted = mock_container.upsert_item.call_args[0][0]
     # Only id and session — no legacy fields preserved
     assert upserted == {"id": "conv-legacy", "session": {"messages": []}}
+
+
+# ── Session cache (ETag-validated) ──────────────────────────────────────
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return _FakeClock()
+
+
+@pytest.fixture
+def cached_repo(mock_container, clock):
+    """Repo with the session cache enabled, wired to a mock container."""
+    with patch("agent.session_repository.create_async_cosmos_client"):
+        repo = CosmosAgentSessionRepository(
+            endpoint="https://test-cosmos.documents.azure.com:443/",
+            database_name="kb-agent",
+            cache_max_entries=8,
+            cache_ttl_seconds=600,
+            clock=clock,
+        )
+    mock_client = MagicMock()
+    mock_client.get_database_client.return_value.get_container_client.return_value = mock_container
+    repo._client = mock_client
+    return repo
+
+
+@pytest.mark.asyncio
+async def test_cached_read_revalidates_with_etag(cached_repo, mock_container):
+    session = {"state": {"messages": [1]}}
+    mock_container.read_item.side_effect = [
+        {"id": "conv-1", "session": session, "_etag": '"e1"'},
+        {},  # 304 Not Modified
+    ]
+
+    first = await cached_repo.read_from_storage("conv-1")
+    second = await cached_repo.read_from_storage("conv-1")
+
+    assert first == second == session
+    assert mock_container.read_item.await_args_list[1].kwargs == {
+        "item": "conv-1",
+        "partition_key": "conv-1",
+        "if_none_match": '"e1"',
+    }
+
+
+@pytest.mark.asyncio
+async def test_changed_document_replaces_cached_session(cached_repo, mock_container):
+    mock_container.read_item.side_effect = [
+        {"id": "conv-1", "session": {"v": 1}, "_etag": '"e1"'},
+        {"id": "conv-1", "session": {"v": 2}, "_etag": '"e2"'},
+        {},
+    ]
+
+    await cached_repo.read_from_storage("conv-1")
+    assert await cached_repo.read_from_storage("conv-1") == {"v": 2}
+    assert await cached_repo.read_from_storage("conv-1") == {"v": 2}
+    assert mock_container.read_item.await_args.kwargs["if_none_match"] == '"e2"'
+
+
+@pytest.mark.asyncio
+async def test_write_through_serves_next_read(cached_repo, mock_container):
+    mock_container.upsert_item.return_value = {"id": "conv-1", "session": {"v": 3}, "_etag": '"e3"'}
+    mock_container.read_item.return_value = {}
+
+    await cached_repo.write_to_storage("conv-1", {"v": 3})
+
+    assert await cached_repo.read_from_storage("conv-1") == {"v": 3}
+    assert mock_container.read_item.await_args.kwargs["if_none_match"] == '"e3"'
+
+
+@pytest.mark.asyncio
+async def test_revalidate_window_skips_cosmos(cached_repo, mock_container, clock):
+    cached_repo._revalidate_seconds = 5
+    mock_container.read_item.return_value = {"id": "conv-1", "session": {"v": 1}, "_etag": '"e1"'}
+
+    for _ in range(5):
+        await cached_repo.read_from_storage("conv-1")
+    clock.now = 6
+    await cached_repo.read_from_storage("conv-1")
+
+    assert mock_container.read_item.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_cached_session_is_copied(cached_repo, mock_container):
+    mock_container.read_item.side_effect = [
+        {"id": "conv-1", "session": {"messages": []}, "_etag": '"e1"'},
+        {},
+    ]
+
+    (await cached_repo.read_from_storage("conv-1"))["messages"].append("mutated")
+
+    assert await cached_repo.read_from_storage("conv-1") == {"messages": []}
+
+
+@pytest.mark.asyncio
+async def test_deleted_document_evicts_cached_session(cached_repo, mock_container):
+    mock_container.read_item.side_effect = [
+        {"id": "conv-1", "session": {"v": 1}, "_etag": '"e1"'},
+        CosmosResourceNotFoundError(message="Not found"),
+        CosmosResourceNotFoundError(message="Not found"),
+    ]
+
+    await cached_repo.read_from_storage("conv-1")
+    assert await cached_repo.read_from_storage("conv-1") is None
+    await cached_repo.read_from_storage("conv-1")
+
+    assert "if_none_match" not in mock_container.read_item.await_args.kwargs
+
+
+@pytest.mark.asyncio
+async def test_failed_write_evicts_cached_session(cached_repo, mock_container):
+    mock_container.read_item.return_value = {"id": "conv-1", "session": {"v": 1}, "_etag": '"e1"'}
+    mock_container.upsert_item.side_effect = CosmosHttpResponseError(status_code=503, message="Unavailable")
+
+    await cached_repo.read_from_storage("conv-1")
+    with pytest.raises(CosmosHttpResponseError):
+        await cached_repo.write_to_storage("conv-1", {"v": 2})
+    await cached_repo.read_from_storage("conv-1")
+
+    assert "if_none_match" not in mock_container.read_item.await_args.kwargs
+
+
+# ── Segmented layout ────────────────────────────────────────────────────
+
+
+class _DocumentStore:
+    """In-memory stand-in for the container's upsert/read/delete calls."""
+
+    def __init__(self, container: AsyncMock) -> None:
+        self.docs: dict[str, dict] = {}
+        self._etag = 0
+        container.upsert_item.side_effect = self.upsert
+        container.create_item.side_effect = self.create
+        container.replace_item.side_effect = self.replace
+        container.read_item.side_effect = self.read
+        container.read_items.side_effect = self.read_many
+        container.delete_item.side_effect = self.delete
+
+    async def upsert(self, doc):
+        self._etag += 1
+        self.docs[doc["id"]] = {**doc, "_etag": f'"{self._etag}"'}
+        return self.docs[doc["id"]]
+
+    async def create(self, doc):
+        if doc["id"] in self.docs:
+            raise CosmosResourceExistsError(message="Conflict")
+        return await self.upsert(doc)
+
+    async def replace(self, item, body, *, etag, match_condition):
+        if item not in self.docs:
+            raise CosmosResourceNotFoundError(message="Not found")
+        if match_condition == MatchConditions.IfNotModified and self.docs[item]["_etag"] != etag:
+            raise CosmosAccessConditionFailedError(message="Precondition failed")
+        return await self.upsert(body)
+
+    async def read(self, item, partition_key, **kwargs):
+        if item not in self.docs:
+            raise CosmosResourceNotFoundError(message="Not found")
+        doc = self.docs[item]
+        return {} if kwargs.get("if_none_match") == doc["_etag"] else doc
+
+    async def read_many(self, items):
+        return [self.docs[item_id] for item_id, _ in items if item_id in self.docs]
+
+    async def delete(self, item, partition_key):
+        del self.docs[item]
+
+
+def _turns(count: int) -> dict:
+    messages = [{"role": "user", "contents": [{"type": "text", "text": f"turn {n}"}]} for n in range(count)]
+    return {"type": "session", "session_id": "s", "state": {"in_memory": {"messages": messages}}}
+
+
+@pytest.fixture
+def segmented_repo(mock_container):
+    with patch("agent.session_repository.create_async_cosmos_client"):
+        repo = CosmosAgentSessionRepository(
+            endpoint="https://test-cosmos.documents.azure.com:443/",
+            database_name="kb-agent",
+            layout="segmented",
+        )
+    mock_client = MagicMock()
+    mock_client.get_database_client.return_value.get_container_client.return_value = mock_container
+    repo._client = mock_client
+    return repo
+
+
+def test_unknown_layout_is_rejected():
+    with pytest.raises(ValueError, match="layout"):
+        CosmosAgentSessionRepository(endpoint="https://x", database_name="db", layout="sharded")
+
+
+@pytest.mark.asyncio
+async def test_segmented_writes_append_one_segment_per_turn(segmented_repo, mock_container):
+    store = _DocumentStore(mock_container)
+
+    await segmented_repo.write_to_storage("conv-1", _turns(2))
+    await segmented_repo.write_to_storage("conv-1", _turns(4))
+
+    head = store.docs["conv-1"]
+    assert head["session"]["state"]["in_memory"]["messages"] == []
+    assert [segment["count"] for segment in head["segments"]] == [2, 2]
+    assert store.docs[head["segments"][1]["id"]]["messages"] == _turns(4)["state"]["in_memory"]["messages"][2:]
+    assert await segmented_repo.read_from_storage("conv-1") == _turns(4)
+
+
+@pytest.mark.asyncio
+async def test_segmented_write_migrates_single_document_session(segmented_repo, mock_container):
+    store = _DocumentStore(mock_container)
+    store.docs["conv-1"] = {"id": "conv-1", "session": _turns(1), "_etag": '"legacy"'}
+
+    assert await segmented_repo.read_from_storage("conv-1") == _turns(1)
+    await segmented_repo.write_to_storage("conv-1", _turns(2))
+
+    assert store.docs["conv-1"]["layout"] == "segmented"
+    assert await segmented_repo.read_from_storage("conv-1") == _turns(2)
+
+
+@pytest.mark.asyncio
+async def test_rewritten_history_deletes_previous_segments(segmented_repo, mock_container):
+    store = _DocumentStore(mock_container)
+    await segmented_repo.write_to_storage("conv-1", _turns(3))
+
+    rewritten = _turns(1)
+    rewritten["state"]["in_memory"]["messages"][0]["contents"][0]["text"] = "summary"
+    await segmented_repo.write_to_storage("conv-1", rewritten)
+
+    assert sorted(store.docs) == sorted(["conv-1", *segment_ids(store.docs["conv-1"])])
+    assert store.docs["conv-1"]["generation"] == 2
+    assert await segmented_repo.read_from_storage("conv-1") == rewritten
+
+
+def _segmented_replica(container) -> CosmosAgentSessionRepository:
+    with patch("agent.session_repository.create_async_cosmos_client"):
+        repo = CosmosAgentSessionRepository(
+            endpoint="https://x",
+            database_name="db",
+            layout="segmented",
+            cache_max_entries=8,
+            cache_ttl_seconds=60,
+        )
+    repo._client = MagicMock()
+    repo._client.get_database_client.return_value.get_container_client.return_value = container
+    return repo
+
+
+@pytest.mark.asyncio
+async def test_concurrent_segmented_writes_replan_against_the_stored_head(mock_container):
+    store = _DocumentStore(mock_container)
+    first, second = _segmented_replica(mock_container), _segmented_replica(mock_container)
+    await first.write_to_storage("conv-1", _turns(2))
+    assert await second.read_from_storage("conv-1") == _turns(2)
+
+    # Both replicas now hold the same cached head; the first one moves it.
+    await first.write_to_storage("conv-1", _turns(3))
+    diverged = _turns(3)
+    diverged["state"]["in_memory"]["messages"][2]["contents"][0]["text"] = "other replica"
+    await second.write_to_storage("conv-1", diverged)
+
+    head = store.docs["conv-1"]
+    assert sorted(store.docs) == sorted(["conv-1", *segment_ids(head)])
+    assert await _segmented_replica(mock_container).read_from_storage("conv-1") == diverged
+    assert mock_container.replace_item.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_segmented_write_gives_up_when_the_head_keeps_moving(segmented_repo, mock_container):
+    store = _DocumentStore(mock_container)
+    await segmented_repo.write_to_storage("conv-1", _turns(1))
+    mock_container.replace_item.side_effect = CosmosAccessConditionFailedError(message="Precondition failed")
+
+    with pytest.raises(CosmosAccessConditionFailedError):
+        await segmented_repo.write_to_storage("conv-1", _turns(2))
+
+    assert sorted(store.docs) == sorted(["conv-1", *segment_ids(store.docs["conv-1"])])
+    assert await segmented_repo.read_from_storage("conv-1") == _turns(1)
+
+
+@pytest.mark.asyncio
+async def test_document_layout_reads_segmented_sessions(repo_with_container, segmented_repo, mock_container):
+    _DocumentStore(mock_container)
+    await segmented_repo.write_to_storage("conv-1", _turns(2))
+
+    assert await repo_with_container.read_from_storage("conv-1") == _turns(2)
+
+
+@pytest.mark.asyncio
+async def test_compressed_sessions_roundtrip(mock_container):
+    store = _DocumentStore(mock_container)
+    with patch("agent.session_repository.create_async_cosmos_client"):
+        repo = CosmosAgentSessionRepository(endpoint="https://x", database_name="db", codec="gzip")
+    repo._client = MagicMock()
+    repo._client.get_database_client.return_value.get_container_client.return_value = mock_container
+
+    await repo.write_to_storage("conv-1", _turns(3))
+
+    assert isinstance(store.docs["conv-1"]["session"], str)
+    assert store.docs["conv-1"]["codec"]["name"] == "gzip"
+    assert await repo.read_from_storage("conv-1") == _turns(3)
+
+
+@pytest.mark.asyncio
+async def test_compressed_segments_roundtrip(segmented_repo, mock_container):
+    store = _DocumentStore(mock_container)
+    segmented_repo._codec = "gzip"
+
+    await segmented_repo.write_to_storage("conv-1", _turns(2))
+    await segmented_repo.write_to_storage("conv-1", _turns(3))
+
+    assert isinstance(store.docs[store.docs["conv-1"]["segments"][1]["id"]]["messages"], str)
+    assert await segmented_repo.read_from_storage("conv-1") == _turns(3)
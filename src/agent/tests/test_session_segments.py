@@ -0,0 +1,108 @@
+"""Tests for the append-only session storage layout."""
+
+from __future__ import annotations
+
+import pytest
+
+from agent.session_segments import assemble_session, is_segmented, plan_segmented_write
+
+
+def _session(*texts: str) -> dict:
+    return {
+        "type": "session",
+        "session_id": "s-1",
+        "state": {"in_memory": {"messages": [{"role": "user", "text": text} for text in texts]}},
+    }
+
+
+def _roundtrip(plan) -> dict:
+    return assemble_session(plan.head, plan.segments)
+
+
+class TestPlanSegmentedWrite:
+    def test_new_conversation_writes_head_and_segments(self) -> None:
+        plan = plan_segmented_write("conv-1", _session("a", "b"), None, write_id="w1")
+
+        assert is_segmented(plan.head)
+        assert plan.head["session"]["state"]["in_memory"]["messages"] == []
+        assert [segment["id"] for segment in plan.segments] == ["conv-1:1:0:w1"]
+        assert plan.stale_segment_ids == []
+        assert _roundtrip(plan) == _session("a", "b")
+
+    def test_appended_turn_writes_only_the_new_messages(self) -> None:
+        first = plan_segmented_write("conv-1", _session("a", "b"), None, write_id="w1")
+
+        second = plan_segmented_write("conv-1", _session("a", "b", "c", "d"), first.head, write_id="w2")
+
+        assert [segment["messages"] for segment in second.segments] == [
+            [{"role": "user", "text": "c"}, {"role": "user", "text": "d"}]
+        ]
+        assert [entry["id"] for entry in second.head["segments"]] == ["conv-1:1:0:w1", "conv-1:1:1:w2"]
+        assert second.stale_segment_ids == []
+        assert assemble_session(second.head, first.segments + second.segments) == _session("a", "b", "c", "d")
+
+    def test_state_only_change_writes_no_segment(self) -> None:
+        first = plan_segmented_write("conv-1", _session("a"), None)
+        session = _session("a")
+        session["state"]["counter"] = 2
+
+        second = plan_segmented_write("conv-1", session, first.head)
+
+        assert second.segments == []
+        assert second.head["session"]["state"]["counter"] == 2
+
+    def test_rewritten_history_starts_a_new_generation(self) -> None:
+        first = plan_segmented_write("conv-1", _session("a", "b"), None, write_id="w1")
+
+        second = plan_segmented_write("conv-1", _session("summary", "c"), first.head, write_id="w2")
+
+        assert [segment["id"] for segment in second.segments] == ["conv-1:2:0:w2"]
+        assert second.stale_segment_ids == ["conv-1:1:0:w1"]
+        assert _roundtrip(second) == _session("summary", "c")
+
+    def test_concurrent_writes_from_one_head_never_share_segment_ids(self) -> None:
+        first = plan_segmented_write("conv-1", _session("a"), None)
+
+        ours = plan_segmented_write("conv-1", _session("a", "b"), first.head)
+        theirs = plan_segmented_write("conv-1", _session("a", "c"), first.head)
+
+        assert {segment["id"] for segment in ours.segments}.isdisjoint(
+            segment["id"] for segment in theirs.segments
+        )
+
+    def test_single_document_session_is_migrated(self) -> None:
+        legacy = {"id": "conv-1", "session": _session("a")}
+
+        plan = plan_segmented_write("conv-1", _session("a", "b"), legacy)
+
+        assert plan.head["generation"] == 1
+        assert plan.stale_segment_ids == []
+        assert _roundtrip(plan) == _session("a", "b")
+
+    def test_long_rewrite_is_split_into_bounded_segments(self) -> None:
+        texts = [str(n) for n in range(120)]
+
+        plan = plan_segmented_write("conv-1", _session(*texts), None)
+
+        assert [len(segment["messages"]) for segment in plan.segments] == [50, 50, 20]
+        assert _roundtrip(plan) == _session(*texts)
+
+    def test_session_without_messages_is_stored_in_the_head(self) -> None:
+        plan = plan_segmented_write("conv-1", {"state": {}}, None)
+
+        assert plan.segments == []
+        assert _roundtrip(plan) == {"state": {}}
+
+    def test_input_session_is_not_modified(self) -> None:
+        session = _session("a")
+
+        plan_segmented_write("conv-1", session, None)
+
+        assert session == _session("a")
+
+
+def test_missing_segment_is_an_error() -> None:
+    plan = plan_segmented_write("conv-1", _session("a"), None)
+
+    with pytest.raises(ValueError, match="missing segment"):
+        assemble_session(plan.head, [])
@@ -0,0 +1,145 @@
+"""Tests for write-behind session persistence."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from agent.session_write_behind import WriteBehindSessionRepository
+
+
+class _SlowRepository:
+    """Inner repository whose writes block until released."""
+
+    def __init__(self) -> None:
+        self.stored: dict[str, dict] = {}
+        self.writes: list[tuple[str, dict]] = []
+        self.release = asyncio.Event()
+        self.failures = 0
+
+    async def read_from_storage(self, conversation_id):
+        return self.stored.get(conversation_id)
+
+    async def write_to_storage(self, conversation_id, serialized_session):
+        await self.release.wait()
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("Cosmos unavailable")
+        self.writes.append((conversation_id, serialized_session))
+        self.stored[conversation_id] = serialized_session
+
+
+@pytest.fixture
+def inner() -> _SlowRepository:
+    return _SlowRepository()
+
+
+@pytest.mark.asyncio
+async def test_write_returns_before_the_inner_write(inner) -> None:
+    repo = WriteBehindSessionRepository(inner)
+
+    await repo.write_to_storage("conv-1", {"turn": 1})
+
+    assert inner.writes == []
+    assert await repo.read_from_storage("conv-1") == {"turn": 1}
+    inner.release.set()
+    assert await repo.flush()
+    assert inner.writes == [("conv-1", {"turn": 1})]
+    assert repo.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_queued_writes_of_one_thread_are_coalesced(inner) -> None:
+    repo = WriteBehindSessionRepository(inner)
+
+    await repo.write_to_storage("conv-1", {"turn": 1})
+    await asyncio.sleep(0)  # first write is now in flight
+    await repo.write_to_storage("conv-1", {"turn": 2})
+    await repo.write_to_storage("conv-1", {"turn": 3})
+    assert await repo.read_from_storage("conv-1") == {"turn": 3}
+
+    inner.release.set()
+    await repo.flush()
+
+    assert inner.writes == [("conv-1", {"turn": 1}), ("conv-1", {"turn": 3})]
+
+
+@pytest.mark.asyncio
+async def test_reads_are_copies_of_the_queued_state(inner) -> None:
+    repo = WriteBehindSessionRepository(inner)
+    await repo.write_to_storage("conv-1", {"messages": []})
+
+    (await repo.read_from_storage("conv-1"))["messages"].append("mutated")
+
+    assert await repo.read_from_storage("conv-1") == {"messages": []}
+
+
+@pytest.mark.asyncio
+async def test_full_backlog_writes_inline(inner) -> None:
+    repo = WriteBehindSessionRepository(inner, max_pending=1)
+    await repo.write_to_storage("conv-1", {"turn": 1})
+
+    inline = asyncio.create_task(repo.write_to_storage("conv-2", {"turn": 1}))
+    await asyncio.sleep(0)
+    assert not inline.done()
+    inner.release.set()
+    await inline
+
+    assert ("conv-2", {"turn": 1}) in inner.writes
+    assert repo.pending <= 1
+
+
+@pytest.mark.asyncio
+async def test_failed_writes_are_retried(inner) -> None:
+    repo = WriteBehindSessionRepository(inner, retry_delay_seconds=0)
+    inner.failures = 1
+    inner.release.set()
+
+    await repo.write_to_storage("conv-1", {"turn": 1})
+    await repo.flush()
+
+    assert inner.writes == [("conv-1", {"turn": 1})]
+
+
+@pytest.mark.asyncio
+async def test_write_is_dropped_after_max_attempts(inner) -> None:
+    repo = WriteBehindSessionRepository(inner, max_attempts=2, retry_delay_seconds=0)
+    inner.failures = 2
+    inner.release.set()
+
+    await repo.write_to_storage("conv-1", {"turn": 1})
+    await repo.flush()
+
+    assert inner.writes == []
+    assert repo.pending == 0
+    assert await repo.read_from_storage("conv-1") is None
+
+
+@pytest.mark.asyncio
+async def test_flush_times_out(inner) -> None:
+    repo = WriteBehindSessionRepository(inner)
+    await repo.write_to_storage("conv-1", {"turn": 1})
+
+    assert await repo.flush(timeout_seconds=0.01) is False
+
+    inner.release.set()
+    assert await repo.flush()
+
+
+@pytest.mark.asyncio
+async def test_session_round_trips_through_get_and_set(inner) -> None:
+    from agent_framework import AgentSession
+
+    repo = WriteBehindSessionRepository(inner)
+    session = AgentSession(session_id="s-1")
+    session.state["counter"] = 1
+
+    await repo.set("conv-1", session)
+    session.state["counter"] = 2
+
+    restored = await repo.get("conv-1")
+    assert restored.session_id == "s-1"
+    assert restored.state["counter"] == 1
+    inner.release.set()
+    await repo.flush()
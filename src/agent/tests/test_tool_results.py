@@ -0,0 +1,179 @@
+"""Tests for the shared tool-result parse cache."""
+
+from __future__ import annotations
+
+import json
+from unittest.mock import patch
+
+import pytest
+from agent_framework import Content, Message
+
+from agent import tool_results
+from agent.tool_results import (
+    SearchToolResult,
+    clear_tool_result_cache,
+    parse_tool_result,
+    render_tool_result,
+    search_result_items,
+)
+
+
+@pytest.fixture(autouse=True)
+def _empty_cache():
+    clear_tool_result_cache()
+    yield
+    clear_tool_result_cache()
+
+
+def _search_result(article_id: str) -> str:
+    return json.dumps(
+        {
+            "results": [
+                {
+                    "ref_number": 1,
+                    "article_id": article_id,
+                    "chunk_index": 0,
+                    "title": "Doc",
+                    "content": "body",
+                    "images": [{"url": f"/api/images/{article_id}/images/a.png"}],
+                }
+            ]
+        }
+    )
+
+
+class TestParseToolResult:
+    def test_same_result_string_is_decoded_once(self) -> None:
+        result = _search_result("art")
+
+        with patch.object(tool_results.json, "loads", wraps=json.loads) as loads:
+            first = parse_tool_result(result)
+            second = parse_tool_result(result)
+
+        assert first is second
+        loads.assert_called_once()
+
+    def test_equal_text_in_a_different_string_is_decoded_again(self) -> None:
+        result = _search_result("art")
+        copy = "".join(list(result))
+
+        with patch.object(tool_results.json, "loads", wraps=json.loads) as loads:
+            parse_tool_result(result)
+            assert parse_tool_result(copy) == parse_tool_result(result)
+
+        assert loads.call_count == 2
+
+    def test_non_json_and_none_yield_none(self) -> None:
+        assert parse_tool_result("plain text") is None
+        assert parse_tool_result(None) is None
+
+    def test_memo_is_bounded(self, monkeypatch) -> None:
+        monkeypatch.setattr(tool_results, "_MAX_ENTRIES", 2)
+        results = [_search_result(str(index)) for index in range(3)]
+        for result in results:
+            parse_tool_result(result)
+
+        assert len(tool_results._memo) == 2
+        assert id(results[0]) not in tool_results._memo
+
+    def test_search_result_items_accepts_legacy_lists(self) -> None:
+        legacy = Content.from_function_result(call_id="c1", result='[{"title": "a"}, 3]')
+        malformed = Content.from_function_result(call_id="c2", result='{"results": "nope"}')
+
+        assert search_result_items(legacy) == [{"title": "a"}]
+        assert search_result_items(malformed) == []
+
+
+class TestSearchToolResult:
+    def test_text_is_rendered_once_and_matches_payload(self) -> None:
+        payload = SearchToolResult(results=[{"ref_number": 1, "title": "Café"}], summary="1 results covering: Café")
+
+        with patch.object(tool_results.json, "dumps", wraps=json.dumps) as dumps:
+            assert payload.text is payload.text
+
+        dumps.assert_called_once()
+        assert json.loads(payload.text) == payload.to_dict()
+        assert "Café" in payload.text
+        assert SearchToolResult.failure("boom").to_dict() == {"error": "boom"}
+
+    def test_rendered_function_result_exposes_rows_without_parsing(self) -> None:
+        payload = SearchToolResult(results=[{"ref_number": 1, "title": "Doc"}])
+        content = Content.from_function_result(call_id="call_1", result=render_tool_result(payload))
+
+        with patch.object(tool_results.json, "loads") as loads:
+            assert search_result_items(content) is payload.results
+
+        loads.assert_not_called()
+        assert content.result == payload.text
+        assert "raw_representation" not in json.dumps(content.to_dict())
+
+    def test_other_return_values_use_the_default_parser(self) -> None:
+        assert render_tool_result("plain")[0].text == "plain"
+
+
+class TestSharedAcrossConsumers:
+    def test_middleware_and_compaction_decode_each_result_once(self) -> None:
+        from agent.grounding_middleware import _latest_search_results
+        from agent.search_result_store import compact_serialized_session_for_storage
+        from agent.vision_middleware import _collect_image_keys, _function_results
+
+        messages = [
+            Message(role="user", contents=["question"]),
+            Message(
+                role="tool",
+                contents=[Content.from_function_result(call_id="call_1", result=_search_result("art"))],
+            ),
+        ]
+
+        with patch.object(tool_results.json, "loads", wraps=json.loads) as loads:
+            for _turn in range(3):
+                assert _collect_image_keys(_function_results(messages)) == [("art", "images/a.png")]
+                assert _latest_search_results(messages)[0]["article_id"] == "art"
+            serialized = {"messages": [message.to_dict() for message in messages]}
+            compact_serialized_session_for_storage(serialized)
+
+        loads.assert_called_once()
+        assert json.loads(serialized["messages"][1]["contents"][0]["result"])["results"][0]["content_source"] == "summary"
+
+
+class TestIncrementalCompaction:
+    @staticmethod
+    def _serialized(*article_ids: str) -> dict:
+        messages = [
+            Message(role="tool", contents=[Content.from_function_result(call_id=f"call_{n}", result=_search_result(a))])
+            for n, a in enumerate(article_ids)
+        ]
+        return {"messages": [message.to_dict() for message in messages]}
+
+    def test_compacted_messages_are_skipped_without_parsing(self) -> None:
+        from agent.search_result_store import compact_serialized_session_for_storage
+
+        stored = compact_serialized_session_for_storage(self._serialized("a", "b"))
+        restored = json.loads(json.dumps(stored))
+        restored["messages"].extend(self._serialized("c")["messages"])
+        clear_tool_result_cache()
+
+        with patch.object(tool_results.json, "loads", wraps=json.loads) as loads:
+            compacted = compact_serialized_session_for_storage(restored)
+
+        loads.assert_called_once()
+        assert compacted["messages"][:2] == stored["messages"]
+        assert compacted["messages"][2]["contents"][0]["result"].startswith('{"compacted": 1,')
+
+    def test_items_are_compacted_with_the_result(self) -> None:
+        from agent.search_result_store import compact_serialized_session_for_storage
+
+        content = compact_serialized_session_for_storage(self._serialized("a"))["messages"][0]["contents"][0]
+
+        assert [item["text"] for item in content["items"]] == [content["result"]]
+        assert json.loads(content["items"][0]["text"])["results"][0]["content_source"] == "summary"
+
+    def test_compacted_dict_payloads_are_left_alone(self) -> None:
+        from agent.search_result_store import compact_serialized_session_for_storage
+
+        payload = {"compacted": 1, "results": [{"ref_number": 1, "content": "kept as stored"}]}
+        session = {"messages": [{"role": "tool", "toolCallId": "call_1", "content": payload}]}
+
+        compact_serialized_session_for_storage(session)
+
+        assert session["messages"][0]["content"] is payload
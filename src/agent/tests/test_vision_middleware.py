@@ -10,13 +10,23 @@ Verifies that the vision middleware correctly:
 
 from __future__ import annotations
 
+import asyncio
 import json
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from agent_framework import Content, Message
 
 from agent.image_service import ImageBlob
-from agent.vision_middleware import MAX_VISION_IMAGES, VisionImageMiddleware
+from agent.vision_middleware import MAX_VISION_IMAGES, VisionImageMiddleware, _injected
+from middleware.request_context import thread_id_var
+
+
+@pytest.fixture(autouse=True)
+def _reset_injected() -> None:
+    """Tool-call ids repeat across tests; start each one with an empty map."""
+    _injected.clear()
 
 
 # ---------------------------------------------------------------------------
@@ -73,7 +83,7 @@ class TestVisionMiddlewareProcess:
     """Test VisionImageMiddleware.process() with new Content/Message API."""
 
     @pytest.mark.asyncio
-    @patch("agent.vision_middleware.download_image")
+    @patch("agent.vision_middleware.download_image_async")
     async def test_injects_images_into_context(self, mock_download: MagicMock) -> None:
         """Images from search results are downloaded and appended as a user message."""
         mock_download.return_value = ImageBlob(
@@ -101,7 +111,7 @@ class TestVisionMiddlewareProcess:
         next_fn.assert_awaited_once_with()
 
     @pytest.mark.asyncio
-    @patch("agent.vision_middleware.download_image")
+    @patch("agent.vision_middleware.download_image_async")
     async def test_no_images_no_injection(self, mock_download: MagicMock) -> None:
         """When no images in results, no extra message is appended."""
         result_json = _search_result_json(images=[])
@@ -118,7 +128,7 @@ class TestVisionMiddlewareProcess:
         next_fn.assert_awaited_once_with()
 
     @pytest.mark.asyncio
-    @patch("agent.vision_middleware.download_image")
+    @patch("agent.vision_middleware.download_image_async")
     async def test_deduplicates_images(self, mock_download: MagicMock) -> None:
         """Same image URL appearing twice should only be downloaded once."""
         mock_download.return_value = ImageBlob(data=b"img", content_type="image/png")
@@ -138,7 +148,7 @@ class TestVisionMiddlewareProcess:
         mock_download.assert_called_once_with("art", "images/fig.png")
 
     @pytest.mark.asyncio
-    @patch("agent.vision_middleware.download_image")
+    @patch("agent.vision_middleware.download_image_async")
     async def test_respects_max_images_cap(self, mock_download: MagicMock) -> None:
         """No more than MAX_VISION_IMAGES should be injected."""
         mock_download.return_value = ImageBlob(data=b"x", content_type="image/jpeg")
@@ -160,9 +170,9 @@ class TestVisionMiddlewareProcess:
         assert len(appended_msg.contents) == 1 + MAX_VISION_IMAGES
 
     @pytest.mark.asyncio
-    @patch("agent.vision_middleware.download_image")
+    @patch("agent.vision_middleware.download_image_async")
     async def test_skips_failed_downloads(self, mock_download: MagicMock) -> None:
-        """If download_image returns None, that image is skipped."""
+        """If download_image_async returns None, that image is skipped."""
         mock_download.return_value = None
 
         result_json = _search_result_json(
@@ -179,7 +189,7 @@ class TestVisionMiddlewareProcess:
         assert len(context.messages) == 1
 
     @pytest.mark.asyncio
-    @patch("agent.vision_middleware.download_image")
+    @patch("agent.vision_middleware.download_image_async")
     async def test_handles_malformed_json_result(self, mock_download: MagicMock) -> None:
         """Malformed JSON tool results should be skipped gracefully."""
         content = _make_function_result_content("not valid json {{{")
@@ -194,7 +204,7 @@ class TestVisionMiddlewareProcess:
         mock_download.assert_not_called()
 
     @pytest.mark.asyncio
-    @patch("agent.vision_middleware.download_image")
+    @patch("agent.vision_middleware.download_image_async")
     async def test_handles_non_list_result(self, mock_download: MagicMock) -> None:
         """Non-list JSON results (e.g. error dict) should be skipped."""
         content = _make_function_result_content('{"error": "Search failed."}')
@@ -208,7 +218,7 @@ class TestVisionMiddlewareProcess:
         assert len(context.messages) == 1
 
     @pytest.mark.asyncio
-    @patch("agent.vision_middleware.download_image")
+    @patch("agent.vision_middleware.download_image_async")
     async def test_handles_legacy_list_result(self, mock_download: MagicMock) -> None:
         """Legacy list-shaped tool results remain supported."""
         mock_download.return_value = ImageBlob(data=b"img", content_type="image/png")
@@ -235,7 +245,7 @@ class TestVisionMiddlewareProcess:
         mock_download.assert_called_once_with("legacy-article", "images/fig.png")
 
     @pytest.mark.asyncio
-    @patch("agent.vision_middleware.download_image")
+    @patch("agent.vision_middleware.download_image_async")
     async def test_skips_non_function_result_content(self, mock_download: MagicMock) -> None:
         """Non function_result content types should be ignored."""
         context = MagicMock()
@@ -249,7 +259,7 @@ class TestVisionMiddlewareProcess:
         mock_download.assert_not_called()
 
     @pytest.mark.asyncio
-    @patch("agent.vision_middleware.download_image")
+    @patch("agent.vision_middleware.download_image_async")
     async def test_skips_urls_without_api_images(self, mock_download: MagicMock) -> None:
         """URLs not containing /api/images/ should be ignored."""
         result_json = _search_result_json(
@@ -266,7 +276,7 @@ class TestVisionMiddlewareProcess:
         mock_download.assert_not_called()
 
     @pytest.mark.asyncio
-    @patch("agent.vision_middleware.download_image")
+    @patch("agent.vision_middleware.download_image_async")
     async def test_handles_null_function_result(self, mock_download: MagicMock) -> None:
         """Content with result=None should be skipped."""
         content = MagicMock()
@@ -283,7 +293,7 @@ class TestVisionMiddlewareProcess:
         assert len(context.messages) == 1
 
     @pytest.mark.asyncio
-    @patch("agent.vision_middleware.download_image")
+    @patch("agent.vision_middleware.download_image_async")
     async def test_calls_next_always(self, mock_download: MagicMock) -> None:
         """next() is always called regardless of whether images were injected."""
         context = MagicMock()
@@ -305,7 +315,7 @@ class TestVisionMiddlewareContentAPI:
     """Verify the middleware uses the rc3 Content/Message API correctly."""
 
     @pytest.mark.asyncio
-    @patch("agent.vision_middleware.download_image")
+    @patch("agent.vision_middleware.download_image_async")
     async def test_appended_message_uses_content_from_text(self, mock_download: MagicMock) -> None:
         """The text instruction uses Content.from_text()."""
         from agent_framework import Content
@@ -328,7 +338,7 @@ class TestVisionMiddlewareContentAPI:
         assert isinstance(text_content, Content)
 
     @pytest.mark.asyncio
-    @patch("agent.vision_middleware.download_image")
+    @patch("agent.vision_middleware.download_image_async")
     async def test_appended_message_uses_content_from_data(self, mock_download: MagicMock) -> None:
         """Image items use Content.from_data() with correct media_type."""
         from agent_framework import Content
@@ -353,7 +363,7 @@ class TestVisionMiddlewareContentAPI:
         assert isinstance(image_content, Content)
 
     @pytest.mark.asyncio
-    @patch("agent.vision_middleware.download_image")
+    @patch("agent.vision_middleware.download_image_async")
     async def test_appended_message_is_framework_message(self, mock_download: MagicMock) -> None:
         """The injected message is a framework Message, not a mock."""
         from agent_framework import Message
@@ -373,3 +383,238 @@ class TestVisionMiddlewareContentAPI:
         appended_msg = context.messages[1]
         assert isinstance(appended_msg, Message)
         assert appended_msg.role == "user"
+
+
+class TestConcurrentImageDownloads:
+    """Downloads run concurrently, capped and bounded by a deadline."""
+
+    @staticmethod
+    def _context(names: list[str]) -> MagicMock:
+        images = [{"name": name, "url": f"/api/images/art/images/{name}"} for name in names]
+        context = MagicMock()
+        context.messages = [_make_message([_make_function_result_content(_search_result_json(images=images))])]
+        return context
+
+    @staticmethod
+    def _config(monkeypatch, *, concurrency: int = 4, deadline_ms: int = 0) -> None:
+        monkeypatch.setattr(
+            "agent.vision_middleware.config",
+            SimpleNamespace(
+                vision_download_concurrency=concurrency,
+                vision_download_deadline_ms=deadline_ms,
+                vision_reattach_policy="latest",
+            ),
+        )
+
+    @pytest.mark.asyncio
+    async def test_order_follows_results_not_completion(self, monkeypatch) -> None:
+        self._config(monkeypatch)
+        delays = {"a.png": 0.03, "b.png": 0.0, "c.png": 0.01}
+
+        async def download(article_id: str, image_path: str) -> ImageBlob:
+            name = image_path.rsplit("/", 1)[1]
+            await asyncio.sleep(delays[name])
+            return ImageBlob(data=name.encode(), content_type="image/png")
+
+        monkeypatch.setattr("agent.vision_middleware.download_image_async", download)
+        context = self._context(["a.png", "b.png", "c.png"])
+
+        await VisionImageMiddleware().process(context, AsyncMock())
+
+        images = context.messages[1].contents[1:]
+        assert [image.uri for image in images] == [
+            Content.from_data(data=name, media_type="image/png").uri for name in (b"a.png", b"b.png", b"c.png")
+        ]
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_capped(self, monkeypatch) -> None:
+        self._config(monkeypatch, concurrency=2)
+        in_flight = 0
+        peak = 0
+
+        async def download(article_id: str, image_path: str) -> ImageBlob:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return ImageBlob(data=b"x", content_type="image/png")
+
+        monkeypatch.setattr("agent.vision_middleware.download_image_async", download)
+        context = self._context([f"{i}.png" for i in range(MAX_VISION_IMAGES)])
+
+        await VisionImageMiddleware().process(context, AsyncMock())
+
+        assert peak == 2
+        assert len(context.messages[1].contents) == 1 + MAX_VISION_IMAGES
+
+    @pytest.mark.asyncio
+    async def test_images_missing_the_deadline_are_dropped(self, monkeypatch) -> None:
+        self._config(monkeypatch, deadline_ms=50)
+
+        async def download(article_id: str, image_path: str) -> ImageBlob:
+            if image_path.endswith("slow.png"):
+                await asyncio.sleep(5)
+            return ImageBlob(data=b"x", content_type="image/png")
+
+        monkeypatch.setattr("agent.vision_middleware.download_image_async", download)
+        context = self._context(["fast.png", "slow.png"])
+        next_fn = AsyncMock()
+
+        await VisionImageMiddleware().process(context, next_fn)
+
+        assert len(context.messages[1].contents) == 2
+        next_fn.assert_awaited_once_with()
+
+    @pytest.mark.asyncio
+    async def test_failed_downloads_are_backfilled_by_later_candidates(self, monkeypatch) -> None:
+        self._config(monkeypatch)
+        requested: list[str] = []
+
+        async def download(article_id: str, image_path: str) -> ImageBlob | None:
+            requested.append(image_path)
+            if image_path.endswith("broken.png"):
+                return None
+            return ImageBlob(data=b"x", content_type="image/png")
+
+        monkeypatch.setattr("agent.vision_middleware.download_image_async", download)
+        names = ["broken.png", *[f"{i}.png" for i in range(MAX_VISION_IMAGES + 2)]]
+        context = self._context(names)
+
+        await VisionImageMiddleware().process(context, AsyncMock())
+
+        assert len(context.messages[1].contents) == 1 + MAX_VISION_IMAGES
+        assert len(requested) == MAX_VISION_IMAGES + 1
+
+
+class TestIncrementalInjection:
+    """Each tool result's images are attached once, then per the re-attach policy."""
+
+    @staticmethod
+    def _tool_message(call_id: str, name: str) -> Message:
+        images = [{"name": name, "url": f"/api/images/art/images/{name}"}]
+        return Message(
+            role="tool",
+            contents=[Content.from_function_result(call_id=call_id, result=_search_result_json(images=images))],
+        )
+
+    @staticmethod
+    def _middleware(monkeypatch, policy: str) -> tuple[VisionImageMiddleware, AsyncMock]:
+        monkeypatch.setattr(
+            "agent.vision_middleware.config",
+            SimpleNamespace(
+                vision_download_concurrency=4,
+                vision_download_deadline_ms=0,
+                vision_reattach_policy=policy,
+            ),
+        )
+        download = AsyncMock(return_value=ImageBlob(data=b"img", content_type="image/png"))
+        monkeypatch.setattr("agent.vision_middleware.download_image_async", download)
+        return VisionImageMiddleware(), download
+
+    @staticmethod
+    async def _call(middleware: VisionImageMiddleware, messages: list[Message]) -> int:
+        """Run one LLM call and return the number of images attached."""
+        context = SimpleNamespace(messages=list(messages))
+        await middleware.process(context, AsyncMock())
+        if len(context.messages) == len(messages):
+            return 0
+        return len(context.messages[-1].contents) - 1
+
+    @pytest.mark.asyncio
+    async def test_images_are_attached_once_per_tool_result(self, monkeypatch) -> None:
+        middleware, download = self._middleware(monkeypatch, "none")
+        history = [Message(role="user", contents=["show me"]), self._tool_message("call_1", "a.png")]
+
+        assert await self._call(middleware, history) == 1
+        history.append(self._tool_message("call_2", "b.png"))
+        assert await self._call(middleware, history) == 1
+        assert await self._call(middleware, history) == 0
+
+        assert [call.args for call in download.await_args_list] == [
+            ("art", "images/a.png"),
+            ("art", "images/b.png"),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_images_are_not_reattached_by_a_new_middleware_instance(self, monkeypatch) -> None:
+        # create_agent builds a new middleware for every AG-UI request.
+        first, download = self._middleware(monkeypatch, "none")
+        history = [Message(role="user", contents=["show me"]), self._tool_message("call_1", "a.png")]
+        assert await self._call(first, history) == 1
+
+        history.append(Message(role="user", contents=["and now?"]))
+
+        assert await self._call(VisionImageMiddleware(), history) == 0
+        assert download.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_latest_policy_reattaches_newest_images_on_follow_up_turn(self, monkeypatch) -> None:
+        middleware, download = self._middleware(monkeypatch, "latest")
+        history = [
+            Message(role="user", contents=["show me"]),
+            self._tool_message("call_1", "a.png"),
+            self._tool_message("call_2", "b.png"),
+        ]
+        assert await self._call(middleware, history) == 2
+
+        history.append(Message(role="user", contents=["what does the diagram show?"]))
+
+        assert await self._call(middleware, history) == 1
+        assert download.await_args.args == ("art", "images/b.png")
+
+    @pytest.mark.asyncio
+    async def test_none_policy_does_not_reattach_on_follow_up_turn(self, monkeypatch) -> None:
+        middleware, _download = self._middleware(monkeypatch, "none")
+        history = [Message(role="user", contents=["show me"]), self._tool_message("call_1", "a.png")]
+        await self._call(middleware, history)
+
+        history.append(Message(role="user", contents=["and now?"]))
+
+        assert await self._call(middleware, history) == 0
+
+    @pytest.mark.asyncio
+    async def test_all_policy_attaches_every_image_on_every_call(self, monkeypatch) -> None:
+        middleware, _download = self._middleware(monkeypatch, "all")
+        history = [Message(role="user", contents=["show me"]), self._tool_message("call_1", "a.png")]
+
+        assert await self._call(middleware, history) == 1
+        assert await self._call(middleware, history) == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_downloads_are_retried_on_the_next_call(self, monkeypatch) -> None:
+        middleware, download = self._middleware(monkeypatch, "none")
+        download.side_effect = [None, ImageBlob(data=b"img", content_type="image/png")]
+        history = [Message(role="user", contents=["show me"]), self._tool_message("call_1", "a.png")]
+
+        assert await self._call(middleware, history) == 0
+        assert await self._call(middleware, history) == 1
+
+    @pytest.mark.asyncio
+    async def test_call_ids_are_scoped_by_thread(self, monkeypatch) -> None:
+        middleware, download = self._middleware(monkeypatch, "none")
+        history = [Message(role="user", contents=["show me"]), self._tool_message("call_1", "a.png")]
+
+        token = thread_id_var.set("thread-a")
+        try:
+            assert await self._call(middleware, history) == 1
+        finally:
+            thread_id_var.reset(token)
+        token = thread_id_var.set("thread-b")
+        try:
+            assert await self._call(middleware, history) == 1
+        finally:
+            thread_id_var.reset(token)
+
+        assert download.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_llm_call_leaves_images_for_the_retry(self, monkeypatch) -> None:
+        middleware, _download = self._middleware(monkeypatch, "none")
+        history = [Message(role="user", contents=["show me"]), self._tool_message("call_1", "a.png")]
+
+        context = SimpleNamespace(messages=list(history))
+        with pytest.raises(RuntimeError):
+            await middleware.process(context, AsyncMock(side_effect=RuntimeError("model unavailable")))
+
+        assert await self._call(middleware, history) == 1
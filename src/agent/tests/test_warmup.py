@@ -0,0 +1,147 @@
+"""Tests for the startup warm-up and readiness gating."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+
+def _server() -> SimpleNamespace:
+    server = SimpleNamespace()
+
+    async def agent_readiness(request):
+        return {"status": "ready"}
+
+    async def readiness_endpoint(request):
+        from azure.ai.agentserver.core.server.base import _to_response
+
+        return _to_response(await server.agent_readiness(request))
+
+    server.agent_readiness = agent_readiness
+    server.app = Starlette(routes=[Route("/readiness", readiness_endpoint)])
+    return server
+
+
+class TestWarmUp:
+    @pytest.mark.asyncio
+    async def test_failures_and_timeouts_are_reported_not_raised(self, caplog) -> None:
+        from agent.warmup import warm_up
+
+        async def ok() -> None:
+            return None
+
+        async def broken() -> None:
+            raise ConnectionError("search unreachable")
+
+        async def slow() -> None:
+            await asyncio.sleep(10)
+
+        results = await warm_up({"ok": ok, "broken": broken, "slow": slow}, timeout_seconds=0.05)
+
+        assert results == {"ok": True, "broken": False, "slow": False}
+        errors = [record.getMessage() for record in caplog.records if record.levelname == "ERROR"]
+        assert any("'broken' failed" in message for message in errors)
+        assert any("failed: broken, slow" in message for message in errors)
+
+    def test_steps_skip_tokens_in_dev_and_search_for_local_backend(self, monkeypatch) -> None:
+        from agent import warmup
+
+        monkeypatch.setattr(
+            warmup,
+            "config",
+            SimpleNamespace(
+                is_dev=True,
+                search_backend="local",
+                serving_blob_endpoint="",
+                azurite_connection_string="",
+            ),
+        )
+        repository = SimpleNamespace(warm_up=AsyncMock())
+
+        steps = warmup.warmup_steps(repository)
+
+        assert list(steps) == ["embeddings", "chat", "cosmos"]
+        assert steps["cosmos"] is repository.warm_up
+
+
+class TestInstallWarmup:
+    def test_readiness_is_503_until_warm_up_finishes(self, monkeypatch) -> None:
+        from agent import warmup
+
+        release = threading.Event()
+
+        async def blocked() -> None:
+            await asyncio.to_thread(release.wait, 5)
+
+        close_transports = AsyncMock()
+        monkeypatch.setattr(warmup, "warmup_steps", lambda repository: {"blocked": blocked})
+        monkeypatch.setattr(warmup, "close_shared_transports", close_transports)
+        monkeypatch.setattr(
+            warmup,
+            "config",
+            SimpleNamespace(startup_warmup=True, startup_warmup_timeout_seconds=5),
+        )
+        server = _server()
+        state = warmup.install_warmup(server)
+
+        with TestClient(server.app) as client:
+            warming = client.get("/readiness")
+            release.set()
+            deadline = time.monotonic() + 5
+            while not state.ready and time.monotonic() < deadline:
+                time.sleep(0.01)
+            ready = client.get("/readiness")
+
+        assert warming.status_code == 503
+        assert warming.json() == {"status": "warming_up"}
+        assert ready.status_code == 200
+        assert ready.json() == {"status": "ready"}
+        close_transports.assert_awaited_once()
+
+    def test_disabled_warm_up_is_ready_immediately(self, monkeypatch) -> None:
+        from agent import warmup
+
+        steps = AsyncMock()
+        monkeypatch.setattr(warmup, "warmup_steps", steps)
+        monkeypatch.setattr(warmup, "close_shared_transports", AsyncMock())
+        monkeypatch.setattr(
+            warmup,
+            "config",
+            SimpleNamespace(startup_warmup=False, startup_warmup_timeout_seconds=5),
+        )
+        server = _server()
+        warmup.install_warmup(server)
+
+        with TestClient(server.app) as client:
+            assert client.get("/readiness").status_code == 200
+
+        steps.assert_not_called()
+
+    def test_shutdown_flushes_session_writes_before_closing_transports(self, monkeypatch) -> None:
+        from agent import warmup
+
+        calls: list[str] = []
+        repository = SimpleNamespace(flush=AsyncMock(side_effect=lambda: calls.append("flush")))
+        monkeypatch.setattr(
+            warmup, "close_shared_transports", AsyncMock(side_effect=lambda: calls.append("close"))
+        )
+        monkeypatch.setattr(
+            warmup,
+            "config",
+            SimpleNamespace(startup_warmup=False, startup_warmup_timeout_seconds=5),
+        )
+        server = _server()
+        warmup.install_warmup(server, session_repository=repository)
+
+        with TestClient(server.app):
+            pass
+
+        assert calls == ["flush", "close"]
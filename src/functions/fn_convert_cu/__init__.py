@@ -8,7 +8,8 @@ Steps:
     1b. Parse HTML DOM → image map + link map
     2.  Send each image to CU ``kb_image_analyzer`` → descriptions
     3.  Merge: recover hyperlinks, insert image blocks at correct positions
-    4.  Write ``article.md`` + copy images as PNGs to the output directory
+    4.  Write ``article.md`` + copy images as PNGs to the output directory,
+        plus resized WebP copies under ``vision/`` for the agent
 """
 
 from __future__ import annotations
@@ -18,6 +19,7 @@ import shutil
 from pathlib import Path
 
 from fn_convert_cu import cu_images, cu_text, html_parser, merge
+from shared.vision_images import write_vision_derivatives
 
 logger = logging.getLogger(__name__)
 
@@ -143,7 +145,7 @@ def _write_outputs(
     markdown: str,
     image_paths: list[Path],
 ) -> None:
-    """Write ``article.md`` and copy images as PNGs."""
+    """Write ``article.md``, copy images as PNGs and write vision derivatives."""
     output_dir.mkdir(parents=True, exist_ok=True)
     images_dir = output_dir / "images"
     images_dir.mkdir(exist_ok=True)
@@ -157,3 +159,5 @@ def _write_outputs(
         dest = images_dir / f"{img_path.stem}.png"
         shutil.copy2(img_path, dest)
         logger.debug("Copied %s → %s", img_path.name, dest.name)
+
+    write_vision_derivatives(output_dir)
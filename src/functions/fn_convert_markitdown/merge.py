@@ -15,6 +15,8 @@ import re
 import shutil
 from pathlib import Path
 
+from shared.vision_images import write_vision_derivatives
+
 logger = logging.getLogger(__name__)
 
 # Regex for MarkItDown image references: [![alt text](images/stem.ext)](images/stem.ext)
@@ -81,8 +83,8 @@ def merge_article(
     """Merge MarkItDown markdown with image descriptions and produce the final article.
 
     Replaces ``[![alt](images/stem.ext)](images/stem.ext)`` patterns with
-    styled image description blocks, copies source images to the output
-    directory, and writes the final ``article.md``.
+    styled image description blocks, copies source images (plus vision
+    derivatives) to the output directory, and writes the final ``article.md``.
 
     Args:
         markdown: Raw MarkItDown markdown text.
@@ -128,6 +130,8 @@ def merge_article(
         else:
             logger.warning("Source image not found for stem: %s", stem)
 
+    write_vision_derivatives(output_dir)
+
     # Write final article
     (output_dir / "article.md").write_text(article, encoding="utf-8")
     logger.info("Article written: %s (%d chars)", output_dir / "article.md", len(article))
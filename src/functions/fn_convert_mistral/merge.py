@@ -12,6 +12,8 @@ import re
 import shutil
 from pathlib import Path
 
+from shared.vision_images import write_vision_derivatives
+
 logger = logging.getLogger(__name__)
 
 # Regex to extract structured sections from GPT image descriptions.
@@ -168,8 +170,9 @@ def merge_article(
     """Merge OCR markdown with image descriptions and produce the final article.
 
     Replaces ``[[IMG:<filename>]]`` markers with styled image blocks,
-    recovers hyperlinks from the source HTML, copies source images to the
-    output directory, and writes the final ``article.md``.
+    recovers hyperlinks from the source HTML, copies source images (plus
+    vision derivatives) to the output directory, and writes the final
+    ``article.md``.
 
     Args:
         ocr_markdown: Raw OCR markdown text with ``[[IMG:...]]`` markers.
@@ -216,6 +219,8 @@ def merge_article(
     if link_map:
         article = recover_links(article, link_map)
 
+    write_vision_derivatives(output_dir)
+
     # Write final article
     (output_dir / "article.md").write_text(article, encoding="utf-8")
     logger.info("Article written: %s (%d chars)", output_dir / "article.md", len(article))
@@ -48,7 +48,10 @@ def ensure_index_exists() -> None:
         pass  # Index doesn't exist, create it
 
     fields = [
-        SimpleField(name="id", type=SearchFieldDataType.String, key=True),
+        # Filterable for the agent's bulk citation lookup (search.in on id),
+        # sortable so its paged chunk-map query has a stable order.
+        # An existing index is left as-is; rebuild it to pick this up.
+        SimpleField(name="id", type=SearchFieldDataType.String, key=True, filterable=True, sortable=True),
         SimpleField(
             name="article_id",
             type=SearchFieldDataType.String,
@@ -98,10 +101,13 @@ def ensure_index_exists() -> None:
             type=SearchFieldDataType.String,
             filterable=False,
         ),
+        # Sortable for the agent's search-cache watermark probe (newest run).
+        # An existing index is left as-is; rebuild it to pick this up.
         SimpleField(
             name="indexed_at",
             type=SearchFieldDataType.String,
             filterable=True,
+            sortable=True,
         ),
     ]
 
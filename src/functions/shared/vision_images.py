@@ -0,0 +1,98 @@
+"""Vision-ready image derivatives written alongside converted articles.
+
+The agent sends article images to the chat model as base64 data URIs on
+every turn.  Original screenshots are often multi-megabyte PNGs, but the
+model's high-detail vision mode downsizes every image to fit within
+2048 × 2048 and then to a 768 px short side — anything larger is payload
+the model never sees.
+
+:func:`write_vision_derivatives` is called by each convert function after
+``images/`` is written.  It stores a resized, recompressed WebP copy of
+every image under ``vision/``::
+
+    images/<stem>.png         original (served to the browser)
+    vision/images/<stem>.webp derivative (served to the model)
+
+The agent's ``download_image_async`` prefers the derivative and falls back
+to the original for articles converted before derivatives existed.
+"""
+
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+
+from PIL import Image, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+VISION_DIR = "vision"
+VISION_SUFFIX = ".webp"
+
+# Azure OpenAI high-detail vision limits: fit within 2048 × 2048, then
+# scale so the short side is at most 768 px.
+MAX_LONG_EDGE = 2048
+MAX_SHORT_EDGE = 768
+WEBP_QUALITY = 80
+
+
+def vision_image_path(image_path: str) -> str:
+    """Return the derivative path for an article-relative image path."""
+    return str(Path(VISION_DIR) / Path(image_path).with_suffix(VISION_SUFFIX))
+
+
+def _target_size(width: int, height: int) -> tuple[int, int]:
+    long_edge, short_edge = max(width, height), min(width, height)
+    scale = min(1.0, MAX_LONG_EDGE / long_edge, MAX_SHORT_EDGE / short_edge)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def write_vision_derivative(source: Path, dest: Path) -> bool:
+    """Write a resized WebP copy of ``source`` to ``dest``.
+
+    Returns ``False`` (and logs) when ``source`` is not a readable image.
+    """
+    try:
+        with Image.open(source) as image:
+            image.load()
+            has_alpha = image.mode in {"RGBA", "LA", "PA"} or "transparency" in image.info
+            image = image.convert("RGBA" if has_alpha else "RGB")
+            size = _target_size(*image.size)
+            if size != image.size:
+                image = image.resize(size, Image.Resampling.LANCZOS)
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            image.save(dest, format="WEBP", quality=WEBP_QUALITY, method=6)
+    except (UnidentifiedImageError, OSError):
+        logger.warning("Skipping vision derivative for unreadable image %s", source.name)
+        return False
+    return True
+
+
+def write_vision_derivatives(output_dir: Path) -> int:
+    """Write derivatives for every image under ``output_dir/images``.
+
+    Returns the number of derivatives written.
+    """
+    images_dir = output_dir / "images"
+    if not images_dir.is_dir():
+        return 0
+
+    written = 0
+    original_bytes = derivative_bytes = 0
+    for source in sorted(images_dir.iterdir()):
+        if not source.is_file():
+            continue
+        dest = output_dir / vision_image_path(str(source.relative_to(output_dir)))
+        if write_vision_derivative(source, dest):
+            written += 1
+            original_bytes += source.stat().st_size
+            derivative_bytes += dest.stat().st_size
+
+    if written:
+        logger.info(
+            "Wrote %d vision derivative(s): %d → %d bytes",
+            written,
+            original_bytes,
+            derivative_bytes,
+        )
+    return written
@@ -0,0 +1,49 @@
+"""Tests for shared.vision_images — vision-ready image derivatives."""
+
+from __future__ import annotations
+
+from PIL import Image
+
+from shared.vision_images import MAX_SHORT_EDGE, vision_image_path, write_vision_derivatives
+
+
+def _write_png(path, size, mode="RGB"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    Image.new(mode, size, color="white" if mode == "RGB" else (255, 255, 255, 0)).save(path)
+
+
+class TestVisionImagePath:
+    def test_derivative_lives_under_vision_prefix_as_webp(self):
+        assert vision_image_path("images/arch.png") == "vision/images/arch.webp"
+
+
+class TestWriteVisionDerivatives:
+    def test_large_screenshot_is_downsized_to_model_limits(self, tmp_path):
+        _write_png(tmp_path / "images" / "screen.png", (3000, 1500))
+
+        assert write_vision_derivatives(tmp_path) == 1
+
+        with Image.open(tmp_path / "vision" / "images" / "screen.webp") as derivative:
+            assert derivative.format == "WEBP"
+            assert derivative.size == (1536, MAX_SHORT_EDGE)
+
+    def test_small_image_keeps_its_size_and_alpha(self, tmp_path):
+        _write_png(tmp_path / "images" / "icon.png", (64, 32), mode="RGBA")
+
+        write_vision_derivatives(tmp_path)
+
+        with Image.open(tmp_path / "vision" / "images" / "icon.webp") as derivative:
+            assert derivative.size == (64, 32)
+            assert derivative.mode == "RGBA"
+
+    def test_unreadable_image_is_skipped(self, tmp_path):
+        (tmp_path / "images").mkdir()
+        (tmp_path / "images" / "broken.png").write_bytes(b"not an image")
+        _write_png(tmp_path / "images" / "ok.png", (10, 10))
+
+        assert write_vision_derivatives(tmp_path) == 1
+        assert not (tmp_path / "vision" / "images" / "broken.webp").exists()
+
+    def test_article_without_images_writes_nothing(self, tmp_path):
+        assert write_vision_derivatives(tmp_path) == 0
+        assert not (tmp_path / "vision").exists()
@@ -1,5 +1,8 @@
+import { gzipSync } from "node:zlib";
+
 import { DELETE, GET as conversationGET, PATCH } from "../../app/api/conversations/[threadId]/route";
 import { GET as citationsGET } from "../../app/api/conversations/[threadId]/citations/[toolCallId]/[refNumber]/route";
+import { GET as toolCallCitationsGET } from "../../app/api/conversations/[threadId]/citations/[toolCallId]/route";
 import { GET as messagesGET } from "../../app/api/conversations/[threadId]/messages/route";
 import { GET as listGET, POST } from "../../app/api/conversations/route";
 import { resetConversationStoreForTests, seedConversationMessagesForTests } from "../../lib/conversations";
@@ -154,6 +157,67 @@ describe("conversation routes", () => {
     expect(forbiddenResponse.status).toBe(404);
   });
 
+  it("reassembles history stored as segments", async () => {
+    const createResponse = await POST(
+      buildRequest("/api/conversations", {
+        method: "POST",
+        body: JSON.stringify({ title: "Segmented thread" }),
+      }),
+    );
+    const created = (await createResponse.json()) as { id: string };
+
+    seedConversationMessagesForTests(
+      created.id,
+      {
+        id: created.id,
+        layout: "segmented",
+        message_path: ["state", "in_memory", "messages"],
+        segments: [{ id: `${created.id}:1:0` }, { id: `${created.id}:1:1` }],
+        session: { state: { in_memory: { messages: [] } } },
+      },
+      [
+        { id: `${created.id}:1:0`, messages: [{ id: "user-1", role: "user", content: "Hello" }] },
+        { id: `${created.id}:1:1`, messages: [{ id: "assistant-1", role: "assistant", content: "Hi" }] },
+      ],
+    );
+
+    const historyResponse = await messagesGET(
+      buildRequest(`/api/conversations/${created.id}/messages`),
+      { params: Promise.resolve({ threadId: created.id }) },
+    );
+    const body = (await historyResponse.json()) as { messages: { id: string; content: string }[] };
+
+    expect(body.messages.map((message) => [message.id, message.content])).toEqual([
+      ["user-1", "Hello"],
+      ["assistant-1", "Hi"],
+    ]);
+  });
+
+  it("decodes gzip-compressed session documents", async () => {
+    const createResponse = await POST(
+      buildRequest("/api/conversations", {
+        method: "POST",
+        body: JSON.stringify({ title: "Compressed thread" }),
+      }),
+    );
+    const created = (await createResponse.json()) as { id: string };
+    const session = { state: { messages: [{ id: "user-1", role: "user", content: "Hello" }] } };
+
+    seedConversationMessagesForTests(created.id, {
+      id: created.id,
+      codec: { name: "gzip", version: 1, fields: ["session"] },
+      session: gzipSync(JSON.stringify(session)).toString("base64"),
+    });
+
+    const historyResponse = await messagesGET(
+      buildRequest(`/api/conversations/${created.id}/messages`),
+      { params: Promise.resolve({ threadId: created.id }) },
+    );
+    const body = (await historyResponse.json()) as { messages: { id: string; content: string }[] };
+
+    expect(body.messages.map((message) => [message.id, message.content])).toEqual([["user-1", "Hello"]]);
+  });
+
   it("deletes only the owner record", async () => {
     const createResponse = await POST(
       buildRequest("/api/conversations", {
@@ -223,4 +287,43 @@ describe("conversation routes", () => {
 
     expect(forbiddenResponse.status).toBe(404);
   });
-});
\ No newline at end of file
+
+  it("proxies the bulk citation lookup of a tool call only for the owning user", async () => {
+    const createResponse = await POST(
+      buildRequest("/api/conversations", {
+        method: "POST",
+        body: JSON.stringify({ title: "Citation thread" }),
+      }),
+    );
+    const created = (await createResponse.json()) as { id: string };
+
+    const citations = [
+      { ref_number: 1, status: "ready", citation: { ref_number: 1, chunk_id: "article-1_0", content_source: "full" } },
+      { ref_number: 2, status: "missing" },
+    ];
+    const fetchMock = vi.fn().mockResolvedValue(
+      new Response(JSON.stringify({ citations }), {
+        status: 200,
+        headers: { "Content-Type": "application/json" },
+      }),
+    );
+    vi.stubGlobal("fetch", fetchMock);
+
+    const response = await toolCallCitationsGET(
+      buildRequest(`/api/conversations/${created.id}/citations/tool-call-1`),
+      { params: Promise.resolve({ threadId: created.id, toolCallId: "tool-call-1" }) },
+    );
+
+    expect(response.status).toBe(200);
+    expect(await response.json()).toEqual({ citations });
+    expect(fetchMock).toHaveBeenCalledTimes(1);
+    expect(String(fetchMock.mock.calls[0][0])).toMatch(new RegExp(`/citations/${created.id}/tool-call-1$`));
+
+    const forbiddenResponse = await toolCallCitationsGET(
+      buildRequest(`/api/conversations/${created.id}/citations/tool-call-1`, {}, "user-b"),
+      { params: Promise.resolve({ threadId: created.id, toolCallId: "tool-call-1" }) },
+    );
+
+    expect(forbiddenResponse.status).toBe(404);
+  });
+});
@@ -141,7 +141,7 @@ describe("CitationDialog", () => {
     });
 
     expect(fetchMock).toHaveBeenCalledWith(
-      "/api/conversations/thread-123/citations/tool-call-1/1",
+      "/api/conversations/thread-123/citations/tool-call-1",
       { cache: "no-store" },
     );
     expect(screen.getByText("Loading source excerpt…")).toBeInTheDocument();
@@ -150,13 +150,18 @@ describe("CitationDialog", () => {
       resolveResponse?.(
         new Response(
           JSON.stringify({
-            status: "ready",
-            citation: {
-              ref_number: 1,
-              chunk_id: "article-1_0",
-              content: "Full chunk content loaded on demand.",
-              content_source: "full",
-            },
+            citations: [
+              {
+                ref_number: 1,
+                status: "ready",
+                citation: {
+                  ref_number: 1,
+                  chunk_id: "article-1_0",
+                  content: "Full chunk content loaded on demand.",
+                  content_source: "full",
+                },
+              },
+            ],
           }),
           { status: 200, headers: { "Content-Type": "application/json" } },
         ),
@@ -167,4 +172,66 @@ describe("CitationDialog", () => {
 
     vi.unstubAllGlobals();
   });
+
+  it("enriches every ref of a tool call with one request", async () => {
+    const fetchMock = vi.fn().mockResolvedValue(
+      new Response(
+        JSON.stringify({
+          citations: [1, 2].map((refNumber) => ({
+            ref_number: refNumber,
+            status: "ready",
+            citation: {
+              ref_number: refNumber,
+              chunk_id: `article-1_${refNumber}`,
+              content: `Full content of ref ${refNumber}.`,
+              content_source: "full",
+            },
+          })),
+        }),
+        { status: 200, headers: { "Content-Type": "application/json" } },
+      ),
+    );
+    vi.stubGlobal("fetch", fetchMock);
+    const user = userEvent.setup();
+
+    function OpenSecondRef() {
+      const ctx = useCitationDialog();
+      return (
+        <button onClick={() => ctx.openCitation(citationKey("tool-call-1", 2))} type="button">
+          open ref 2
+        </button>
+      );
+    }
+
+    const summaryCitation = (refNumber: number) => ({
+      ref_number: refNumber,
+      chunk_id: `article-1_${refNumber}`,
+      title: `Guide ${refNumber}`,
+      summary: `Stored summary ${refNumber}.`,
+      content_source: "summary",
+    });
+
+    render(
+      <CitationDialogProvider>
+        <SetupCitation
+          refNumber={1}
+          citation={summaryCitation(1)}
+          threadId="thread-123"
+          toolCallId="tool-call-1"
+          autoOpen
+        />
+        <SetupCitation refNumber={2} citation={summaryCitation(2)} threadId="thread-123" toolCallId="tool-call-1" />
+        <OpenSecondRef />
+        <CitationDialog />
+      </CitationDialogProvider>,
+    );
+
+    expect(await screen.findByText("Full content of ref 1.")).toBeInTheDocument();
+    await user.click(screen.getByRole("button", { name: "open ref 2" }));
+    expect(await screen.findByText("Full content of ref 2.")).toBeInTheDocument();
+
+    expect(fetchMock).toHaveBeenCalledTimes(1);
+
+    vi.unstubAllGlobals();
+  });
 });
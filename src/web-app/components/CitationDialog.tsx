@@ -7,7 +7,11 @@ import remarkGfm from "remark-gfm";
 
 import { useCitationDialog } from "./CitationDialogContext";
 import { getCitationMarkdownContent } from "./chatMessageTransforms";
-import { SearchCitationEnrichmentResponse, SearchCitationResult } from "../lib/types";
+import {
+  SearchCitationEnrichmentResponse,
+  SearchCitationResult,
+  SearchToolCallCitationsResponse,
+} from "../lib/types";
 
 type EnrichmentState = {
   citation?: SearchCitationResult;
@@ -59,17 +63,36 @@ export function CitationDialog() {
   // Extract the ref number from the scoped key for display
   const openRefNumber = openKey !== null ? parseInt(openKey.split(":").pop() ?? "0", 10) : null;
 
+  // Every ref of a tool call is enriched by one request; other refs of the
+  // same tool call are then served from this map.
+  const toolCallCitations = useRef(new Map<string, Promise<SearchToolCallCitationsResponse>>());
+
+  const fetchToolCallCitations = useCallback((threadId: string, toolCallId: string) => {
+    const key = `${threadId}:${toolCallId}`;
+    let pending = toolCallCitations.current.get(key);
+    if (!pending) {
+      pending = fetch(
+        `/api/conversations/${encodeURIComponent(threadId)}/citations/${encodeURIComponent(toolCallId)}`,
+        { cache: "no-store" },
+      ).then(async (response) => {
+        if (!response.ok) {
+          toolCallCitations.current.delete(key);
+          return { citations: [] };
+        }
+        return (await response.json()) as SearchToolCallCitationsResponse;
+      });
+      pending.catch(() => toolCallCitations.current.delete(key));
+      toolCallCitations.current.set(key, pending);
+    }
+    return pending;
+  }, []);
+
   const loadEnrichment = useCallback(async (threadId: string, toolCallId: string, refNumber: number) => {
     setEnrichment({ status: "loading" });
     try {
-      const response = await fetch(
-        `/api/conversations/${encodeURIComponent(threadId)}/citations/${encodeURIComponent(toolCallId)}/${encodeURIComponent(String(refNumber))}`,
-        { cache: "no-store" },
-      );
-      let payload: SearchCitationEnrichmentResponse = { status: "missing" };
-      if (response.ok) {
-        payload = (await response.json()) as SearchCitationEnrichmentResponse;
-      }
+      const { citations } = await fetchToolCallCitations(threadId, toolCallId);
+      const payload: SearchCitationEnrichmentResponse =
+        citations.find((item) => item.ref_number === refNumber) ?? { status: "missing" };
       startTransition(() => {
         setEnrichment({
           citation: payload.citation,
@@ -81,7 +104,7 @@ export function CitationDialog() {
         setEnrichment({ status: "error" });
       });
     }
-  }, []);
+  }, [fetchToolCallCitations]);
 
   useEffect(() => {
     if (openKey === null || !entry) {
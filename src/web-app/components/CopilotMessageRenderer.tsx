@@ -8,6 +8,8 @@ import { canonicalizeCitations, normalizeCitationRow, transformAssistantContent
 import { SearchToolRenderer } from "./SearchToolRenderer";
 import { WebSearchToolRenderer } from "./WebSearchToolRenderer";
 
+const INTERNAL_SEARCH_TOOL_NAMES = new Set(["search_knowledge_base", "search_knowledge_base_multi"]);
+
 type ToolCallLike = {
   id: string;
   type?: string;
@@ -105,7 +107,7 @@ function getAssistantSearchCitations(message: AgUiMessageLike, messages: AgUiMes
     .flatMap((candidate) => Array.isArray(candidate.toolCalls) ? candidate.toolCalls : []);
 
   return toolCalls.flatMap((toolCall) => {
-    if (toolCall.function?.name !== "search_knowledge_base") {
+    if (!INTERNAL_SEARCH_TOOL_NAMES.has(toolCall.function?.name ?? "")) {
       return [];
     }
 
@@ -181,7 +183,7 @@ function renderToolCall(
   const parsedResult = parseJsonPayload(toolResultMessage?.content);
   const status = toolResultMessage ? "complete" : isInProgress ? "executing" : "inProgress";
 
-  if (toolName === "search_knowledge_base") {
+  if (INTERNAL_SEARCH_TOOL_NAMES.has(toolName)) {
     return <SearchToolRenderer args={args} result={parsedResult as any} status={status} toolCallId={toolCall.id} turnNumber={turnNumber} />;
   }
 
@@ -17,6 +17,7 @@ type SearchToolRendererProps = {
   turnNumber?: number;
   args?: {
     query?: unknown;
+    queries?: unknown;
   } | null;
   result?: {
     results?: unknown[];
@@ -61,7 +62,11 @@ export function SearchToolRenderer({ status, toolCallId, args, result, turnNumbe
   }, [rawResults]);
 
   const isWorking = status === "inProgress" || status === "executing" || status === "running";
-  const query = coerceMessageContent(args?.query) ?? "Preparing search request";
+  const rawQueries = args?.queries;
+  const batchedQueries = Array.isArray(rawQueries)
+    ? rawQueries.map((value) => coerceMessageContent(value)).filter(Boolean).join(" · ")
+    : "";
+  const query = coerceMessageContent(args?.query) ?? (batchedQueries || "Preparing search request");
 
   useEffect(() => {
     const dialog = citationDialogRef.current;
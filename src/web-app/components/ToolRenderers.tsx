@@ -25,6 +25,25 @@ export function ToolRenderers() {
     [],
   );
 
+  useRenderToolCall(
+    {
+      name: "search_knowledge_base_multi",
+      description: "Search the knowledge base with several rephrasings of one question.",
+      parameters: [
+        {
+          name: "queries",
+          type: "string[]",
+          description: "Rephrasings of the same information need.",
+          required: true,
+        },
+      ],
+      render: (props: any) => (
+        <SearchToolRenderer args={props.args} result={props.result} status={props.status} />
+      ),
+    } as any,
+    [],
+  );
+
   useDefaultTool(
     {
       render: (props: any) => {
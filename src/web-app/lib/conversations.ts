@@ -1,5 +1,6 @@
 import { randomUUID } from "node:crypto";
 import { Agent as HttpsAgent } from "node:https";
+import * as zlib from "node:zlib";
 
 import { CosmosClient, type Container, type CosmosClientOptions, type SqlQuerySpec } from "@azure/cosmos";
 import { DefaultAzureCredential } from "@azure/identity";
@@ -13,10 +14,18 @@ import {
   UserContext,
 } from "./types";
 
+// The agent stores a session either as one document, or ("segmented") as a
+// head document whose messages live in the segment documents it lists.
+// Documents tagged with a codec hold those fields as base64 compressed JSON.
 type SessionDocument = {
+  codec?: { name: string; version: number; fields?: string[] };
   id: string;
   session?: unknown;
   state?: unknown;
+  layout?: string;
+  message_path?: string[];
+  segments?: { id: string }[];
+  messages?: unknown[];
 };
 
 const memoryConversations = new Map<string, ConversationRecord>();
@@ -200,6 +209,65 @@ function normalizeSessionMessages(document: SessionDocument | null | undefined):
   return [];
 }
 
+function withMessagesAt(session: unknown, path: string[], messages: unknown[]): unknown {
+  if (path.length === 0 || !session || typeof session !== "object") {
+    return session;
+  }
+
+  const [key, ...rest] = path;
+  const record = session as Record<string, unknown>;
+  return { ...record, [key]: rest.length === 0 ? messages : withMessagesAt(record[key] ?? {}, rest, messages) };
+}
+
+function decompress(data: Buffer, codec: string): Buffer {
+  if (codec === "gzip") {
+    return zlib.gunzipSync(data);
+  }
+
+  throw new Error(`Unsupported session codec: ${codec}`);
+}
+
+function decodeSessionDocument(document: SessionDocument): SessionDocument {
+  const { codec, ...decoded } = document;
+  if (!codec) {
+    return document;
+  }
+
+  const fields = decoded as Record<string, unknown>;
+  for (const field of codec.fields ?? []) {
+    const value = fields[field];
+    if (typeof value === "string") {
+      fields[field] = JSON.parse(decompress(Buffer.from(value, "base64"), codec.name).toString("utf-8"));
+    }
+  }
+  return decoded;
+}
+
+async function readSessionDocument(id: string): Promise<SessionDocument | null> {
+  if (!shouldUseCosmos()) {
+    const document = memorySessionDocuments.get(id);
+    return document ? decodeSessionDocument(document) : null;
+  }
+
+  const { resource } = await sessionsContainer().item(id, id).read<SessionDocument>();
+  return resource ? decodeSessionDocument(resource) : null;
+}
+
+async function loadSessionDocument(threadId: string): Promise<SessionDocument | null> {
+  const head = await readSessionDocument(threadId);
+  if (!head || head.layout !== "segmented") {
+    return head;
+  }
+
+  const segments = await Promise.all((head.segments ?? []).map((segment) => readSessionDocument(segment.id)));
+  if (segments.some((segment) => segment === null)) {
+    throw new Error(`Session ${threadId} is missing a segment`);
+  }
+
+  const messages = segments.flatMap((segment) => segment?.messages ?? []);
+  return { ...head, session: withMessagesAt(head.session, head.message_path ?? [], messages) };
+}
+
 export async function listConversationsForUser(userId: string): Promise<ConversationRecord[]> {
   if (!shouldUseCosmos()) {
     return ownedMemoryConversations(userId);
@@ -306,13 +374,8 @@ export async function fetchConversationMessagesForUser(
     return null;
   }
 
-  if (!shouldUseCosmos()) {
-    return normalizeSessionMessages(memorySessionDocuments.get(threadId));
-  }
-
   try {
-    const { resource } = await sessionsContainer().item(threadId, threadId).read<SessionDocument>();
-    return normalizeSessionMessages(resource);
+    return normalizeSessionMessages(await loadSessionDocument(threadId));
   } catch {
     return [];
   }
@@ -324,6 +387,13 @@ export function resetConversationStoreForTests(): void {
   cosmosClient = null;
 }
 
-export function seedConversationMessagesForTests(threadId: string, document: SessionDocument): void {
+export function seedConversationMessagesForTests(
+  threadId: string,
+  document: SessionDocument,
+  segments: SessionDocument[] = [],
+): void {
   memorySessionDocuments.set(threadId, document);
+  for (const segment of segments) {
+    memorySessionDocuments.set(segment.id, segment);
+  }
 }
\ No newline at end of file
@@ -64,6 +64,10 @@ export interface SearchCitationEnrichmentResponse {
   citation?: SearchCitationResult;
 }
 
+export interface SearchToolCallCitationsResponse {
+  citations: Array<SearchCitationEnrichmentResponse & { ref_number: number }>;
+}
+
 export interface DownloadedBlob {
   data: Uint8Array;
   contentType: string;